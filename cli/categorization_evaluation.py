@@ -0,0 +1,282 @@
+"""Offline evaluation of category suggestions: quality, latency and throughput.
+
+Runs ``DefaultCategorySuggestionService`` end to end, snapshot provider
+included, for every engine configuration of
+``categorization_engine_comparison.build_engines`` with and without the
+exact-history table. The history is either a snapshot file written by
+``FileSnapshotStore`` (``--snapshot``) or a synthetic snapshot of Polish card,
+BLIK and Allegro transactions from the comparison script's generator
+(``--synthetic N``, optionally saved with ``--write-snapshot`` for reuse).
+
+Every categorized, non-internal transaction is a labelled example. A sample
+of them is suggested for leave-one-out style: engines, the exact-history table
+and the classifier all skip the transaction being scored.
+
+Reported per configuration:
+    top-1/top-3  share of the sample whose category is the first/among the
+                 first three suggestions
+    covered      share of the sample that got any suggestion
+    build        first call on a cold corpus (corpus, features, indexes)
+    p50/p95/p99  ``suggest_for_transaction_id`` latency on a warm corpus
+    qps          single-transaction calls per second, from the same run
+    batch qps    transactions per second via ``suggest_for_transaction_ids``
+                 in batches of ``--batch-size``
+
+Usage:
+    uv run python cli/categorization_evaluation.py --synthetic 10000
+    uv run python cli/categorization_evaluation.py --snapshot data/snapshot.bin \\
+        --engines weighted+index naive_bayes --exact-history on --json out.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from datetime import UTC, date, datetime, timedelta
+from pathlib import Path
+
+# A sibling script (next to this one on sys.path); see the deptry ignores.
+from categorization_engine_comparison import (
+    BUCKETIZER,
+    EngineConfiguration,
+    build_engines,
+    build_history,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from services.categorization import (  # noqa: E402
+    DefaultCategorySuggestionService,
+    ExactHistoryTable,
+    SnapshotCategorizationProvider,
+)
+from services.domain.metrics import FetchMetrics  # noqa: E402
+from services.domain.transaction import (  # noqa: E402
+    Category,
+    Currency,
+    Transaction,
+    TxTag,
+    TxType,
+)
+from services.snapshot.codec import decode_snapshot, encode_snapshot  # noqa: E402
+from services.snapshot.models import TransactionSnapshot  # noqa: E402
+
+USER_ID = "evaluation"
+PLN = Currency(code="PLN", symbol="zł", decimals=2)
+SOURCE_TAGS = {
+    "blik": frozenset({TxTag.blik_done.value}),
+    "allegro": frozenset({TxTag.allegro_done.value}),
+    "bank": frozenset(),
+}
+
+
+class _StaticSnapshotService:
+    def __init__(self, snapshot: TransactionSnapshot) -> None:
+        self._snapshot = snapshot
+
+    async def get_snapshot(self) -> TransactionSnapshot:
+        return self._snapshot
+
+    async def get_cached_snapshot(self) -> TransactionSnapshot:
+        return self._snapshot
+
+
+def synthetic_snapshot(count: int, *, seed: int = 42) -> TransactionSnapshot:
+    """A snapshot whose transactions map back to ``build_history`` documents.
+
+    BLIK merchants are set as the ``merchant`` attribute the provider reads;
+    like in production, the snapshot codec does not persist it.
+    """
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    categories: dict[str, Category] = {}
+    transactions = []
+    for document in build_history(count, seed=seed):
+        category = categories.setdefault(
+            document.category_id,
+            Category(id=len(categories) + 1, name=document.category_name),
+        )
+        tx = Transaction(
+            id=int(document.transaction_id) + 1,
+            date=start + timedelta(days=rng.randrange(1500)),
+            amount=document.amount,
+            type=TxType.WITHDRAWAL,
+            description=document.title,
+            tags=SOURCE_TAGS[document.source_type],
+            notes=document.notes,
+            category=category,
+            currency=PLN,
+        )
+        if document.merchant is not None:
+            tx.merchant = document.merchant
+        transactions.append(tx)
+    return TransactionSnapshot(
+        transactions=transactions,
+        metrics=FetchMetrics(
+            total_transactions=len(transactions),
+            fetching_duration_ms=0,
+            invalid=0,
+            multipart=0,
+        ),
+        fetched_at=datetime.now(UTC),
+    )
+
+
+def build_configurations(
+    engines: list[str], exact_history: str
+) -> dict[str, tuple[EngineConfiguration, bool]]:
+    variants = {"off": [False], "on": [True], "both": [False, True]}[exact_history]
+    configurations = {}
+    for with_exact in variants:
+        # Fresh engines per variant: they cache per-revision structures.
+        built = build_engines()
+        for name in engines:
+            label = f"{name}+exact" if with_exact else name
+            configurations[label] = (built[name], with_exact)
+    return configurations
+
+
+def percentile(sorted_values: list[float], share: float) -> float:
+    # Nearest-rank percentile of an ascending list.
+    rank = max(1, math.ceil(share * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+async def evaluate(
+    snapshot: TransactionSnapshot,
+    configuration: EngineConfiguration,
+    *,
+    with_exact_history: bool,
+    queries: int,
+    batch_size: int,
+    seed: int,
+) -> dict[str, float]:
+    provider = SnapshotCategorizationProvider(
+        snapshot_service=_StaticSnapshotService(snapshot),
+        amount_bucketizer=BUCKETIZER,
+    )
+    service = DefaultCategorySuggestionService(
+        snapshot_provider=provider,
+        similarity_engine=configuration.engine,
+        amount_bucketizer=BUCKETIZER,
+        exact_history=(
+            ExactHistoryTable(preprocessor=configuration.preprocessor)
+            if with_exact_history
+            else None
+        ),
+        classifier=configuration.classifier,
+        classifier_weight=configuration.classifier_weight,
+    )
+
+    started = time.perf_counter()
+    labelled = list(await provider.get_candidate_documents_for_user(USER_ID))
+    if not labelled:
+        raise SystemExit("The snapshot has no categorized transactions to evaluate")
+    sample = random.Random(seed).sample(labelled, min(queries, len(labelled)))
+    await service.suggest_for_transaction_id(
+        user_id=USER_ID, transaction_id=sample[0].transaction_id
+    )
+    build_ms = (time.perf_counter() - started) * 1000
+
+    top1 = top3 = covered = 0
+    latencies = []
+    for document in sample:
+        started = time.perf_counter()
+        suggestions = await service.suggest_for_transaction_id(
+            user_id=USER_ID, transaction_id=document.transaction_id
+        )
+        latencies.append((time.perf_counter() - started) * 1000)
+        categories = [suggestion.category_id for suggestion in suggestions]
+        top1 += categories[:1] == [document.category_id]
+        top3 += document.category_id in categories[:3]
+        covered += bool(categories)
+
+    transaction_ids = [document.transaction_id for document in sample]
+    started = time.perf_counter()
+    for start in range(0, len(transaction_ids), batch_size):
+        await service.suggest_for_transaction_ids(
+            user_id=USER_ID,
+            transaction_ids=transaction_ids[start : start + batch_size],
+        )
+    batch_seconds = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "documents": len(labelled),
+        "queries": len(sample),
+        "top1": top1 / len(sample),
+        "top3": top3 / len(sample),
+        "covered": covered / len(sample),
+        "build_ms": build_ms,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "qps": len(sample) / (sum(latencies) / 1000),
+        "batch_qps": len(sample) / batch_seconds,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--snapshot", type=Path)
+    source.add_argument("--synthetic", type=int, default=5_000)
+    parser.add_argument("--write-snapshot", type=Path)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=50)
+    parser.add_argument("--engines", nargs="+", default=list(build_engines()))
+    parser.add_argument(
+        "--exact-history", choices=["off", "on", "both"], default="both"
+    )
+    parser.add_argument("--json", type=Path, help="also write results as JSON")
+    args = parser.parse_args()
+
+    if args.snapshot is not None:
+        snapshot = decode_snapshot(args.snapshot.read_bytes())
+    else:
+        snapshot = synthetic_snapshot(args.synthetic, seed=args.seed)
+    if args.write_snapshot is not None:
+        args.write_snapshot.write_bytes(encode_snapshot(snapshot))
+
+    print(
+        f"{'configuration':>22} {'top-1':>7} {'top-3':>7} {'covered':>8} "
+        f"{'build':>9} {'p50':>8} {'p95':>8} {'p99':>8} {'qps':>8} "
+        f"{'batch qps':>10}"
+    )
+    results = []
+    configurations = build_configurations(args.engines, args.exact_history)
+    for name, (configuration, with_exact_history) in configurations.items():
+        result = asyncio.run(
+            evaluate(
+                snapshot,
+                configuration,
+                with_exact_history=with_exact_history,
+                queries=args.queries,
+                batch_size=args.batch_size,
+                seed=args.seed,
+            )
+        )
+        results.append({"configuration": name, **result})
+        print(
+            f"{name:>22} {result['top1']:>7.1%} {result['top3']:>7.1%} "
+            f"{result['covered']:>8.1%} {result['build_ms']:>7.0f}ms "
+            f"{result['p50_ms']:>6.2f}ms {result['p95_ms']:>6.2f}ms "
+            f"{result['p99_ms']:>6.2f}ms {result['qps']:>8.0f} "
+            f"{result['batch_qps']:>10.0f}"
+        )
+    if results:
+        print(f"documents: {results[0]['documents']}, queries: {results[0]['queries']}")
+    if args.json is not None:
+        args.json.write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
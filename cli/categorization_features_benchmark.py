@@ -0,0 +1,177 @@
+"""Benchmark per-query CPU cost of precomputed categorization text features.
+
+Three ways of scoring one query against a synthetic corpus:
+
+- per pair: both sides normalized for every comparison (previous behaviour);
+- per request: candidate features computed once per call (plain list input);
+- precomputed: features cached on a ``CategorizationCorpus`` (warm corpus).
+
+The token index is disabled so every mode scores the whole corpus.
+
+Usage:
+    uv run python cli/categorization_features_benchmark.py [--sizes 1000 5000]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections.abc import Callable
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from services.categorization.amount_bucketizer import AmountBucketizer  # noqa: E402
+from services.categorization.corpus import CategorizationCorpus  # noqa: E402
+from services.categorization.models import TransactionCategorizationQuery  # noqa: E402
+from services.categorization.preprocessor import (  # noqa: E402
+    CategorizationTextPreprocessor,
+)
+from services.categorization.similarity_engine import (  # noqa: E402
+    WeightedTransactionSimilarityEngine,
+)
+from services.domain.category_suggestion import (  # noqa: E402
+    TransactionCategorizationDocument,
+)
+
+MERCHANTS = {
+    "Groceries": ["Biedronka", "Lidl", "Żabka", "Kaufland", "Netto"],
+    "Fuel": ["Orlen", "Shell", "Circle K"],
+    "Restaurants": ["Starbucks", "Pizza Hut", "Bistro Pod Lipą"],
+    "Transport": ["Uber", "Bolt", "PKP Intercity"],
+    "Shopping": ["Rossmann", "Empik", "Media Expert"],
+}
+CITIES = ["WARSZAWA", "KRAKÓW", "GDAŃSK", "ŁÓDŹ"]
+NOTES = [None, "zakupy spożywcze", "paliwo do auta", "obiad z rodziną"]
+BUCKETIZER = AmountBucketizer()
+
+
+def _fields(rng: random.Random) -> tuple[str, str, Decimal, tuple[Any, ...]]:
+    category = rng.choice(list(MERCHANTS))
+    merchant = rng.choice(MERCHANTS[category])
+    amount = Decimal(rng.randrange(100, 60_000)) / 100
+    if rng.random() < 0.3:
+        title = f"BLIK - płatność w internecie {rng.randrange(10**8)}"
+        return category, merchant, amount, (title, merchant, None, "blik")
+    title = f"{merchant.upper()} {rng.choice(CITIES)} {rng.randrange(100)}"
+    return category, merchant, amount, (title, None, rng.choice(NOTES), "bank")
+
+
+def build_documents(
+    count: int, *, seed: int = 42
+) -> list[TransactionCategorizationDocument]:
+    rng = random.Random(seed)
+    documents = []
+    for index in range(count):
+        category, _, amount, (title, merchant, notes, source) = _fields(rng)
+        documents.append(
+            TransactionCategorizationDocument(
+                transaction_id=str(index),
+                user_id="benchmark",
+                category_id=category,
+                category_name=category,
+                title=title,
+                merchant=merchant,
+                notes=notes,
+                amount=amount,
+                amount_bucket=BUCKETIZER.bucket_for_amount(amount),
+                source_type=source,
+            )
+        )
+    return documents
+
+
+def build_queries(count: int, *, seed: int = 7) -> list[TransactionCategorizationQuery]:
+    rng = random.Random(seed)
+    queries = []
+    for index in range(count):
+        _, _, amount, (title, merchant, notes, source) = _fields(rng)
+        queries.append(
+            TransactionCategorizationQuery(
+                transaction_id=f"q{index}",
+                title=title,
+                merchant=merchant,
+                notes=notes,
+                amount=amount,
+                amount_bucket=BUCKETIZER.bucket_for_amount(amount),
+                source_type=source,
+            )
+        )
+    return queries
+
+
+def per_pair(
+    engine: WeightedTransactionSimilarityEngine,
+    queries: list[TransactionCategorizationQuery],
+    documents: list[TransactionCategorizationDocument],
+) -> None:
+    for query in queries:
+        for document in documents:
+            engine._score_pair(query=query, candidate=document)
+
+
+def find_each(
+    engine: WeightedTransactionSimilarityEngine,
+    queries: list[TransactionCategorizationQuery],
+    candidates: list[TransactionCategorizationDocument] | CategorizationCorpus,
+) -> list[Any]:
+    return [asyncio.run(engine.find_similar(query, candidates)) for query in queries]
+
+
+def best_of(repeats: int, fn: Callable[..., Any], *args: Any) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 5_000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    engine = WeightedTransactionSimilarityEngine(
+        preprocessor=CategorizationTextPreprocessor(),
+        amount_bucketizer=BUCKETIZER,
+    )
+    queries = build_queries(args.queries)
+
+    print(
+        f"{'documents':>10} {'per pair':>10} {'per request':>12} "
+        f"{'precomputed':>12} {'speedup':>8}   (ms per query)"
+    )
+    for size in args.sizes:
+        documents = build_documents(size)
+        corpus = CategorizationCorpus(documents, revision=size)
+        corpus.features(engine._preprocessor)
+
+        expected = find_each(engine, queries, documents)
+        assert find_each(engine, queries, corpus) == expected, (
+            "precomputed features changed the results"
+        )
+
+        pair_ms, request_ms, warm_ms = (
+            best_of(args.repeats, fn, engine, queries, candidates) * 1000 / len(queries)
+            for fn, candidates in (
+                (per_pair, documents),
+                (find_each, documents),
+                (find_each, corpus),
+            )
+        )
+        print(
+            f"{size:>10} {pair_ms:>8.1f}ms {request_ms:>10.1f}ms "
+            f"{warm_ms:>10.1f}ms {pair_ms / warm_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
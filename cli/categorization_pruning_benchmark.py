@@ -0,0 +1,127 @@
+"""Benchmark score upper-bound pruning in the weighted similarity engine.
+
+Compares ``find_similar`` (bounded scoring, top-k heap) with a full scan that
+computes every exact score and sorts all matches, as the engine did before.
+The token index is disabled so both paths see every document. Results are
+asserted identical.
+
+Usage:
+    uv run python cli/categorization_pruning_benchmark.py [--sizes 100000]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+from categorization_engine_comparison import BUCKETIZER, build_history
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from services.categorization import (  # noqa: E402
+    CategorizationCorpus,
+    CategorizationTextPreprocessor,
+    TransactionCategorizationQuery,
+    WeightedTransactionSimilarityEngine,
+)
+from services.categorization.similarity_engine import sort_matches  # noqa: E402
+from services.domain.category_suggestion import (  # noqa: E402
+    SimilarTransactionMatch,
+    TransactionCategorizationDocument,
+)
+
+
+def full_scan(
+    engine: WeightedTransactionSimilarityEngine,
+    query: TransactionCategorizationQuery,
+    corpus: CategorizationCorpus,
+    *,
+    limit: int,
+) -> list[SimilarTransactionMatch]:
+    prepared = engine._prepare(query)
+    weights = engine._weights_for(prepared)
+    matches = []
+    for candidate, features in zip(
+        corpus, corpus.features(engine._preprocessor), strict=True
+    ):
+        if candidate.transaction_id == query.transaction_id:
+            continue
+        score, matched_by = engine._score_prepared(
+            query=prepared, candidate=features, weights=weights
+        )
+        if score >= engine._min_similarity_score:
+            matches.append(
+                SimilarTransactionMatch(
+                    transaction_id=candidate.transaction_id,
+                    category_id=candidate.category_id,
+                    category_name=candidate.category_name,
+                    similarity_score=round(score, 4),
+                    matched_by=matched_by,
+                )
+            )
+    return sort_matches(matches)[:limit]
+
+
+def to_query(
+    document: TransactionCategorizationDocument,
+) -> TransactionCategorizationQuery:
+    return TransactionCategorizationQuery(
+        transaction_id=document.transaction_id,
+        title=document.title,
+        merchant=document.merchant,
+        notes=document.notes,
+        amount=document.amount,
+        amount_bucket=document.amount_bucket,
+        source_type=document.source_type,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000])
+    parser.add_argument("--queries", type=int, default=10)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    engine = WeightedTransactionSimilarityEngine(
+        preprocessor=CategorizationTextPreprocessor(),
+        amount_bucketizer=BUCKETIZER,
+    )
+    print(
+        f"{'documents':>10} {'full scan':>11} {'bounded':>10} {'speedup':>8}"
+        "   (ms per query)"
+    )
+    for size in args.sizes:
+        documents = build_history(size)
+        corpus = CategorizationCorpus(documents, revision=size)
+        corpus.features(engine._preprocessor)
+        queries = [
+            to_query(document)
+            for document in random.Random(size).sample(documents, args.queries)
+        ]
+
+        full_total = bounded_total = 0.0
+        for query in queries:
+            started = time.perf_counter()
+            expected = full_scan(engine, query, corpus, limit=args.limit)
+            full_total += time.perf_counter() - started
+
+            started = time.perf_counter()
+            actual = asyncio.run(engine.find_similar(query, corpus, args.limit))
+            bounded_total += time.perf_counter() - started
+            assert actual == expected, "bounded scoring changed the results"
+
+        full_ms = full_total * 1000 / len(queries)
+        bounded_ms = bounded_total * 1000 / len(queries)
+        print(
+            f"{size:>10} {full_ms:>9.0f}ms {bounded_ms:>8.0f}ms "
+            f"{full_ms / bounded_ms:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Report memory held by a transaction snapshot mapped from Firefly data.
+
+Builds synthetic Firefly transactions (every value a separate object, as after
+JSON parsing), maps them with ``tx_from_ff_tx`` under ``tracemalloc`` and
+prints the memory retained by the resulting snapshot plus the top allocation
+sites.
+
+Usage:
+    uv run python cli/snapshot_memory_report.py [--transactions 100000]
+"""
+
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from ff_iii_luciferin.domain.models import (
+    AccountType,
+    Currency,
+    SimplifiedAccountRef,
+    SimplifiedCategory,
+    SimplifiedTx,
+    TxType,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from services.domain.metrics import FetchMetrics  # noqa: E402
+from services.mappers.firefly import tx_from_ff_tx  # noqa: E402
+from services.snapshot.models import TransactionSnapshot  # noqa: E402
+
+MERCHANTS = ["Biedronka", "Lidl", "Żabka", "Orlen", "Rossmann", "Allegro", "Uber"]
+TAGS = ["blik_done", "allegro_done", "action_req"]
+
+
+def _fresh(text: str) -> str:
+    # A new string object with the same value, like a JSON decoder produces.
+    return "".join(list(text))
+
+
+def build_ff_transactions(count: int, *, seed: int = 42) -> list[SimplifiedTx]:
+    rng = random.Random(seed)
+    start = date(2015, 1, 1)
+    transactions = []
+    for tx_id in range(count):
+        merchant = rng.randrange(len(MERCHANTS))
+        category = rng.randrange(40) if rng.random() < 0.8 else None
+        transactions.append(
+            SimplifiedTx(
+                id=tx_id,
+                date=start + timedelta(days=rng.randrange(3650)),
+                amount=Decimal(rng.randrange(100, 100_000)) / 100,
+                type=TxType.WITHDRAWAL,
+                description=_fresh(MERCHANTS[merchant]),
+                tags=[_fresh(tag) for tag in TAGS if rng.random() < 0.2],
+                notes=None if rng.random() < 0.7 else f"note {tx_id}",
+                category=(
+                    None
+                    if category is None
+                    else SimplifiedCategory(
+                        id=category, name=_fresh(f"Category {category}")
+                    )
+                ),
+                currency=Currency(code=_fresh("PLN"), symbol=_fresh("zł"), decimals=2),
+                fx=None,
+                source_account=SimplifiedAccountRef(
+                    id=1, name=_fresh("Konto główne"), type=AccountType.ASSET
+                ),
+                destination_account=SimplifiedAccountRef(
+                    id=100 + merchant,
+                    name=_fresh(MERCHANTS[merchant]),
+                    type=AccountType.EXPENSE,
+                ),
+            )
+        )
+    return transactions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.take_snapshot()
+    # Traced from the start so strings shared with the Firefly objects count.
+    ff_transactions = build_ff_transactions(args.transactions)
+
+    snapshot = TransactionSnapshot(
+        transactions=[tx_from_ff_tx(tx) for tx in ff_transactions],
+        metrics=FetchMetrics(
+            total_transactions=args.transactions,
+            fetching_duration_ms=0,
+            invalid=0,
+            multipart=0,
+        ),
+        fetched_at=datetime.now(UTC),
+    )
+    # The mapped snapshot must not keep the Firefly objects alive.
+    del ff_transactions
+    gc.collect()
+    current, peak = tracemalloc.get_traced_memory()
+    current -= sum(stat.size for stat in baseline.statistics("filename"))
+    stats = tracemalloc.take_snapshot().compare_to(baseline, "lineno")
+    tracemalloc.stop()
+
+    print(f"transactions:     {snapshot.transaction_count}")
+    print(f"snapshot memory:  {current / 1024 / 1024:.1f} MiB")
+    print(f"peak while built: {peak / 1024 / 1024:.1f} MiB")
+    print(f"bytes per tx:     {current / snapshot.transaction_count:.0f}")
+    print("top allocation sites:")
+    for stat in stats[: args.top]:
+        frame = stat.traceback[0]
+        print(
+            f"  {stat.size_diff / 1024 / 1024:7.2f} MiB "
+            f"{Path(frame.filename).name}:{frame.lineno}"
+        )
+
+
+if __name__ == "__main__":
+    main()
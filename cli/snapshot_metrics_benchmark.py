@@ -0,0 +1,161 @@
+"""Benchmark snapshot statistics: list filters + pandas vs columnar masks.
+
+Both paths compute the BLIK, Allegro and transaction statistics from the same
+synthetic snapshot. The list path mirrors the previous implementation (one
+filter pass per metric, ``group_tx_by_month`` through pandas); the columnar
+path builds ``SnapshotColumns`` once and derives everything from masks.
+
+Usage:
+    uv run python cli/snapshot_metrics_benchmark.py [--sizes 10000 100000 1000000]
+"""
+
+import argparse
+import random
+import sys
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from services.domain.transaction import (  # noqa: E402
+    Category,
+    Currency,
+    Transaction,
+    TxTag,
+    TxType,
+)
+from services.firefly_base_service import filter_by_description  # noqa: E402
+from services.snapshot.columns import SnapshotColumns  # noqa: E402
+from services.tx_stats.helpers import _group_tx_by_month_sync  # noqa: E402
+
+BLIK = "BLIK - płatność w internecie"
+ALLEGRO = "allegro"
+DESCRIPTIONS = [BLIK, f"{BLIK} 123", "Allegro.pl", "Biedronka", "Lidl", "Orlen"]
+TAG_SETS = [
+    frozenset(),
+    frozenset({TxTag.blik_done}),
+    frozenset({TxTag.allegro_done}),
+    frozenset({TxTag.action_req}),
+]
+
+
+def build_transactions(count: int, *, seed: int = 42) -> list[Transaction]:
+    rng = random.Random(seed)
+    currency = Currency(code="PLN", symbol="zł", decimals=2)
+    categories = [Category(id=i, name=f"Category {i}") for i in range(40)]
+    start = date(2015, 1, 1)
+    return [
+        Transaction(
+            id=tx_id,
+            date=start + timedelta(days=rng.randrange(3650)),
+            amount=Decimal(rng.randrange(100, 100_000)) / 100,
+            type=TxType.WITHDRAWAL,
+            description=rng.choice(DESCRIPTIONS),
+            tags=rng.choice(TAG_SETS),
+            notes=None,
+            category=rng.choice(categories) if rng.random() < 0.6 else None,
+            currency=currency,
+        )
+        for tx_id in range(count)
+    ]
+
+
+def list_path(txs: list[Transaction]) -> dict[str, Any]:
+    uncategorized = [tx for tx in txs if tx.category is None]
+
+    allegro = filter_by_description(txs, ALLEGRO, exact_match=False)
+    allegro_pending = [tx for tx in allegro if TxTag.allegro_done not in tx.tags]
+
+    blik_exact = filter_by_description(uncategorized, BLIK, exact_match=True)
+    blik_partial = filter_by_description(uncategorized, BLIK, exact_match=False)
+    blik_pending = [tx for tx in blik_exact if TxTag.blik_done not in tx.tags]
+    blik_incomplete = [tx for tx in blik_partial if TxTag.blik_done not in tx.tags]
+
+    blik_ok = filter_by_description(uncategorized, BLIK, exclude=True)
+    action_not_req = [tx for tx in blik_ok if TxTag.action_req not in tx.tags]
+    allegro_ok = [
+        tx
+        for tx in action_not_req
+        if ALLEGRO not in tx.description.lower() or TxTag.allegro_done in tx.tags
+    ]
+    return {
+        "allegro_by_month": _group_tx_by_month_sync(allegro_pending),
+        "blik_by_month": _group_tx_by_month_sync(blik_pending),
+        "blik_incomplete_by_month": _group_tx_by_month_sync(blik_incomplete),
+        "categorizable_by_month": _group_tx_by_month_sync(allegro_ok),
+    }
+
+
+def columnar_path(txs: list[Transaction]) -> dict[str, Any]:
+    return columnar_metrics(SnapshotColumns(txs))
+
+
+def columnar_metrics(columns: SnapshotColumns) -> dict[str, Any]:
+    uncategorized = ~columns.categorized
+
+    allegro = columns.description_contains(ALLEGRO)
+    blik_pending = uncategorized & ~columns.blik_done
+
+    blik_not_ok = columns.description_is(BLIK) & uncategorized
+    action_req = columns.action_req & uncategorized & ~blik_not_ok
+    allegro_not_ok = (
+        allegro & uncategorized & ~columns.allegro_done & ~blik_not_ok & ~action_req
+    )
+    categorizable = uncategorized & ~(blik_not_ok | action_req | allegro_not_ok)
+    return {
+        "allegro_by_month": columns.count_by_month(allegro & ~columns.allegro_done),
+        "blik_by_month": columns.count_by_month(
+            columns.description_is(BLIK) & blik_pending
+        ),
+        "blik_incomplete_by_month": columns.count_by_month(
+            columns.description_contains(BLIK) & blik_pending
+        ),
+        "categorizable_by_month": columns.count_by_month(categorizable),
+    }
+
+
+def best_of[T](repeats: int, fn: Callable[[T], Any], arg: T) -> tuple[float, Any]:
+    best = float("inf")
+    result = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        result = fn(arg)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+
+    # "cold" includes building the projection (once per snapshot revision);
+    # "warm" reuses it, as the three metric services do after the first call.
+    print(
+        f"{'transactions':>12} {'list+pandas':>12} {'cold':>8} {'warm':>8} "
+        f"{'speedup cold/warm':>18}"
+    )
+    for size in args.sizes:
+        txs = build_transactions(size)
+        list_time, expected = best_of(args.repeats, list_path, txs)
+        cold_time, actual = best_of(args.repeats, columnar_path, txs)
+        assert actual == expected, "columnar metrics differ from the list path"
+        warm_time, _ = best_of(args.repeats, columnar_metrics, SnapshotColumns(txs))
+        print(
+            f"{size:>12} {list_time * 1000:>10.0f}ms {cold_time * 1000:>6.0f}ms "
+            f"{warm_time * 1000:>6.1f}ms "
+            f"{list_time / cold_time:>8.1f}x/{list_time / warm_time:.0f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
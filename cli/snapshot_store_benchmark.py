@@ -0,0 +1,110 @@
+"""Benchmark save/load of the file-backed transaction snapshot store.
+
+Usage:
+    uv run python cli/snapshot_store_benchmark.py [--transactions 100000]
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from services.domain.metrics import FetchMetrics  # noqa: E402
+from services.domain.transaction import (  # noqa: E402
+    AccountRef,
+    AccountType,
+    Category,
+    Currency,
+    Transaction,
+    TxType,
+)
+from services.snapshot.models import TransactionSnapshot  # noqa: E402
+from services.snapshot.store import FileSnapshotStore  # noqa: E402
+
+MERCHANTS = ["Biedronka", "Lidl", "Żabka", "Orlen", "Rossmann", "Allegro", "Uber"]
+TAGS = ["blik_done", "allegro_done", "action_req"]
+
+
+def build_snapshot(count: int, *, seed: int = 42) -> TransactionSnapshot:
+    rng = random.Random(seed)
+    currency = Currency(code="PLN", symbol="zł", decimals=2)
+    asset = AccountRef(id=1, name="Konto główne", type=AccountType.ASSET)
+    expenses = [
+        AccountRef(id=100 + i, name=name, type=AccountType.EXPENSE)
+        for i, name in enumerate(MERCHANTS)
+    ]
+    categories = [Category(id=i, name=f"Category {i}") for i in range(40)]
+    start = date(2015, 1, 1)
+    transactions = []
+    for tx_id in range(count):
+        merchant = rng.randrange(len(MERCHANTS))
+        transactions.append(
+            Transaction(
+                id=tx_id,
+                date=start + timedelta(days=rng.randrange(3650)),
+                amount=Decimal(rng.randrange(100, 100_000)) / 100,
+                type=TxType.WITHDRAWAL,
+                description=f"{MERCHANTS[merchant]} {rng.randrange(1000)}",
+                tags={tag for tag in TAGS if rng.random() < 0.2},
+                notes=None if rng.random() < 0.7 else f"note {tx_id}",
+                category=rng.choice(categories) if rng.random() < 0.8 else None,
+                currency=currency,
+                source_account=asset,
+                destination_account=expenses[merchant],
+            )
+        )
+    return TransactionSnapshot(
+        transactions=transactions,
+        metrics=FetchMetrics(
+            total_transactions=count,
+            fetching_duration_ms=0,
+            invalid=0,
+            multipart=0,
+        ),
+        fetched_at=datetime.now(UTC),
+    )
+
+
+async def run(count: int, repeats: int) -> None:
+    snapshot = build_snapshot(count)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "snapshot.bin"
+        save_times = []
+        load_times = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            await FileSnapshotStore(path).set_snapshot(snapshot)
+            save_times.append(time.perf_counter() - started)
+
+            started = time.perf_counter()
+            loaded = await FileSnapshotStore(path).get_snapshot()
+            load_times.append(time.perf_counter() - started)
+            assert loaded is not None and loaded.transaction_count == count
+
+        size_mb = path.stat().st_size / 1024 / 1024
+
+    print(f"transactions: {count}")
+    print(f"file size:    {size_mb:.2f} MiB")
+    print(f"save (best):  {min(save_times) * 1000:.0f} ms")
+    print(f"load (best):  {min(load_times) * 1000:.0f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(run(args.transactions, args.repeats))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,11 +6,13 @@ from fastapi import Depends
 
 from api.deps_services import (
     get_allegro_service,
+    get_category_catalog,
     get_firefly_enrichment_service,
     get_firefly_tx_service,
     get_snapshot_allegro_metrics_service,
     get_snapshot_blik_metrics_service,
     get_snapshot_tx_metrics_service,
+    get_transaction_snapshot_service,
     get_user_secrets_service,
 )
 from services.allegro_application_service import AllegroApplicationService
@@ -25,6 +27,7 @@ from services.citi_import.parser import CitiTextParser
 from services.citi_import.service import CitiImportService
 from services.firefly_enrichment_service import FireflyEnrichmentService
 from services.tx_application_service import TxApplicationService
+from services.tx_state_store import get_tx_state_store
 from services.user_secrets_service import UserSecretsService
 from settings import settings
 
@@ -43,6 +46,10 @@ def get_tx_application_runtime() -> TxApplicationService:
     return TxApplicationService(
         tx_service=get_firefly_tx_service(),
         metrics_provider=get_snapshot_tx_metrics_service(),
+        snapshot_service=get_transaction_snapshot_service(),
+        category_catalog=get_category_catalog(),
+        state_store=get_tx_state_store(),
+        update_concurrency=settings.FIREFLY_UPDATE_CONCURRENCY,
     )
 
 
@@ -1,4 +1,5 @@
-from functools import lru_cache
+from collections.abc import Callable
+from functools import lru_cache, partial
 
 from fastapi import Cookie, Depends, Header
 from ff_iii_luciferin.api import FireflyClient
@@ -9,11 +10,19 @@ from services.allegro_service import AllegroService, allegro_client_factory
 from services.categorization import (
     AmountBucketizer,
     CategorizationTextPreprocessor,
+    CategorySuggestionPrecomputer,
     DefaultCategorySuggestionService,
+    ExactHistoryTable,
+    NaiveBayesCategoryClassifier,
+    PrecomputedCategorySuggestionService,
+    ProcessPoolSimilarityEngine,
     SnapshotCategorizationProvider,
+    TfidfTransactionSimilarityEngine,
+    TransactionSimilarityEngine,
     WeightedTransactionSimilarityEngine,
 )
 from services.categorization.service import CategorySuggestionService
+from services.category_catalog import CategoryCatalog
 from services.db.repository import (
     AuditLogRepository,
     UserRepository,
@@ -25,6 +34,7 @@ from services.firefly_enrichment_service import FireflyEnrichmentService
 from services.firefly_tx_service import FireflyTxService
 from services.secret_crypto_service import SecretCryptoService
 from services.snapshot import (
+    FileSnapshotStore,
     InMemorySnapshotStore,
     SnapshotAllegroMetricsService,
     SnapshotBlikMetricsService,
@@ -53,27 +63,45 @@ def get_firefly_client() -> FireflyClient:
 @lru_cache(maxsize=1)
 def get_firefly_base_service() -> FireflyBaseService:
     client = get_firefly_client()
-    return FireflyBaseService(client)
+    return FireflyBaseService(
+        client, fetch_concurrency=settings.FIREFLY_FETCH_CONCURRENCY
+    )
 
 
 @lru_cache(maxsize=1)
 def get_firefly_enrichment_service() -> FireflyEnrichmentService:
     client = get_firefly_client()
-    return FireflyEnrichmentService(client)
+    service = FireflyEnrichmentService(
+        client, fetch_concurrency=settings.FIREFLY_FETCH_CONCURRENCY
+    )
+    service.add_update_observer(get_transaction_snapshot_service())
+    return service
 
 
 @lru_cache(maxsize=1)
 def get_firefly_tx_service() -> FireflyTxService:
     client = get_firefly_client()
-    return FireflyTxService(
+    service = FireflyTxService(
         client,
         settings.BLIK_DESCRIPTION_FILTER,
         getattr(settings, "ALLEGRO_DESCRIPTION_FILTER", "allegro"),
+        fetch_concurrency=settings.FIREFLY_FETCH_CONCURRENCY,
+    )
+    service.add_update_observer(get_transaction_snapshot_service())
+    return service
+
+
+@lru_cache(maxsize=1)
+def get_category_catalog() -> CategoryCatalog:
+    return CategoryCatalog(
+        get_firefly_tx_service(), ttl_seconds=settings.CATEGORY_CACHE_TTL_SECONDS
     )
 
 
 @lru_cache(maxsize=1)
 def get_snapshot_store() -> SnapshotStore:
+    if settings.TRANSACTION_SNAPSHOT_PATH:
+        return FileSnapshotStore(settings.TRANSACTION_SNAPSHOT_PATH)
     return InMemorySnapshotStore()
 
 
@@ -83,6 +111,12 @@ def get_transaction_snapshot_service() -> TransactionSnapshotService:
         store=get_snapshot_store(),
         firefly_service=get_firefly_base_service(),
         max_age_seconds=settings.TRANSACTION_SNAPSHOT_TTL_SECONDS,
+        stale_while_revalidate_seconds=(
+            settings.TRANSACTION_SNAPSHOT_STALE_WHILE_REVALIDATE_SECONDS
+        ),
+        delta_refresh_enabled=settings.TRANSACTION_SNAPSHOT_DELTA_REFRESH,
+        delta_overlap_days=settings.TRANSACTION_SNAPSHOT_DELTA_OVERLAP_DAYS,
+        full_reconcile_seconds=settings.TRANSACTION_SNAPSHOT_FULL_RECONCILE_SECONDS,
     )
 
 
@@ -113,19 +147,113 @@ def get_snapshot_tx_metrics_service() -> SnapshotTxMetricsService:
 
 @lru_cache(maxsize=1)
 def get_category_suggestion_service() -> CategorySuggestionService:
+    precomputer = get_category_suggestion_precomputer()
+    if precomputer is None:
+        return _get_default_category_suggestion_service()
+    return PrecomputedCategorySuggestionService(
+        service=_get_default_category_suggestion_service(), precomputer=precomputer
+    )
+
+
+@lru_cache(maxsize=1)
+def get_category_suggestion_precomputer() -> CategorySuggestionPrecomputer | None:
+    if not settings.CATEGORIZATION_PRECOMPUTE:
+        return None
+    snapshot_service = get_transaction_snapshot_service()
+    tx_service = get_firefly_tx_service()
+    select_categorizable = tx_service.select_for_screening
     amount_bucketizer = AmountBucketizer()
+    # Scored on a worker thread, so it gets its own provider and engines
+    # instead of sharing the request-serving service.
+    suggestion_service = _build_category_suggestion_service(
+        snapshot_provider=SnapshotCategorizationProvider(
+            snapshot_service=snapshot_service,
+            amount_bucketizer=amount_bucketizer,
+            select_categorizable=select_categorizable,
+            stored_snapshot_only=True,
+        ),
+        amount_bucketizer=amount_bucketizer,
+    )
+    precomputer = CategorySuggestionPrecomputer(
+        snapshot_service=snapshot_service,
+        suggestion_service=suggestion_service,
+        select_categorizable=select_categorizable,
+    )
+    snapshot_service.add_listener(precomputer.on_snapshot)
+    # Registered after the snapshot service, which bumps the revision first.
+    tx_service.add_update_observer(precomputer)
+    return precomputer
+
+
+@lru_cache(maxsize=1)
+def _get_default_category_suggestion_service() -> DefaultCategorySuggestionService:
+    amount_bucketizer = AmountBucketizer()
+    tx_service = get_firefly_tx_service()
     snapshot_provider = SnapshotCategorizationProvider(
         snapshot_service=get_transaction_snapshot_service(),
         amount_bucketizer=amount_bucketizer,
+        select_categorizable=tx_service.select_for_screening,
     )
-    similarity_engine = WeightedTransactionSimilarityEngine(
-        preprocessor=CategorizationTextPreprocessor(),
-        amount_bucketizer=amount_bucketizer,
+    # Registered after the snapshot service, which the tx service notifies first.
+    tx_service.add_update_observer(snapshot_provider)
+    return _build_category_suggestion_service(
+        snapshot_provider=snapshot_provider, amount_bucketizer=amount_bucketizer
+    )
+
+
+def _build_category_suggestion_service(
+    *,
+    snapshot_provider: SnapshotCategorizationProvider,
+    amount_bucketizer: AmountBucketizer,
+) -> DefaultCategorySuggestionService:
+    # Shared so that corpus features are normalized once for every consumer.
+    preprocessor = CategorizationTextPreprocessor()
+    engine_factory: Callable[[], TransactionSimilarityEngine]
+    if settings.CATEGORIZATION_ENGINE == "tfidf":
+        engine_factory = partial(
+            TfidfTransactionSimilarityEngine,
+            preprocessor=preprocessor,
+            amount_bucketizer=amount_bucketizer,
+        )
+    else:
+        engine_factory = partial(
+            WeightedTransactionSimilarityEngine,
+            preprocessor=preprocessor,
+            amount_bucketizer=amount_bucketizer,
+            use_token_index=settings.CATEGORIZATION_TOKEN_INDEX,
+            bucket_fallback=settings.CATEGORIZATION_INDEX_BUCKET_FALLBACK,
+            max_key_share=settings.CATEGORIZATION_INDEX_MAX_KEY_SHARE,
+        )
+    similarity_engine: TransactionSimilarityEngine
+    if settings.CATEGORIZATION_PROCESS_WORKERS > 0:
+        similarity_engine = ProcessPoolSimilarityEngine(
+            engine_factory=engine_factory,
+            workers=settings.CATEGORIZATION_PROCESS_WORKERS,
+        )
+    else:
+        similarity_engine = engine_factory()
+    # The classifier either replaces the engine (which then only scores
+    # queries without known words) or is blended into its scores.
+    classifier_weight = (
+        1.0
+        if settings.CATEGORIZATION_ENGINE == "naive_bayes"
+        else settings.CATEGORIZATION_NAIVE_BAYES_BLEND
     )
     return DefaultCategorySuggestionService(
         snapshot_provider=snapshot_provider,
         similarity_engine=similarity_engine,
         amount_bucketizer=amount_bucketizer,
+        exact_history=(
+            ExactHistoryTable(preprocessor=preprocessor)
+            if settings.CATEGORIZATION_EXACT_HISTORY
+            else None
+        ),
+        classifier=(
+            NaiveBayesCategoryClassifier(preprocessor=preprocessor)
+            if classifier_weight > 0
+            else None
+        ),
+        classifier_weight=classifier_weight,
     )
 
 
@@ -0,0 +1,31 @@
+from api.mappers.job_status import map_status
+from api.models.category_suggestions import (
+    CategorySuggestionDto,
+    SuggestionPrecomputeResponse,
+)
+from services.domain.category_suggestion import (
+    CategorySuggestion,
+    SuggestionPrecomputeProgress,
+)
+
+
+def map_suggestion_to_dto(suggestion: CategorySuggestion) -> CategorySuggestionDto:
+    return CategorySuggestionDto(
+        category_id=suggestion.category_id,
+        category_name=suggestion.category_name,
+        score=suggestion.score,
+        reason=suggestion.reason,
+    )
+
+
+def map_precompute_progress_to_response(
+    progress: SuggestionPrecomputeProgress,
+) -> SuggestionPrecomputeResponse:
+    return SuggestionPrecomputeResponse(
+        status=map_status(progress.status),
+        revision=progress.revision,
+        total=progress.total,
+        completed=progress.completed,
+        started_at=progress.started_at,
+        finished_at=progress.finished_at,
+    )
@@ -1,16 +1,21 @@
 from decimal import Decimal
 
+from api.mappers.job_status import map_status
 from api.models.tx import (
     AccountType,
     MatchProcessingStatus,
     SimplifiedAccountRef,
     SimplifiedCategory,
     SimplifiedTx,
+    TxBulkJobResponse,
+    TxBulkPayload,
+    TxOperationOutcomeResponse,
 )
 from services.domain.match_result import (
     MatchProcessingStatus as DomainMatchProcessingStatus,
 )
 from services.domain.transaction import AccountRef, Category, Transaction
+from services.domain.tx_bulk import TxBulkJob, TxOperation, TxOperationOutcome
 
 
 def to_api_amount(amount: Decimal, decimals: int) -> float:
@@ -58,6 +63,40 @@ def map_category_to_api(cat: Category) -> SimplifiedCategory:
     return SimplifiedCategory(id=cat.id, name=cat.name)
 
 
+def map_bulk_payload_to_operations(payload: TxBulkPayload) -> list[TxOperation]:
+    return [
+        TxOperation(
+            transaction_id=operation.transaction_id,
+            category_id=operation.category_id,
+            tags=frozenset(tag.value for tag in operation.tags),
+        )
+        for operation in payload.operations
+    ]
+
+
+def map_operation_outcome_to_response(
+    outcome: TxOperationOutcome,
+) -> TxOperationOutcomeResponse:
+    return TxOperationOutcomeResponse(
+        transaction_id=outcome.transaction_id,
+        status=outcome.status,
+        reason=outcome.reason,
+    )
+
+
+def map_bulk_job_to_response(job: TxBulkJob) -> TxBulkJobResponse:
+    return TxBulkJobResponse(
+        id=job.id,
+        status=map_status(job.status),
+        total=job.total,
+        applied=job.applied,
+        failed=job.failed,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        results=[map_operation_outcome_to_response(result) for result in job.results],
+    )
+
+
 def _map_account_ref_to_api(
     account: AccountRef | None,
 ) -> SimplifiedAccountRef | None:
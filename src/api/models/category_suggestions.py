@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+from datetime import datetime
 from decimal import Decimal
 from typing import Literal
 
 from pydantic import BaseModel, Field
 
+from api.models.job_base import JobStatus
+
 
 class CategorySuggestionPreviewRequest(BaseModel):
     title: str
@@ -23,3 +26,16 @@ class CategorySuggestionDto(BaseModel):
 
 class CategorySuggestionsResponse(BaseModel):
     suggestions: list[CategorySuggestionDto]
+
+
+class BatchCategorySuggestionsResponse(BaseModel):
+    suggestions: dict[str, list[CategorySuggestionDto]]
+
+
+class SuggestionPrecomputeResponse(BaseModel):
+    status: JobStatus
+    revision: int | None
+    total: int
+    completed: int
+    started_at: datetime | None
+    finished_at: datetime | None
@@ -1,4 +1,4 @@
-from datetime import UTC, datetime
+from datetime import UTC, date, datetime
 from typing import Literal
 
 from pydantic import BaseModel, Field
@@ -36,6 +36,8 @@ class TransactionSnapshotRefreshResponse(BaseModel):
     expires_at: datetime
     transaction_count: int
     schema_version: int
+    start_date: date | None = None
+    end_date: date | None = None
     timestamp: datetime = Field(default_factory=lambda: datetime.now(UTC))
 
 
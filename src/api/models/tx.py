@@ -1,8 +1,11 @@
-from datetime import date
+from datetime import date, datetime
 from enum import StrEnum
-from typing import Literal
+from typing import Literal, Self
+from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
+
+from api.models.job_base import JobStatus
 
 
 class SimplifiedItem(BaseModel):
@@ -63,7 +66,10 @@ class ScreeningMonthResponse(BaseModel):
     month: int
     remaining: int
     transactions: list[SimplifiedTx]
-    categories: list[SimplifiedCategory]
+    # None when the client already holds the list identified by
+    # categories_version.
+    categories: list[SimplifiedCategory] | None
+    categories_version: str | None = None
 
 
 class TxTag(StrEnum):
@@ -76,3 +82,44 @@ class TxTag(StrEnum):
 class MatchProcessingStatus(StrEnum):
     NEW = "new"
     ALREADY_PROCESSED = "already_processed"
+
+
+class TxOperationPayload(BaseModel):
+    transaction_id: int
+    category_id: int | None = None
+    tags: list[TxTag] = Field(default_factory=list)
+
+    @model_validator(mode="after")
+    def _require_change(self) -> Self:
+        if self.category_id is None and not self.tags:
+            raise ValueError("category_id or tags is required")
+        return self
+
+
+class TxBulkPayload(BaseModel):
+    operations: list[TxOperationPayload] = Field(min_length=1)
+
+    @model_validator(mode="after")
+    def _unique_transactions(self) -> Self:
+        # Updates of one transaction would race; clients merge them instead.
+        ids = [operation.transaction_id for operation in self.operations]
+        if len(ids) != len(set(ids)):
+            raise ValueError("each transaction_id may appear only once")
+        return self
+
+
+class TxOperationOutcomeResponse(BaseModel):
+    transaction_id: int
+    status: Literal["success", "failed"]
+    reason: str | None = None
+
+
+class TxBulkJobResponse(BaseModel):
+    id: UUID
+    status: JobStatus
+    total: int
+    applied: int
+    failed: int
+    started_at: datetime
+    finished_at: datetime | None
+    results: list[TxOperationOutcomeResponse]
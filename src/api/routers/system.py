@@ -1,13 +1,22 @@
 import logging
-from datetime import timedelta
-
-from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from datetime import date, timedelta
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from api.deps_db import get_db
 from api.deps_services import (
     get_bootstrap_service,
+    get_category_catalog,
     get_transaction_snapshot_service,
 )
 from api.models.system import (
@@ -18,6 +27,7 @@ from api.models.system import (
     TransactionSnapshotStatusResponse,
     VersionResponse,
 )
+from services.category_catalog import CategoryCatalog
 from services.db.passwords import hash_password
 from services.guards import require_internal_api_key
 from services.snapshot import TransactionSnapshotService
@@ -111,16 +121,27 @@ async def transaction_snapshot_status(
     dependencies=[Depends(require_internal_api_key)],
 )
 async def refresh_transaction_snapshot(
+    start_date: date | None = Query(None),
+    end_date: date | None = Query(None),
     snapshot_service: TransactionSnapshotService = Depends(
         get_transaction_snapshot_service
     ),
 ):
-    snapshot = await snapshot_service.refresh_snapshot()
+    if start_date is not None and end_date is not None and start_date > end_date:
+        raise HTTPException(
+            status_code=422, detail="start_date must not be after end_date"
+        )
+    if start_date is None and end_date is None:
+        snapshot = await snapshot_service.refresh_snapshot()
+    else:
+        snapshot = await snapshot_service.refresh_range(start_date, end_date)
     logger.info(
         "Transaction snapshot refreshed via internal endpoint",
         extra={
             "transaction_count": snapshot.transaction_count,
             "schema_version": snapshot.schema_version,
+            "start_date": None if start_date is None else start_date.isoformat(),
+            "end_date": None if end_date is None else end_date.isoformat(),
         },
     )
     return TransactionSnapshotRefreshResponse(
@@ -132,9 +153,22 @@ async def refresh_transaction_snapshot(
         + timedelta(seconds=snapshot_service.max_age_seconds),
         transaction_count=snapshot.transaction_count,
         schema_version=snapshot.schema_version,
+        start_date=start_date,
+        end_date=end_date,
     )
 
 
+@router.post(
+    "/category-catalog/invalidate",
+    status_code=204,
+    dependencies=[Depends(require_internal_api_key)],
+)
+async def invalidate_category_catalog(
+    catalog: CategoryCatalog = Depends(get_category_catalog),
+):
+    catalog.invalidate()
+
+
 @router.get("/bootstrap/status", response_model=BootstrapResponse)
 def bootstrap_status(
     service: BootstrapService = Depends(get_bootstrap_service),
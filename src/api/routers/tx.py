@@ -3,14 +3,29 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from api.deps_runtime import get_tx_application_runtime
-from api.deps_services import get_category_suggestion_service
+from api.deps_services import (
+    get_category_suggestion_precomputer,
+    get_category_suggestion_service,
+)
+from api.mappers.category_suggestions import (
+    map_precompute_progress_to_response,
+    map_suggestion_to_dto,
+)
+from api.mappers.tx import map_bulk_job_to_response, map_bulk_payload_to_operations
 from api.mappers.tx_stats import map_tx_state_to_response
 from api.models.category_suggestions import (
-    CategorySuggestionDto,
+    BatchCategorySuggestionsResponse,
     CategorySuggestionsResponse,
+    SuggestionPrecomputeResponse,
+)
+from api.models.tx import (
+    ScreeningMonthResponse,
+    TxBulkJobResponse,
+    TxBulkPayload,
+    TxTag,
 )
-from api.models.tx import ScreeningMonthResponse, TxTag
 from api.models.tx_stats import TxMetricsStatusResponse
+from services.categorization.precompute import CategorySuggestionPrecomputer
 from services.categorization.service import CategorySuggestionService
 from services.exceptions import ExternalServiceFailed, TransactionNotFound
 from services.guards import require_active_user
@@ -39,10 +54,23 @@ router = APIRouter(
 async def get_screening_month(
     year: int = Query(..., ge=2000, le=2100),
     month: int = Query(..., ge=1, le=12),
+    live: bool = Query(
+        False, description="Read from Firefly instead of the cached snapshot"
+    ),
+    categories_version: str | None = Query(
+        None,
+        description="Version of the category list the client already holds; "
+        "categories are omitted from the response when it is still current",
+    ),
     svc: TxApplicationService = Depends(get_tx_application_runtime),
 ):
     try:
-        response = await svc.get_screening_month(year=year, month=month)
+        response = await svc.get_screening_month(
+            year=year,
+            month=month,
+            live=live,
+            categories_version=categories_version,
+        )
     except ExternalServiceFailed as e:
         raise HTTPException(status_code=502, detail=str(e)) from e
     if response is None:
@@ -80,6 +108,37 @@ async def apply_tag(
         raise HTTPException(status_code=502, detail=str(e)) from e
 
 
+@router.post(
+    "/bulk",
+    response_model=TxBulkJobResponse,
+)
+async def start_bulk_job(
+    payload: TxBulkPayload,
+    svc: TxApplicationService = Depends(get_tx_application_runtime),
+):
+    job = await svc.start_bulk_job(operations=map_bulk_payload_to_operations(payload))
+    return map_bulk_job_to_response(job)
+
+
+@router.get(
+    "/bulk-jobs/{job_id}",
+    response_model=TxBulkJobResponse,
+)
+async def get_bulk_job(
+    job_id: str,
+    svc: TxApplicationService = Depends(get_tx_application_runtime),
+):
+    try:
+        parsed_job_id = UUID(job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid job_id") from e
+
+    job = svc.get_bulk_job(job_id=parsed_job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return map_bulk_job_to_response(job)
+
+
 @router.get(
     "/statistics",
     response_model=TxMetricsStatusResponse,
@@ -110,18 +169,63 @@ async def suggest_category(
         raise HTTPException(status_code=404, detail=str(exc)) from exc
 
     return CategorySuggestionsResponse(
-        suggestions=[
-            CategorySuggestionDto(
-                category_id=suggestion.category_id,
-                category_name=suggestion.category_name,
-                score=suggestion.score,
-                reason=suggestion.reason,
-            )
-            for suggestion in suggestions
-        ]
+        suggestions=[map_suggestion_to_dto(suggestion) for suggestion in suggestions]
+    )
+
+
+@router.get(
+    "/category-suggestions",
+    response_model=BatchCategorySuggestionsResponse,
+    responses={
+        422: {"description": "Neither transaction_ids nor year and month given"},
+    },
+)
+async def suggest_categories_batch(
+    transaction_ids: list[int] | None = Query(None, max_length=500),
+    year: int | None = Query(None, ge=2000, le=2100),
+    month: int | None = Query(None, ge=1, le=12),
+    limit: int = Query(3, ge=1, le=10),
+    user_id: UUID = Depends(require_active_user),
+    service: CategorySuggestionService = Depends(get_category_suggestion_service),
+):
+    if transaction_ids:
+        suggestions = await service.suggest_for_transaction_ids(
+            user_id=str(user_id),
+            transaction_ids=[str(tx_id) for tx_id in transaction_ids],
+            limit=limit,
+        )
+    elif year is not None and month is not None:
+        suggestions = await service.suggest_for_month(
+            user_id=str(user_id), year=year, month=month, limit=limit
+        )
+    else:
+        raise HTTPException(
+            status_code=422, detail="transaction_ids or year and month are required"
+        )
+
+    return BatchCategorySuggestionsResponse(
+        suggestions={
+            tx_id: [map_suggestion_to_dto(suggestion) for suggestion in items]
+            for tx_id, items in suggestions.items()
+        }
     )
 
 
+@router.get(
+    "/category-suggestions/precompute",
+    response_model=SuggestionPrecomputeResponse,
+    responses={404: {"description": "Suggestion precompute is disabled"}},
+)
+async def get_suggestion_precompute_progress(
+    precomputer: CategorySuggestionPrecomputer | None = Depends(
+        get_category_suggestion_precomputer
+    ),
+):
+    if precomputer is None:
+        raise HTTPException(status_code=404, detail="Suggestion precompute is disabled")
+    return map_precompute_progress_to_response(precomputer.progress)
+
+
 @router.post(
     "/statistics/refresh",
     response_model=TxMetricsStatusResponse,
@@ -4,6 +4,11 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 
+from api.deps_services import (
+    get_category_suggestion_precomputer,
+    get_snapshot_store,
+    get_transaction_snapshot_service,
+)
 from api.routers.allegro import router as allegro_router
 from api.routers.auth import router as auth_router
 from api.routers.blik_files import router as blik_router
@@ -15,11 +20,16 @@ from api.routers.tx import router as tx_router
 from api.routers.user_secrets import router as user_secrets_router
 from api.routers.users import router as users_router
 from middleware import register_middlewares
+from services.categorization import (
+    CategorySuggestionPrecomputer,
+    shutdown_worker_pools,
+)
 from services.db.engine import (
     create_engine_from_url,
     create_session_factory,
 )
 from services.db.init import DatabaseBootstrap
+from services.snapshot import SnapshotRefreshScheduler, SnapshotStore
 from settings import settings
 from utils.logger import setup_logging
 
@@ -38,7 +48,13 @@ def get_version() -> str:
 # ==================================================
 
 
-def create_app(*, bootstrap: DatabaseBootstrap | None = None) -> FastAPI:
+def create_app(
+    *,
+    bootstrap: DatabaseBootstrap | None = None,
+    snapshot_scheduler: SnapshotRefreshScheduler | None = None,
+    suggestion_precomputer: CategorySuggestionPrecomputer | None = None,
+    snapshot_store: SnapshotStore | None = None,
+) -> FastAPI:
     version = get_version()
     app = FastAPI(
         title="Firefly III Toolkit",
@@ -54,7 +70,18 @@ def create_app(*, bootstrap: DatabaseBootstrap | None = None) -> FastAPI:
     async def lifespan(app: FastAPI):
         if bootstrap:
             bootstrap.run()
-        yield
+        if snapshot_scheduler:
+            snapshot_scheduler.start()
+        try:
+            yield
+        finally:
+            if snapshot_scheduler:
+                await snapshot_scheduler.stop()
+            if suggestion_precomputer:
+                await suggestion_precomputer.stop()
+            if snapshot_store:
+                await snapshot_store.flush()
+            shutdown_worker_pools()
 
     app.router.lifespan_context = lifespan
 
@@ -83,7 +110,23 @@ def create_production_app() -> FastAPI:
     engine = create_engine_from_url(settings.database_url)
     session_factory = create_session_factory(engine)
 
-    app = create_app(bootstrap=DatabaseBootstrap(engine))
+    snapshot_scheduler = None
+    if settings.TRANSACTION_SNAPSHOT_REFRESH_INTERVAL_SECONDS > 0:
+        snapshot_scheduler = SnapshotRefreshScheduler(
+            get_transaction_snapshot_service(),
+            settings.TRANSACTION_SNAPSHOT_REFRESH_INTERVAL_SECONDS,
+            jitter_seconds=settings.TRANSACTION_SNAPSHOT_REFRESH_JITTER_SECONDS,
+            max_backoff_seconds=(
+                settings.TRANSACTION_SNAPSHOT_REFRESH_MAX_BACKOFF_SECONDS
+            ),
+        )
+
+    app = create_app(
+        bootstrap=DatabaseBootstrap(engine),
+        snapshot_scheduler=snapshot_scheduler,
+        suggestion_precomputer=get_category_suggestion_precomputer(),
+        snapshot_store=get_snapshot_store(),
+    )
     app.state.session_factory = session_factory
 
     return app
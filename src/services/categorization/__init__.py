@@ -1,25 +1,49 @@
 from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.corpus import CategorizationCorpus
+from services.categorization.exact_history import ExactHistoryTable
 from services.categorization.models import (
     CategorizationQuery,
     TransactionCategorizationQuery,
 )
+from services.categorization.naive_bayes import NaiveBayesCategoryClassifier
+from services.categorization.precompute import (
+    CategorySuggestionPrecomputer,
+    PrecomputedCategorySuggestionService,
+)
 from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.categorization.process_pool import (
+    ProcessPoolSimilarityEngine,
+    shutdown_worker_pools,
+)
 from services.categorization.service import DefaultCategorySuggestionService
 from services.categorization.similarity_engine import (
+    TransactionSimilarityEngine,
     WeightedTransactionSimilarityEngine,
 )
 from services.categorization.snapshot_provider import (
     CategorizationSnapshotProvider,
     SnapshotCategorizationProvider,
 )
+from services.categorization.tfidf_engine import TfidfTransactionSimilarityEngine
+from services.categorization.token_index import CategorizationTokenIndex
 
 __all__ = [
     "AmountBucketizer",
+    "CategorizationCorpus",
     "CategorizationSnapshotProvider",
     "CategorizationQuery",
     "CategorizationTextPreprocessor",
+    "CategorizationTokenIndex",
+    "CategorySuggestionPrecomputer",
     "DefaultCategorySuggestionService",
+    "ExactHistoryTable",
+    "NaiveBayesCategoryClassifier",
+    "PrecomputedCategorySuggestionService",
+    "ProcessPoolSimilarityEngine",
     "SnapshotCategorizationProvider",
+    "TfidfTransactionSimilarityEngine",
     "TransactionCategorizationQuery",
+    "TransactionSimilarityEngine",
     "WeightedTransactionSimilarityEngine",
+    "shutdown_worker_pools",
 ]
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from collections.abc import Hashable, Iterable, Iterator, Sequence
+from dataclasses import dataclass
+from typing import overload
+
+from services.categorization.features import DocumentFeatures, document_features
+from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.domain.category_suggestion import TransactionCategorizationDocument
+
+
+@dataclass(slots=True, frozen=True)
+class CorpusEdit:
+    """A change to a single document of a ``CategorizationCorpus``.
+
+    ``removed`` left and ``added`` entered ``position``; both are set when a
+    document is re-labelled or otherwise replaced. A removal fills the gap
+    with the last document (``moved``, previously at ``moved_from``), so
+    positions stay dense.
+    """
+
+    position: int
+    removed: TransactionCategorizationDocument | None = None
+    added: TransactionCategorizationDocument | None = None
+    moved: TransactionCategorizationDocument | None = None
+    moved_from: int | None = None
+
+
+@dataclass(slots=True)
+class _FeatureCache:
+    preprocessor: CategorizationTextPreprocessor
+    features: list[DocumentFeatures]
+    edit_count: int
+
+
+class CategorizationCorpus(Sequence[TransactionCategorizationDocument]):
+    """Candidate documents built from one snapshot revision.
+
+    ``revision`` identifies the snapshot the documents came from, so engines
+    can keep per-corpus structures (such as the token index) until it changes.
+    Normalized text features are computed on first use and then shared by
+    every query scored against this corpus.
+
+    Single documents can be added, replaced or removed in place. Each change
+    is recorded as a ``CorpusEdit``; per-revision structures replay
+    ``edits_since`` their last update instead of being rebuilt.
+    """
+
+    __slots__ = ("_documents", "_edits", "_features", "_positions", "revision")
+
+    def __init__(
+        self,
+        documents: Iterable[TransactionCategorizationDocument],
+        *,
+        revision: Hashable | None = None,
+    ) -> None:
+        self._documents = list(documents)
+        self._positions: dict[str, int] | None = None
+        self._edits: list[CorpusEdit] = []
+        self._features: _FeatureCache | None = None
+        self.revision = revision
+
+    @property
+    def edit_count(self) -> int:
+        return len(self._edits)
+
+    def edits_since(self, edit_count: int) -> Sequence[CorpusEdit]:
+        return tuple(self._edits[edit_count:])
+
+    def upsert(self, document: TransactionCategorizationDocument) -> bool:
+        """Add ``document`` or replace the one with its transaction id.
+
+        Returns False when an identical document is already in place.
+        """
+        position = self._position_map().get(document.transaction_id)
+        if position is None:
+            self.apply(CorpusEdit(position=len(self._documents), added=document))
+            return True
+        removed = self._documents[position]
+        if removed == document:
+            return False
+        self.apply(CorpusEdit(position=position, removed=removed, added=document))
+        return True
+
+    def remove(self, transaction_id: str) -> bool:
+        position = self._position_map().get(transaction_id)
+        if position is None:
+            return False
+        last = len(self._documents) - 1
+        self.apply(
+            CorpusEdit(
+                position=position,
+                removed=self._documents[position],
+                moved=self._documents[last] if position != last else None,
+                moved_from=last if position != last else None,
+            )
+        )
+        return True
+
+    def apply(self, edit: CorpusEdit) -> None:
+        """Apply an edit made by ``upsert``/``remove`` on a copy of this corpus."""
+        positions = self._position_map()
+        if edit.removed is not None:
+            del positions[edit.removed.transaction_id]
+        if edit.moved is not None:
+            self._documents[edit.position] = edit.moved
+            positions[edit.moved.transaction_id] = edit.position
+        if edit.added is not None:
+            if edit.position == len(self._documents):
+                self._documents.append(edit.added)
+            else:
+                self._documents[edit.position] = edit.added
+            positions[edit.added.transaction_id] = edit.position
+        elif edit.removed is not None:
+            self._documents.pop()
+        self._edits.append(edit)
+
+    def features(
+        self, preprocessor: CategorizationTextPreprocessor
+    ) -> Sequence[DocumentFeatures]:
+        """Per-document features, in corpus order, for ``preprocessor``."""
+        cached = self._features
+        if cached is None or cached.preprocessor is not preprocessor:
+            cached = _FeatureCache(
+                preprocessor=preprocessor,
+                features=[
+                    document_features(preprocessor, document)
+                    for document in self._documents
+                ],
+                edit_count=len(self._edits),
+            )
+            self._features = cached
+        elif cached.edit_count < len(self._edits):
+            for edit in self._edits[cached.edit_count :]:
+                self._apply_to_features(cached.features, edit, preprocessor)
+            cached.edit_count = len(self._edits)
+        return cached.features
+
+    def _position_map(self) -> dict[str, int]:
+        if self._positions is None:
+            self._positions = {
+                document.transaction_id: position
+                for position, document in enumerate(self._documents)
+            }
+        return self._positions
+
+    @staticmethod
+    def _apply_to_features(
+        features: list[DocumentFeatures],
+        edit: CorpusEdit,
+        preprocessor: CategorizationTextPreprocessor,
+    ) -> None:
+        if edit.moved_from is not None:
+            features[edit.position] = features[edit.moved_from]
+        if edit.added is not None:
+            added = document_features(preprocessor, edit.added)
+            if edit.position == len(features):
+                features.append(added)
+            else:
+                features[edit.position] = added
+        elif edit.removed is not None:
+            features.pop()
+
+    @overload
+    def __getitem__(self, index: int) -> TransactionCategorizationDocument: ...
+
+    @overload
+    def __getitem__(
+        self, index: slice
+    ) -> Sequence[TransactionCategorizationDocument]: ...
+
+    def __getitem__(
+        self, index: int | slice
+    ) -> (
+        TransactionCategorizationDocument | Sequence[TransactionCategorizationDocument]
+    ):
+        return self._documents[index]
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __iter__(self) -> Iterator[TransactionCategorizationDocument]:
+        return iter(self._documents)
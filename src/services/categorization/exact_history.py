@@ -0,0 +1,194 @@
+from __future__ import annotations
+
+from collections import Counter
+from collections.abc import Hashable, Sequence
+from dataclasses import dataclass
+
+from services.categorization.corpus import CategorizationCorpus, CorpusEdit
+from services.categorization.features import DocumentFeatures, document_features
+from services.categorization.models import TransactionCategorizationQuery
+from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.domain.category_suggestion import (
+    CategorySuggestion,
+    TransactionCategorizationDocument,
+)
+
+# (field name, normalized text)
+type HistoryKey = tuple[str, str]
+
+EXACT_HISTORY_REASONS = {
+    "merchant": "same merchant in exact-history table",
+    "title": "same title in exact-history table",
+}
+
+
+def history_keys(features: DocumentFeatures) -> tuple[HistoryKey, ...]:
+    """Exact-match keys of a document, most specific field first."""
+    keys: list[HistoryKey] = []
+    if features.merchant.normalized:
+        keys.append(("merchant", features.merchant.normalized))
+    if features.title.normalized:
+        keys.append(("title", features.title.normalized))
+    return tuple(keys)
+
+
+@dataclass(slots=True)
+class _Histograms:
+    counts: dict[HistoryKey, Counter[str]]
+    category_names: dict[str, str]
+    # transaction id -> (category id, keys), to leave a query's own row out.
+    labels: dict[str, tuple[str, tuple[HistoryKey, ...]]]
+
+
+class ExactHistoryTable:
+    """Category histograms for exact normalized merchants and titles.
+
+    Built once per corpus revision from the categorized history. When the
+    query's merchant (or else its title) was filed under one category in at
+    least ``min_count`` documents and ``min_share`` of all documents with that
+    key, ``suggest`` answers from the histogram without a fuzzy scan.
+    In-place corpus edits are replayed onto the histograms.
+    """
+
+    def __init__(
+        self,
+        *,
+        preprocessor: CategorizationTextPreprocessor,
+        min_count: int = 2,
+        min_share: float = 0.8,
+    ) -> None:
+        self._preprocessor = preprocessor
+        self._min_count = min_count
+        self._min_share = min_share
+        self._cached: tuple[Hashable, _Histograms] | None = None
+        self._cached_edits = 0
+
+    def suggest(
+        self,
+        query: TransactionCategorizationQuery,
+        candidates: Sequence[TransactionCategorizationDocument],
+        *,
+        limit: int,
+    ) -> list[CategorySuggestion] | None:
+        """Suggestions for a dominant exact key, or ``None`` to fall back."""
+        histograms = self._histograms_for(candidates)
+        if not histograms.counts:
+            return None
+        own = (
+            histograms.labels.get(query.transaction_id)
+            if query.transaction_id is not None
+            else None
+        )
+        for key in history_keys(document_features(self._preprocessor, query)):
+            counts = histograms.counts.get(key)
+            if counts is None:
+                continue
+            if own is not None and key in own[1]:
+                counts = counts.copy()
+                counts[own[0]] -= 1
+            suggestions = self._dominant(key, counts, histograms, limit)
+            if suggestions is not None:
+                return suggestions
+        return None
+
+    def _dominant(
+        self,
+        key: HistoryKey,
+        counts: Counter[str],
+        histograms: _Histograms,
+        limit: int,
+    ) -> list[CategorySuggestion] | None:
+        total = sum(counts.values())
+        if total <= 0:
+            return None
+        ranked = sorted(
+            ((category_id, count) for category_id, count in counts.items() if count),
+            key=lambda item: (
+                -item[1],
+                histograms.category_names[item[0]].lower(),
+                item[0],
+            ),
+        )
+        top_count = ranked[0][1]
+        if top_count < self._min_count or top_count / total < self._min_share:
+            return None
+        return [
+            CategorySuggestion(
+                category_id=category_id,
+                category_name=histograms.category_names[category_id],
+                score=round(count / total, 4),
+                reason=EXACT_HISTORY_REASONS[key[0]],
+            )
+            for category_id, count in ranked[:limit]
+        ]
+
+    def _histograms_for(
+        self, candidates: Sequence[TransactionCategorizationDocument]
+    ) -> _Histograms:
+        if not isinstance(candidates, CategorizationCorpus):
+            return self._build(
+                candidates,
+                [document_features(self._preprocessor, doc) for doc in candidates],
+            )
+        revision = candidates.revision
+        if revision is None:
+            return self._build(candidates, candidates.features(self._preprocessor))
+        if self._cached is None or self._cached[0] != revision:
+            self._cached = (
+                revision,
+                self._build(candidates, candidates.features(self._preprocessor)),
+            )
+        elif self._cached_edits < candidates.edit_count:
+            for edit in candidates.edits_since(self._cached_edits):
+                self._apply(self._cached[1], edit)
+        self._cached_edits = candidates.edit_count
+        return self._cached[1]
+
+    def _build(
+        self,
+        documents: Sequence[TransactionCategorizationDocument],
+        features: Sequence[DocumentFeatures],
+    ) -> _Histograms:
+        histograms = _Histograms(counts={}, category_names={}, labels={})
+        for document, document_keys in zip(
+            documents, map(history_keys, features), strict=True
+        ):
+            self._add(histograms, document, document_keys)
+        return histograms
+
+    def _apply(self, histograms: _Histograms, edit: CorpusEdit) -> None:
+        # Moves only change positions, which the histograms do not track.
+        if edit.removed is not None:
+            self._discard(histograms, edit.removed)
+        if edit.added is not None:
+            self._add(
+                histograms,
+                edit.added,
+                history_keys(document_features(self._preprocessor, edit.added)),
+            )
+
+    def _add(
+        self,
+        histograms: _Histograms,
+        document: TransactionCategorizationDocument,
+        keys: tuple[HistoryKey, ...],
+    ) -> None:
+        for key in keys:
+            histograms.counts.setdefault(key, Counter())[document.category_id] += 1
+        histograms.category_names[document.category_id] = document.category_name
+        histograms.labels[document.transaction_id] = (document.category_id, keys)
+
+    def _discard(
+        self, histograms: _Histograms, document: TransactionCategorizationDocument
+    ) -> None:
+        label = histograms.labels.pop(document.transaction_id, None)
+        if label is None:
+            return
+        category_id, keys = label
+        for key in keys:
+            counts = histograms.counts[key]
+            counts[category_id] -= 1
+            if counts[category_id] <= 0:
+                del counts[category_id]
+            if not counts:
+                del histograms.counts[key]
@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from services.categorization.models import TransactionCategorizationQuery
+from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.domain.category_suggestion import TransactionCategorizationDocument
+
+
+@dataclass(slots=True, frozen=True)
+class TextFeatures:
+    normalized: str
+    tokens: frozenset[str]
+
+
+@dataclass(slots=True, frozen=True)
+class DocumentFeatures:
+    """Normalized text of a document or query, computed once and reused.
+
+    Normalization (NFKD, transliteration, regexes) dominated the per-pair cost
+    when it ran for both sides of every comparison.
+    """
+
+    transaction_id: str | None
+    title: TextFeatures
+    merchant: TextFeatures
+    notes: TextFeatures
+    amount_bucket: str
+    source_type: str
+
+
+_EMPTY_TEXT = TextFeatures(normalized="", tokens=frozenset())
+
+
+def text_features(
+    preprocessor: CategorizationTextPreprocessor, value: str | None
+) -> TextFeatures:
+    normalized = preprocessor.normalize(value)
+    if not normalized:
+        return _EMPTY_TEXT
+    return TextFeatures(
+        normalized=normalized, tokens=frozenset(preprocessor.tokens(value))
+    )
+
+
+def document_features(
+    preprocessor: CategorizationTextPreprocessor,
+    item: TransactionCategorizationQuery | TransactionCategorizationDocument,
+) -> DocumentFeatures:
+    return DocumentFeatures(
+        transaction_id=item.transaction_id,
+        title=text_features(preprocessor, item.title),
+        merchant=text_features(preprocessor, item.merchant),
+        notes=text_features(preprocessor, item.notes),
+        amount_bucket=item.amount_bucket,
+        source_type=item.source_type,
+    )
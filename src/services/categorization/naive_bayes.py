@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from collections.abc import Hashable, Sequence
+from dataclasses import dataclass
+
+from services.categorization.corpus import CategorizationCorpus, CorpusEdit
+from services.categorization.features import DocumentFeatures, document_features
+from services.categorization.models import TransactionCategorizationQuery
+from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.domain.category_suggestion import (
+    CategorySuggestion,
+    TransactionCategorizationDocument,
+)
+
+# (field name, token), or ("amount", amount bucket)
+type ClassifierFeature = tuple[str, str]
+
+NAIVE_BAYES_REASON = "words typical of this category in previous transactions"
+TEXT_FIELDS = ("title", "merchant", "notes")
+
+
+def classifier_features(features: DocumentFeatures) -> tuple[ClassifierFeature, ...]:
+    """Field-qualified tokens and the amount bucket of a document."""
+    keys: list[ClassifierFeature] = [
+        (field, token)
+        for field in TEXT_FIELDS
+        for token in sorted(getattr(features, field).tokens)
+    ]
+    keys.append(("amount", features.amount_bucket))
+    return tuple(keys)
+
+
+@dataclass(slots=True)
+class _Model:
+    # feature -> category id -> number of documents with that feature
+    feature_counts: dict[ClassifierFeature, Counter[str]]
+    # category id -> number of features over all its documents
+    feature_totals: Counter[str]
+    document_counts: Counter[str]
+    category_names: dict[str, str]
+    # transaction id -> (category id, features), to leave a query's own row out.
+    labels: dict[str, tuple[str, tuple[ClassifierFeature, ...]]]
+
+
+class NaiveBayesCategoryClassifier:
+    """Multinomial Naive Bayes over title, merchant and notes tokens.
+
+    Trained in one pass per corpus revision into per-category feature counts;
+    in-place corpus edits are replayed onto the counts. Scoring a query costs
+    O(query features x categories) regardless of the history size. Counts use
+    additive (``alpha``) smoothing and ``suggest`` returns posterior
+    probabilities of at least ``min_probability``. Queries without a single
+    token seen in the history get no suggestions, since only the prior and
+    the amount bucket would be left to decide.
+    """
+
+    def __init__(
+        self,
+        *,
+        preprocessor: CategorizationTextPreprocessor,
+        alpha: float = 1.0,
+        min_probability: float = 0.01,
+    ) -> None:
+        self._preprocessor = preprocessor
+        self._alpha = alpha
+        self._min_probability = min_probability
+        self._cached: tuple[Hashable, _Model] | None = None
+        self._cached_edits = 0
+
+    def suggest(
+        self,
+        query: TransactionCategorizationQuery,
+        candidates: Sequence[TransactionCategorizationDocument],
+        *,
+        limit: int,
+    ) -> list[CategorySuggestion]:
+        model = self._model_for(candidates)
+        features = classifier_features(document_features(self._preprocessor, query))
+        own = (
+            model.labels.get(query.transaction_id)
+            if query.transaction_id is not None
+            else None
+        )
+        own_category, own_features = own if own is not None else (None, ())
+        own_counts = Counter(own_features)
+
+        document_counts = model.document_counts.copy()
+        feature_totals = model.feature_totals.copy()
+        if own_category is not None:
+            document_counts[own_category] -= 1
+            feature_totals[own_category] -= len(own_features)
+        categories = [
+            category_id for category_id, count in document_counts.items() if count > 0
+        ]
+        if not categories:
+            return []
+
+        alpha = self._alpha
+        vocabulary = len(model.feature_counts)
+        document_total = sum(document_counts[category_id] for category_id in categories)
+        log_alpha = math.log(alpha)
+        scores = {
+            category_id: math.log(
+                (document_counts[category_id] + alpha)
+                / (document_total + alpha * len(categories))
+            )
+            - len(features)
+            * (math.log(feature_totals[category_id] + alpha * vocabulary) - log_alpha)
+            for category_id in categories
+        }
+        known_text = False
+        for feature in features:
+            counts = model.feature_counts.get(feature)
+            if counts is None:
+                continue
+            for category_id, count in counts.items():
+                if category_id == own_category:
+                    count -= own_counts[feature]
+                if count <= 0 or category_id not in scores:
+                    continue
+                if feature[0] != "amount":
+                    known_text = True
+                scores[category_id] += math.log(count + alpha) - log_alpha
+        if not known_text:
+            return []
+
+        best = max(scores.values())
+        weights = {
+            category_id: math.exp(score - best) for category_id, score in scores.items()
+        }
+        total = sum(weights.values())
+        suggestions = [
+            CategorySuggestion(
+                category_id=category_id,
+                category_name=model.category_names[category_id],
+                score=round(weight / total, 4),
+                reason=NAIVE_BAYES_REASON,
+            )
+            for category_id, weight in weights.items()
+            if weight / total >= self._min_probability
+        ]
+        suggestions.sort(
+            key=lambda suggestion: (
+                -suggestion.score,
+                suggestion.category_name.lower(),
+                suggestion.category_id,
+            )
+        )
+        return suggestions[:limit]
+
+    def _model_for(
+        self, candidates: Sequence[TransactionCategorizationDocument]
+    ) -> _Model:
+        if not isinstance(candidates, CategorizationCorpus):
+            return self._train(
+                candidates,
+                [document_features(self._preprocessor, doc) for doc in candidates],
+            )
+        revision = candidates.revision
+        if revision is None:
+            return self._train(candidates, candidates.features(self._preprocessor))
+        if self._cached is None or self._cached[0] != revision:
+            self._cached = (
+                revision,
+                self._train(candidates, candidates.features(self._preprocessor)),
+            )
+        elif self._cached_edits < candidates.edit_count:
+            for edit in candidates.edits_since(self._cached_edits):
+                self._apply(self._cached[1], edit)
+        self._cached_edits = candidates.edit_count
+        return self._cached[1]
+
+    def _train(
+        self,
+        documents: Sequence[TransactionCategorizationDocument],
+        features: Sequence[DocumentFeatures],
+    ) -> _Model:
+        model = _Model(
+            feature_counts={},
+            feature_totals=Counter(),
+            document_counts=Counter(),
+            category_names={},
+            labels={},
+        )
+        for document, doc_features in zip(documents, features, strict=True):
+            self._add(model, document, classifier_features(doc_features))
+        return model
+
+    def _apply(self, model: _Model, edit: CorpusEdit) -> None:
+        # Moves only change positions, which the model does not track.
+        if edit.removed is not None:
+            self._discard(model, edit.removed)
+        if edit.added is not None:
+            self._add(
+                model,
+                edit.added,
+                classifier_features(document_features(self._preprocessor, edit.added)),
+            )
+
+    def _add(
+        self,
+        model: _Model,
+        document: TransactionCategorizationDocument,
+        features: tuple[ClassifierFeature, ...],
+    ) -> None:
+        category_id = document.category_id
+        for feature in features:
+            model.feature_counts.setdefault(feature, Counter())[category_id] += 1
+        model.feature_totals[category_id] += len(features)
+        model.document_counts[category_id] += 1
+        model.category_names[category_id] = document.category_name
+        model.labels[document.transaction_id] = (category_id, features)
+
+    def _discard(
+        self, model: _Model, document: TransactionCategorizationDocument
+    ) -> None:
+        label = model.labels.pop(document.transaction_id, None)
+        if label is None:
+            return
+        category_id, features = label
+        for feature in features:
+            counts = model.feature_counts[feature]
+            counts[category_id] -= 1
+            if counts[category_id] <= 0:
+                del counts[category_id]
+            if not counts:
+                del model.feature_counts[feature]
+        model.feature_totals[category_id] -= len(features)
+        model.document_counts[category_id] -= 1
+        if model.document_counts[category_id] <= 0:
+            del model.document_counts[category_id]
+            del model.feature_totals[category_id]
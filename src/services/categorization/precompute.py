@@ -0,0 +1,357 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections.abc import Sequence
+from contextlib import suppress
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from itertools import islice
+
+from anyio import to_thread
+
+from services.categorization.models import CategorizationQuery
+from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.categorization.service import CategorySuggestionService
+from services.categorization.snapshot_provider import CategorizableSelector
+from services.domain.category_suggestion import (
+    CategorySuggestion,
+    SuggestionPrecomputeProgress,
+)
+from services.domain.job_base import JobStatus
+from services.domain.transaction import Transaction
+from services.snapshot.models import TransactionSnapshot
+from services.snapshot.service import TransactionSnapshotService
+
+logger = logging.getLogger(__name__)
+
+# Background runs have no requesting user; the snapshot is not user-partitioned.
+PRECOMPUTE_USER_ID = "suggestion-precompute"
+
+
+@dataclass(slots=True)
+class _RescoreIndex:
+    """What a write-through patch is checked against to find stale results."""
+
+    categorizable: set[int]
+    # normalized title/merchant token -> categorizable transaction ids
+    tokens: dict[str, set[int]]
+    # categorized transaction id -> category id
+    categories: dict[int, str]
+
+
+class CategorySuggestionPrecomputer:
+    """Computes suggestions for every categorizable transaction in the background.
+
+    ``on_snapshot`` is meant to be a snapshot listener. Each stored refresh
+    cancels the run for the previous snapshot and starts one for the new
+    snapshot, in batches of ``batch_size`` transactions. Results are served
+    for the snapshot revision in ``progress.revision``.
+
+    Registered as a transaction update observer, it rescores only what a
+    write-through patch (e.g. an applied category) can change: transactions
+    sharing a title or merchant word with the patched one, and those whose
+    suggestions name its previous or new category. Their results are dropped
+    (lookups fall back to live scoring) and they are queued ahead of the rest;
+    every other result moves on to the patched revision. Words the
+    preprocessor splits differently (the fuzzy matches of the engines) are
+    not traced, so such results stay as they were until the next refresh.
+
+    Batches are scored on a worker thread, one at a time, each in its own
+    event loop, so request handling keeps the loop meanwhile. That is why
+    ``suggestion_service`` must not be the one serving requests: it needs its
+    own provider (with ``stored_snapshot_only``) and engines.
+    """
+
+    def __init__(
+        self,
+        *,
+        snapshot_service: TransactionSnapshotService,
+        suggestion_service: CategorySuggestionService,
+        select_categorizable: CategorizableSelector,
+        preprocessor: CategorizationTextPreprocessor | None = None,
+        limit: int = 3,
+        batch_size: int = 50,
+    ) -> None:
+        self._snapshot_service = snapshot_service
+        self._suggestion_service = suggestion_service
+        self._select_categorizable = select_categorizable
+        self._preprocessor = preprocessor or CategorizationTextPreprocessor()
+        self.limit = limit
+        self._batch_size = max(1, batch_size)
+        self._snapshot: TransactionSnapshot | None = None
+        self._suggestions: dict[int, Sequence[CategorySuggestion]] = {}
+        # Transaction ids still to (re)score, in order; a dict for O(1) moves.
+        self._pending: dict[int, None] = {}
+        self._index: _RescoreIndex | None = None
+        self._task: asyncio.Task[None] | None = None
+        # A cancelled run's batch still finishes on its thread.
+        self._scoring_lock = threading.Lock()
+        self.progress = SuggestionPrecomputeProgress(status=JobStatus.PENDING)
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def on_snapshot(self, snapshot: TransactionSnapshot) -> None:
+        if self._task is not None:
+            self._task.cancel()
+        self._snapshot = snapshot
+        self._suggestions = {}
+        self._pending = {}
+        self._index = None
+        self.progress = SuggestionPrecomputeProgress(
+            status=JobStatus.RUNNING,
+            revision=snapshot.revision,
+            started_at=datetime.now(UTC),
+        )
+        self._start(snapshot)
+
+    async def lookup(
+        self, transaction_id: int, *, limit: int
+    ) -> Sequence[CategorySuggestion] | None:
+        """Precomputed suggestions, or ``None`` when they must be computed."""
+        if limit > self.limit or self._snapshot is None:
+            return None
+        snapshot = await self._snapshot_service.get_snapshot()
+        if (
+            snapshot is not self._snapshot
+            or snapshot.revision != self.progress.revision
+        ):
+            return None
+        suggestions = self._suggestions.get(transaction_id)
+        return None if suggestions is None else suggestions[:limit]
+
+    async def on_transaction_updated(self, tx: Transaction) -> None:
+        snapshot = self._snapshot
+        if snapshot is None:
+            return
+        if snapshot is not await self._snapshot_service.get_cached_snapshot():
+            return
+        index = self._index
+        if index is None or self.progress.status == JobStatus.FAILED:
+            # Nothing indexed to trace the patch with yet; start over.
+            self.on_snapshot(snapshot)
+            return
+        affected = self._affected_by(index, tx)
+        for transaction_id in affected:
+            self._suggestions.pop(transaction_id, None)
+        if tx.id not in index.categorizable:
+            self._suggestions.pop(tx.id, None)
+            self._pending.pop(tx.id, None)
+        queued = [tx_id for tx_id in affected if tx_id not in self._pending]
+        self._pending = {**dict.fromkeys(affected), **self._pending}
+        progress = self.progress
+        progress.revision = snapshot.revision
+        progress.total += len(queued)
+        if self._pending and not self.running:
+            progress.status = JobStatus.RUNNING
+            progress.finished_at = None
+            self._start(snapshot)
+        logger.debug(
+            "Precomputed category suggestions invalidated",
+            extra={"transaction_id": tx.id, "rescored": len(affected)},
+        )
+
+    async def stop(self) -> None:
+        task = self._task
+        if task is None:
+            return
+        self._task = None
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+    def _start(self, snapshot: TransactionSnapshot) -> None:
+        self._task = asyncio.create_task(
+            self._run(snapshot, self.progress),
+            name="category-suggestion-precompute",
+        )
+
+    async def _run(
+        self, snapshot: TransactionSnapshot, progress: SuggestionPrecomputeProgress
+    ) -> None:
+        started = time.perf_counter()
+        try:
+            if self._index is None:
+                transactions, index = await to_thread.run_sync(
+                    self._build_index, snapshot, abandon_on_cancel=True
+                )
+                self._index = index
+                self._pending = dict.fromkeys(tx.id for tx in transactions)
+                progress.total = len(self._pending)
+            while self._pending:
+                batch = list(islice(self._pending, self._batch_size))
+                for transaction_id in batch:
+                    del self._pending[transaction_id]
+                results = await to_thread.run_sync(
+                    self._suggest_batch,
+                    [str(transaction_id) for transaction_id in batch],
+                    abandon_on_cancel=True,
+                )
+                for transaction_id in batch:
+                    items = results.get(str(transaction_id))
+                    # Patched while scoring: queued again or no longer wanted.
+                    if (
+                        items is None
+                        or transaction_id in self._pending
+                        or transaction_id not in self._index.categorizable
+                    ):
+                        continue
+                    self._suggestions[transaction_id] = items
+                progress.completed += len(batch)
+        except asyncio.CancelledError:
+            logger.info(
+                "Category suggestion precompute cancelled",
+                extra={"revision": progress.revision, "completed": progress.completed},
+            )
+            raise
+        except Exception:
+            progress.status = JobStatus.FAILED
+            progress.finished_at = datetime.now(UTC)
+            logger.exception(
+                "Category suggestion precompute failed",
+                extra={"revision": progress.revision},
+            )
+            return
+
+        progress.status = JobStatus.DONE
+        progress.finished_at = datetime.now(UTC)
+        logger.info(
+            "Category suggestions precomputed",
+            extra={
+                "revision": progress.revision,
+                "transaction_count": progress.total,
+                "duration_ms": round((time.perf_counter() - started) * 1000),
+            },
+        )
+
+    def _build_index(
+        self, snapshot: TransactionSnapshot
+    ) -> tuple[list[Transaction], _RescoreIndex]:
+        transactions = self._select_categorizable(snapshot.transactions)
+        index = _RescoreIndex(
+            categorizable={tx.id for tx in transactions},
+            tokens={},
+            categories={
+                tx.id: str(tx.category.id)
+                for tx in snapshot.transactions
+                if tx.category is not None
+            },
+        )
+        for tx in transactions:
+            for token in self._text_tokens(tx):
+                index.tokens.setdefault(token, set()).add(tx.id)
+        return transactions, index
+
+    def _affected_by(self, index: _RescoreIndex, tx: Transaction) -> list[int]:
+        """Update ``index`` for the patched ``tx``; return ids to rescore."""
+        categories = {index.categories.pop(tx.id, None)}
+        if tx.category is not None:
+            index.categories[tx.id] = str(tx.category.id)
+            categories.add(index.categories[tx.id])
+        categories.discard(None)
+        tokens = self._text_tokens(tx)
+        if self._select_categorizable([tx]):
+            index.categorizable.add(tx.id)
+            for token in tokens:
+                index.tokens.setdefault(token, set()).add(tx.id)
+        else:
+            index.categorizable.discard(tx.id)
+
+        affected = {tx.id}
+        for token in tokens:
+            affected |= index.tokens.get(token, set())
+        if categories:
+            affected.update(
+                transaction_id
+                for transaction_id, items in self._suggestions.items()
+                if any(item.category_id in categories for item in items)
+            )
+        return sorted(affected & index.categorizable)
+
+    def _text_tokens(self, tx: Transaction) -> set[str]:
+        return self._preprocessor.tokens(tx.description) | self._preprocessor.tokens(
+            getattr(tx, "merchant", None)
+        )
+
+    def _suggest_batch(
+        self, transaction_ids: list[str]
+    ) -> dict[str, Sequence[CategorySuggestion]]:
+        with self._scoring_lock:
+            return asyncio.run(
+                self._suggestion_service.suggest_for_transaction_ids(
+                    user_id=PRECOMPUTE_USER_ID,
+                    transaction_ids=transaction_ids,
+                    limit=self.limit,
+                )
+            )
+
+
+class PrecomputedCategorySuggestionService(CategorySuggestionService):
+    """Answers single-transaction lookups from a ``CategorySuggestionPrecomputer``.
+
+    Everything it has no precomputed result for goes to ``service``.
+    """
+
+    def __init__(
+        self,
+        *,
+        service: CategorySuggestionService,
+        precomputer: CategorySuggestionPrecomputer,
+    ) -> None:
+        self._service = service
+        self.precomputer = precomputer
+
+    async def suggest_for_transaction(
+        self,
+        *,
+        user_id: str,
+        transaction: CategorizationQuery,
+        limit: int = 3,
+    ) -> Sequence[CategorySuggestion]:
+        return await self._service.suggest_for_transaction(
+            user_id=user_id, transaction=transaction, limit=limit
+        )
+
+    async def suggest_for_transaction_id(
+        self,
+        *,
+        user_id: str,
+        transaction_id: str,
+        limit: int = 3,
+    ) -> Sequence[CategorySuggestion]:
+        if transaction_id.isdigit():
+            suggestions = await self.precomputer.lookup(
+                int(transaction_id), limit=limit
+            )
+            if suggestions is not None:
+                return suggestions
+        return await self._service.suggest_for_transaction_id(
+            user_id=user_id, transaction_id=transaction_id, limit=limit
+        )
+
+    async def suggest_for_transaction_ids(
+        self,
+        *,
+        user_id: str,
+        transaction_ids: Sequence[str],
+        limit: int = 3,
+    ) -> dict[str, Sequence[CategorySuggestion]]:
+        return await self._service.suggest_for_transaction_ids(
+            user_id=user_id, transaction_ids=transaction_ids, limit=limit
+        )
+
+    async def suggest_for_month(
+        self,
+        *,
+        user_id: str,
+        year: int,
+        month: int,
+        limit: int = 3,
+    ) -> dict[str, Sequence[CategorySuggestion]]:
+        return await self._service.suggest_for_month(
+            user_id=user_id, year=year, month=month, limit=limit
+        )
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import multiprocessing
+import weakref
+from collections.abc import Callable, Hashable, Sequence
+from concurrent.futures import Executor, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from anyio import to_thread
+
+from services.categorization.corpus import CategorizationCorpus, CorpusEdit
+from services.categorization.models import TransactionCategorizationQuery
+from services.categorization.similarity_engine import TransactionSimilarityEngine
+from services.domain.category_suggestion import (
+    SimilarTransactionMatch,
+    TransactionCategorizationDocument,
+)
+
+logger = logging.getLogger(__name__)
+
+type EngineFactory = Callable[[], TransactionSimilarityEngine]
+type ExecutorFactory = Callable[
+    [int, Callable[..., None], tuple[object, ...]], Executor
+]
+
+# Per-process state of a pool worker, set once by the pool initializer.
+_worker_engine: TransactionSimilarityEngine | None = None
+_worker_corpus: CategorizationCorpus | None = None
+
+_open_engines: weakref.WeakSet[ProcessPoolSimilarityEngine] = weakref.WeakSet()
+
+
+def _initialize_worker(
+    engine_factory: EngineFactory,
+    documents: tuple[TransactionCategorizationDocument, ...],
+    revision: Hashable,
+) -> None:
+    global _worker_engine, _worker_corpus
+    _worker_engine = engine_factory()
+    _worker_corpus = CategorizationCorpus(documents, revision=revision)
+
+
+def _score_in_worker(
+    queries: list[TransactionCategorizationQuery],
+    limit: int,
+    edits: tuple[CorpusEdit, ...] = (),
+) -> list[Sequence[SimilarTransactionMatch]]:
+    if _worker_engine is None or _worker_corpus is None:
+        raise RuntimeError("Categorization worker was not initialized")
+    # ``edits`` holds every corpus edit since the pool started; each worker
+    # applies the ones it has not seen yet.
+    for edit in edits[_worker_corpus.edit_count :]:
+        _worker_corpus.apply(edit)
+    return asyncio.run(
+        _worker_engine.find_similar_batch(queries, _worker_corpus, limit=limit)
+    )
+
+
+def start_process_pool(
+    workers: int,
+    initializer: Callable[..., None],
+    initargs: tuple[object, ...],
+) -> Executor:
+    # "spawn" because forking a process that runs threads (anyio, uvicorn)
+    # is unsafe.
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=initializer,
+        initargs=initargs,
+    )
+
+
+def shutdown_worker_pools() -> None:
+    """Stop the worker pools of every open ``ProcessPoolSimilarityEngine``."""
+    for engine in list(_open_engines):
+        engine.close()
+
+
+class ProcessPoolSimilarityEngine(TransactionSimilarityEngine):
+    """Runs another similarity engine in worker processes.
+
+    Scoring is pure-Python CPU work. Here it runs outside the event loop, so
+    other requests are still served while suggestions are computed.
+
+    A pool is started for each corpus revision. Its initializer hands the
+    documents to every worker once, and each worker builds its own engine
+    from ``engine_factory``. Later calls only send queries, split into one
+    shard per worker, along with in-place corpus edits made since the pool
+    started. Once more than ``max_replayed_edits`` have piled up, the pool is
+    restarted from the current corpus instead, so neither the payload nor the
+    replay in the workers keeps growing with every applied category.
+    Candidates without a revision cannot be reused, so a local engine scores
+    them in a thread instead.
+    """
+
+    def __init__(
+        self,
+        *,
+        engine_factory: EngineFactory,
+        workers: int,
+        executor_factory: ExecutorFactory = start_process_pool,
+        max_replayed_edits: int = 256,
+    ) -> None:
+        self._engine_factory = engine_factory
+        self._local_engine = engine_factory()
+        self._workers = max(1, workers)
+        self._executor_factory = executor_factory
+        self._max_replayed_edits = max_replayed_edits
+        # (corpus revision, executor, corpus edit count when it started)
+        self._pool: tuple[Hashable, Executor, int] | None = None
+        self._pool_lock = asyncio.Lock()
+        _open_engines.add(self)
+
+    async def find_similar_batch(
+        self,
+        queries: Sequence[TransactionCategorizationQuery],
+        candidates: Sequence[TransactionCategorizationDocument],
+        limit: int = 20,
+    ) -> list[Sequence[SimilarTransactionMatch]]:
+        if not queries:
+            return []
+        if (
+            not isinstance(candidates, CategorizationCorpus)
+            or candidates.revision is None
+        ):
+            return await to_thread.run_sync(
+                self._score_locally, queries, candidates, limit
+            )
+
+        executor, start_edit_count = await self._executor_for(candidates)
+        edits = tuple(candidates.edits_since(start_edit_count))
+        shard_size = math.ceil(len(queries) / self._workers)
+        # Submitting may start (and pickle the corpus for) a worker process,
+        # so it happens in a thread too.
+        futures = [
+            asyncio.wrap_future(
+                await to_thread.run_sync(
+                    executor.submit,
+                    _score_in_worker,
+                    list(queries[start : start + shard_size]),
+                    limit,
+                    edits,
+                )
+            )
+            for start in range(0, len(queries), shard_size)
+        ]
+        try:
+            shards = await asyncio.gather(*futures)
+        except BrokenProcessPool:
+            if self._pool is not None and self._pool[1] is executor:
+                self._pool = None
+            raise
+        return [matches for shard in shards for matches in shard]
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool[1].shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    async def _executor_for(self, corpus: CategorizationCorpus) -> tuple[Executor, int]:
+        revision = corpus.revision
+        async with self._pool_lock:
+            if (
+                self._pool is not None
+                and self._pool[0] == revision
+                and corpus.edit_count - self._pool[2] <= self._max_replayed_edits
+            ):
+                return self._pool[1], self._pool[2]
+            previous = self._pool
+            start_edit_count = corpus.edit_count
+            executor = self._executor_factory(
+                self._workers,
+                _initialize_worker,
+                (self._engine_factory, tuple(corpus), revision),
+            )
+            self._pool = (revision, executor, start_edit_count)
+
+        if previous is not None:
+            # Shards already submitted to the old pool still complete.
+            previous[1].shutdown(wait=False)
+        logger.info(
+            "Categorization worker pool started",
+            extra={
+                "workers": self._workers,
+                "document_count": len(corpus),
+                "edit_count": start_edit_count,
+            },
+        )
+        return executor, start_edit_count
+
+    def _score_locally(
+        self,
+        queries: Sequence[TransactionCategorizationQuery],
+        candidates: Sequence[TransactionCategorizationDocument],
+        limit: int,
+    ) -> list[Sequence[SimilarTransactionMatch]]:
+        return asyncio.run(
+            self._local_engine.find_similar_batch(queries, candidates, limit=limit)
+        )
@@ -1,20 +1,23 @@
 from __future__ import annotations
 
+import calendar
 from collections.abc import Sequence
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+from datetime import date
 
 from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.exact_history import ExactHistoryTable
 from services.categorization.models import (
     CategorizationQuery,
     TransactionCategorizationQuery,
 )
-from services.categorization.similarity_engine import (
-    WeightedTransactionSimilarityEngine,
-)
+from services.categorization.naive_bayes import NaiveBayesCategoryClassifier
+from services.categorization.similarity_engine import TransactionSimilarityEngine
 from services.categorization.snapshot_provider import CategorizationSnapshotProvider
 from services.domain.category_suggestion import (
     CategorySuggestion,
     SimilarTransactionMatch,
+    TransactionCategorizationDocument,
 )
 
 
@@ -37,18 +40,54 @@ class CategorySuggestionService:
     ) -> Sequence[CategorySuggestion]:
         raise NotImplementedError
 
+    async def suggest_for_transaction_ids(
+        self,
+        *,
+        user_id: str,
+        transaction_ids: Sequence[str],
+        limit: int = 3,
+    ) -> dict[str, Sequence[CategorySuggestion]]:
+        raise NotImplementedError
+
+    async def suggest_for_month(
+        self,
+        *,
+        user_id: str,
+        year: int,
+        month: int,
+        limit: int = 3,
+    ) -> dict[str, Sequence[CategorySuggestion]]:
+        raise NotImplementedError
+
 
 class DefaultCategorySuggestionService(CategorySuggestionService):
+    """Suggestions aggregated from the similarity engine's matches.
+
+    With ``exact_history``, queries whose merchant or title has a dominant
+    category in the history are answered from that table instead, and only
+    the rest are sent to the engine.
+
+    With ``classifier`` and a ``classifier_weight`` of 1, the classifier
+    replaces the engine, which then only scores queries without any word the
+    classifier knows. A lower weight blends both scores per category.
+    """
+
     def __init__(
         self,
         *,
         snapshot_provider: CategorizationSnapshotProvider,
-        similarity_engine: WeightedTransactionSimilarityEngine,
+        similarity_engine: TransactionSimilarityEngine,
         amount_bucketizer: AmountBucketizer,
+        exact_history: ExactHistoryTable | None = None,
+        classifier: NaiveBayesCategoryClassifier | None = None,
+        classifier_weight: float = 1.0,
     ) -> None:
         self._snapshot_provider = snapshot_provider
         self._similarity_engine = similarity_engine
         self._amount_bucketizer = amount_bucketizer
+        self._exact_history = exact_history
+        self._classifier = classifier
+        self._classifier_weight = classifier_weight
 
     async def suggest_for_transaction(
         self,
@@ -66,15 +105,7 @@ class DefaultCategorySuggestionService(CategorySuggestionService):
             amount_bucket=self._amount_bucketizer.bucket_for_amount(transaction.amount),
             source_type=transaction.source_type,
         )
-        candidates = await self._snapshot_provider.get_candidate_documents_for_user(
-            user_id
-        )
-        matches = await self._similarity_engine.find_similar(
-            query=query,
-            candidates=candidates,
-            limit=20,
-        )
-        return self._aggregate(matches=matches, limit=limit)
+        return await self._suggest_one(user_id=user_id, query=query, limit=limit)
 
     async def suggest_for_transaction_id(
         self,
@@ -87,15 +118,154 @@ class DefaultCategorySuggestionService(CategorySuggestionService):
             user_id=user_id,
             transaction_id=transaction_id,
         )
+        return await self._suggest_one(user_id=user_id, query=query, limit=limit)
+
+    async def suggest_for_transaction_ids(
+        self,
+        *,
+        user_id: str,
+        transaction_ids: Sequence[str],
+        limit: int = 3,
+    ) -> dict[str, Sequence[CategorySuggestion]]:
+        queries = await self._snapshot_provider.get_queries_for_transaction_ids(
+            user_id=user_id,
+            transaction_ids=transaction_ids,
+        )
+        return await self._suggest_batch(user_id=user_id, queries=queries, limit=limit)
+
+    async def suggest_for_month(
+        self,
+        *,
+        user_id: str,
+        year: int,
+        month: int,
+        limit: int = 3,
+    ) -> dict[str, Sequence[CategorySuggestion]]:
+        queries = await self._snapshot_provider.get_queries_for_period(
+            user_id=user_id,
+            start_date=date(year, month, 1),
+            end_date=date(year, month, calendar.monthrange(year, month)[1]),
+        )
+        return await self._suggest_batch(user_id=user_id, queries=queries, limit=limit)
+
+    async def _suggest_one(
+        self,
+        *,
+        user_id: str,
+        query: TransactionCategorizationQuery,
+        limit: int,
+    ) -> Sequence[CategorySuggestion]:
         candidates = await self._snapshot_provider.get_candidate_documents_for_user(
             user_id
         )
+        exact = self._exact_suggestions(query=query, candidates=candidates, limit=limit)
+        if exact is not None:
+            return exact
+        classified = self._classify(query=query, candidates=candidates)
+        if classified and self._classifier_weight >= 1.0:
+            return classified[:limit]
         matches = await self._similarity_engine.find_similar(
             query=query,
             candidates=candidates,
             limit=20,
         )
-        return self._aggregate(matches=matches, limit=limit)
+        return self._combine(matches=matches, classified=classified, limit=limit)
+
+    async def _suggest_batch(
+        self,
+        *,
+        user_id: str,
+        queries: dict[str, TransactionCategorizationQuery],
+        limit: int,
+    ) -> dict[str, Sequence[CategorySuggestion]]:
+        if not queries:
+            return {}
+        candidates = await self._snapshot_provider.get_candidate_documents_for_user(
+            user_id
+        )
+        suggestions: dict[str, Sequence[CategorySuggestion]] = {}
+        pending: dict[str, TransactionCategorizationQuery] = {}
+        classified: dict[str, Sequence[CategorySuggestion]] = {}
+        for transaction_id, query in queries.items():
+            exact = self._exact_suggestions(
+                query=query, candidates=candidates, limit=limit
+            )
+            if exact is not None:
+                suggestions[transaction_id] = exact
+                continue
+            classified[transaction_id] = self._classify(
+                query=query, candidates=candidates
+            )
+            if classified[transaction_id] and self._classifier_weight >= 1.0:
+                suggestions[transaction_id] = classified[transaction_id][:limit]
+            else:
+                pending[transaction_id] = query
+        if pending:
+            batch_matches = await self._similarity_engine.find_similar_batch(
+                queries=list(pending.values()),
+                candidates=candidates,
+                limit=20,
+            )
+            for transaction_id, matches in zip(pending, batch_matches, strict=True):
+                suggestions[transaction_id] = self._combine(
+                    matches=matches,
+                    classified=classified[transaction_id],
+                    limit=limit,
+                )
+        return {
+            transaction_id: suggestions[transaction_id] for transaction_id in queries
+        }
+
+    def _exact_suggestions(
+        self,
+        *,
+        query: TransactionCategorizationQuery,
+        candidates: Sequence[TransactionCategorizationDocument],
+        limit: int,
+    ) -> Sequence[CategorySuggestion] | None:
+        if self._exact_history is None:
+            return None
+        return self._exact_history.suggest(query, candidates, limit=limit)
+
+    def _classify(
+        self,
+        *,
+        query: TransactionCategorizationQuery,
+        candidates: Sequence[TransactionCategorizationDocument],
+    ) -> Sequence[CategorySuggestion]:
+        if self._classifier is None:
+            return []
+        return self._classifier.suggest(query, candidates, limit=20)
+
+    def _combine(
+        self,
+        *,
+        matches: Sequence[SimilarTransactionMatch],
+        classified: Sequence[CategorySuggestion],
+        limit: int,
+    ) -> Sequence[CategorySuggestion]:
+        if not classified:
+            return self._aggregate(matches=matches, limit=limit)
+        weight = self._classifier_weight
+        scores = {
+            suggestion.category_id: weight * suggestion.score
+            for suggestion in classified
+        }
+        # The engine's reason wins for categories both of them suggest.
+        blended = {suggestion.category_id: suggestion for suggestion in classified}
+        for suggestion in self._aggregate(matches=matches, limit=len(matches)):
+            scores[suggestion.category_id] = (
+                scores.get(suggestion.category_id, 0.0)
+                + (1.0 - weight) * suggestion.score
+            )
+            blended[suggestion.category_id] = suggestion
+        return self._ranked(
+            [
+                replace(suggestion, score=round(scores[category_id], 4))
+                for category_id, suggestion in blended.items()
+            ],
+            limit=limit,
+        )
 
     def _aggregate(
         self,
@@ -135,6 +305,12 @@ class DefaultCategorySuggestionService(CategorySuggestionService):
             )
             for category_id, data in aggregated.items()
         ]
+        return self._ranked(suggestions, limit=limit)
+
+    @staticmethod
+    def _ranked(
+        suggestions: list[CategorySuggestion], *, limit: int
+    ) -> list[CategorySuggestion]:
         suggestions.sort(
             key=lambda suggestion: (
                 -suggestion.score,
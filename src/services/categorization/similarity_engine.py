@@ -1,68 +1,283 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+import heapq
+from collections.abc import Hashable, Iterable, Sequence
 from difflib import SequenceMatcher
 
 from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.corpus import CategorizationCorpus, CorpusEdit
+from services.categorization.features import (
+    DocumentFeatures,
+    TextFeatures,
+    document_features,
+    text_features,
+)
 from services.categorization.models import TransactionCategorizationQuery
 from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.categorization.token_index import CategorizationTokenIndex
 from services.domain.category_suggestion import (
     SimilarTransactionMatch,
     TransactionCategorizationDocument,
 )
 
 
-class WeightedTransactionSimilarityEngine:
+def select_field_weights(query: DocumentFeatures) -> dict[str, float]:
+    """Field weights for a query, depending on its source and filled fields."""
+    source_type = query.source_type.strip().lower()
+    merchant_present = bool(query.merchant.normalized)
+    notes_present = bool(query.notes.normalized)
+
+    if source_type == "blik" and merchant_present:
+        return {
+            "title": 0.25,
+            "merchant": 0.50,
+            "notes": 0.15,
+            "amount": 0.10,
+        }
+    if source_type == "allegro" and notes_present:
+        return {
+            "title": 0.20,
+            "merchant": 0.10,
+            "notes": 0.55,
+            "amount": 0.15,
+        }
+    if merchant_present:
+        return {
+            "title": 0.35,
+            "merchant": 0.40,
+            "notes": 0.15,
+            "amount": 0.10,
+        }
+    if notes_present:
+        return {
+            "title": 0.45,
+            "merchant": 0.00,
+            "notes": 0.40,
+            "amount": 0.15,
+        }
+    return {
+        "title": 0.75,
+        "merchant": 0.00,
+        "notes": 0.10,
+        "amount": 0.15,
+    }
+
+
+FIELD_PRIORITIES = {
+    "merchant": 3,
+    "notes": 2,
+    "title": 1,
+    "amount": 0,
+}
+
+
+def sort_matches(
+    matches: list[SimilarTransactionMatch],
+) -> list[SimilarTransactionMatch]:
+    return sorted(
+        matches,
+        key=lambda item: (
+            -item.similarity_score,
+            item.category_name.lower(),
+            item.transaction_id,
+        ),
+    )
+
+
+# Scores are compared after rounding to 4 places; a candidate is only pruned
+# against the k-th best match when its bound is clearly below it.
+_RANK_MARGIN = 1e-3
+
+
+class _RankedMatch:
+    """Heap entry ordered so that ``heapq`` keeps the worst match at the root."""
+
+    __slots__ = ("key", "match")
+
+    def __init__(self, match: SimilarTransactionMatch) -> None:
+        self.match = match
+        self.key = (
+            -match.similarity_score,
+            match.category_name.lower(),
+            match.transaction_id,
+        )
+
+    def __lt__(self, other: _RankedMatch) -> bool:
+        return self.key > other.key
+
+
+class TransactionSimilarityEngine:
+    async def find_similar(
+        self,
+        query: TransactionCategorizationQuery,
+        candidates: Sequence[TransactionCategorizationDocument],
+        limit: int = 20,
+    ) -> Sequence[SimilarTransactionMatch]:
+        [matches] = await self.find_similar_batch([query], candidates, limit=limit)
+        return matches
+
+    async def find_similar_batch(
+        self,
+        queries: Sequence[TransactionCategorizationQuery],
+        candidates: Sequence[TransactionCategorizationDocument],
+        limit: int = 20,
+    ) -> list[Sequence[SimilarTransactionMatch]]:
+        raise NotImplementedError
+
+
+class WeightedTransactionSimilarityEngine(TransactionSimilarityEngine):
+    """Pairwise fuzzy scoring of a query against categorized documents.
+
+    With ``use_token_index`` only documents sharing a token key with the query
+    (see ``CategorizationTokenIndex``) are scored; the index is kept per
+    corpus revision and follows in-place corpus edits. ``bucket_fallback``
+    scores the query's amount bucket when no document shares a token. The
+    index trades recall for speed: fuzzy matches without a shared token key
+    are missed, so results can differ from the exhaustive scan.
+    """
+
     def __init__(
         self,
         *,
         preprocessor: CategorizationTextPreprocessor,
         amount_bucketizer: AmountBucketizer,
         min_similarity_score: float = 0.35,
+        use_token_index: bool = False,
+        bucket_fallback: bool = True,
+        max_key_share: float | None = None,
     ) -> None:
         self._preprocessor = preprocessor
         self._amount_bucketizer = amount_bucketizer
         self._min_similarity_score = min_similarity_score
+        self._use_token_index = use_token_index
+        self._bucket_fallback = bucket_fallback
+        self._max_key_share = max_key_share
+        self._token_index: tuple[Hashable, CategorizationTokenIndex] | None = None
+        self._token_index_edits = 0
 
-    async def find_similar(
+    async def find_similar_batch(
         self,
-        query: TransactionCategorizationQuery,
+        queries: Sequence[TransactionCategorizationQuery],
         candidates: Sequence[TransactionCategorizationDocument],
         limit: int = 20,
-    ) -> Sequence[SimilarTransactionMatch]:
-        matches: list[SimilarTransactionMatch] = []
-        for candidate in candidates:
-            if (
-                query.transaction_id is not None
-                and candidate.transaction_id == query.transaction_id
-            ):
-                continue
+    ) -> list[Sequence[SimilarTransactionMatch]]:
+        """Score every query against the candidates.
 
-            weighted_score, matched_by = self._score_pair(
-                query=query,
-                candidate=candidate,
+        Each query is normalized once. Candidate features come from the corpus
+        when ``candidates`` is a ``CategorizationCorpus`` (computed once per
+        corpus), otherwise they are computed once per call.
+
+        The best ``limit`` matches are kept in a heap. Candidates whose score
+        bound cannot reach ``min_similarity_score`` or the current worst kept
+        match are dropped before the exact ``SequenceMatcher`` ratio is
+        computed (see ``_score_bounded``).
+        """
+        features = self._features_for(candidates)
+        index = self._index_for(candidates, features, query_count=len(queries))
+        results: list[Sequence[SimilarTransactionMatch]] = []
+
+        for query in queries:
+            prepared_query = self._prepare(query)
+            weights = self._weights_for(prepared_query)
+            positions: Iterable[int] = (
+                range(len(candidates))
+                if index is None
+                else index.candidate_positions(
+                    prepared_query, bucket_fallback=self._bucket_fallback
+                )
             )
-            if weighted_score < self._min_similarity_score:
-                continue
+            ranked: list[_RankedMatch] = []
+            for position in positions if limit > 0 else ():
+                candidate = candidates[position]
+                if (
+                    query.transaction_id is not None
+                    and candidate.transaction_id == query.transaction_id
+                ):
+                    continue
+
+                floor = self._min_similarity_score
+                if len(ranked) == limit:
+                    floor = max(floor, ranked[0].match.similarity_score - _RANK_MARGIN)
+                scored = self._score_bounded(
+                    query=prepared_query,
+                    candidate=features[position],
+                    weights=weights,
+                    floor=floor,
+                )
+                if scored is None or scored[0] < self._min_similarity_score:
+                    continue
 
-            matches.append(
-                SimilarTransactionMatch(
-                    transaction_id=candidate.transaction_id,
-                    category_id=candidate.category_id,
-                    category_name=candidate.category_name,
-                    similarity_score=round(weighted_score, 4),
-                    matched_by=matched_by,
+                entry = _RankedMatch(
+                    SimilarTransactionMatch(
+                        transaction_id=candidate.transaction_id,
+                        category_id=candidate.category_id,
+                        category_name=candidate.category_name,
+                        similarity_score=round(scored[0], 4),
+                        matched_by=scored[1],
+                    )
                 )
+                if len(ranked) < limit:
+                    heapq.heappush(ranked, entry)
+                elif ranked[0] < entry:
+                    heapq.heapreplace(ranked, entry)
+
+            results.append(sort_matches([entry.match for entry in ranked]))
+        return results
+
+    def _features_for(
+        self, candidates: Sequence[TransactionCategorizationDocument]
+    ) -> Sequence[DocumentFeatures]:
+        if isinstance(candidates, CategorizationCorpus):
+            return candidates.features(self._preprocessor)
+        return [self._prepare(candidate) for candidate in candidates]
+
+    def _index_for(
+        self,
+        candidates: Sequence[TransactionCategorizationDocument],
+        features: Sequence[DocumentFeatures],
+        *,
+        query_count: int,
+    ) -> CategorizationTokenIndex | None:
+        if not self._use_token_index:
+            return None
+
+        if (
+            not isinstance(candidates, CategorizationCorpus)
+            or candidates.revision is None
+        ):
+            # Without a revision the index cannot be reused, and building it
+            # costs about as much as one exhaustive scan.
+            if query_count < 2:
+                return None
+            return self._build_index(features)
+
+        revision = candidates.revision
+        if self._token_index is None or self._token_index[0] != revision:
+            self._token_index = (revision, self._build_index(features))
+        elif self._token_index_edits < candidates.edit_count:
+            self._update_index(
+                self._token_index[1], candidates.edits_since(self._token_index_edits)
             )
+        self._token_index_edits = candidates.edit_count
+        return self._token_index[1]
 
-        matches.sort(
-            key=lambda item: (
-                -item.similarity_score,
-                item.category_name.lower(),
-                item.transaction_id,
-            ),
-        )
-        return matches[:limit]
+    def _update_index(
+        self, index: CategorizationTokenIndex, edits: Sequence[CorpusEdit]
+    ) -> None:
+        for edit in edits:
+            if edit.removed is not None:
+                index.discard(edit.position, self._prepare(edit.removed))
+            if edit.moved is not None and edit.moved_from is not None:
+                moved = self._prepare(edit.moved)
+                index.discard(edit.moved_from, moved)
+                index.add(edit.position, moved)
+            if edit.added is not None:
+                index.add(edit.position, self._prepare(edit.added))
+
+    def _build_index(
+        self, features: Sequence[DocumentFeatures]
+    ) -> CategorizationTokenIndex:
+        return CategorizationTokenIndex(features, max_key_share=self._max_key_share)
 
     def _score_pair(
         self,
@@ -70,21 +285,101 @@ class WeightedTransactionSimilarityEngine:
         query: TransactionCategorizationQuery,
         candidate: TransactionCategorizationDocument,
     ) -> tuple[float, str]:
-        weights = self._select_weights(query=query)
-        title_score = self._text_similarity(query.title, candidate.title)
-        merchant_score = self._text_similarity(query.merchant, candidate.merchant)
-        notes_score = self._text_similarity(query.notes, candidate.notes)
-        amount_score = self._amount_similarity(
-            query_bucket=query.amount_bucket,
-            candidate_bucket=candidate.amount_bucket,
+        return self._score_prepared(
+            query=self._prepare(query),
+            candidate=self._prepare(candidate),
+            weights=self._select_weights(query=query),
         )
 
-        contributions = {
-            "title": weights["title"] * title_score,
-            "merchant": weights["merchant"] * merchant_score,
-            "notes": weights["notes"] * notes_score,
-            "amount": weights["amount"] * amount_score,
+    def _score_prepared(
+        self,
+        *,
+        query: DocumentFeatures,
+        candidate: DocumentFeatures,
+        weights: dict[str, float],
+    ) -> tuple[float, str]:
+        scores = {
+            "title": self._features_similarity(query.title, candidate.title),
+            "merchant": self._features_similarity(query.merchant, candidate.merchant),
+            "notes": self._features_similarity(query.notes, candidate.notes),
+            "amount": self._amount_similarity(
+                query_bucket=query.amount_bucket,
+                candidate_bucket=candidate.amount_bucket,
+            ),
+        }
+        return self._combine(scores, weights)
+
+    def _score_bounded(
+        self,
+        *,
+        query: DocumentFeatures,
+        candidate: DocumentFeatures,
+        weights: dict[str, float],
+        floor: float,
+    ) -> tuple[float, str] | None:
+        """Same result as ``_score_prepared``, or None below ``floor``.
+
+        Every text field starts at an upper bound: the length ratio (which
+        caps ``SequenceMatcher.ratio``) or the token overlap when that is
+        higher, in which case it is already exact. Fields are then tightened
+        by weight, first to ``quick_ratio`` and then to ``ratio``, only while
+        the weighted total can still reach ``floor``.
+        """
+        scores = {
+            "title": 0.0,
+            "merchant": 0.0,
+            "notes": 0.0,
+            "amount": self._amount_similarity(
+                query_bucket=query.amount_bucket,
+                candidate_bucket=candidate.amount_bucket,
+            ),
         }
+        pending: list[tuple[str, TextFeatures, TextFeatures, float | None]] = []
+        for name in ("title", "merchant", "notes"):
+            left: TextFeatures = getattr(query, name)
+            right: TextFeatures = getattr(candidate, name)
+            if not weights[name] or not left.normalized or not right.normalized:
+                continue
+            total_length = len(left.normalized) + len(right.normalized)
+            bound = 2.0 * min(len(left.normalized), len(right.normalized))
+            bound /= total_length
+            overlap = None
+            if left.tokens and right.tokens:
+                overlap = len(left.tokens & right.tokens) / len(
+                    left.tokens | right.tokens
+                )
+                if overlap >= bound:
+                    scores[name] = overlap
+                    continue
+                bound = max(bound, overlap)
+            scores[name] = bound
+            pending.append((name, left, right, overlap))
+
+        if self._bound(scores, weights) < floor:
+            return None
+        pending.sort(key=lambda item: -weights[item[0]])
+        for name, left, right, overlap in pending:
+            matcher = SequenceMatcher(None, left.normalized, right.normalized)
+            quick = matcher.quick_ratio()
+            if overlap is not None and overlap >= quick:
+                scores[name] = overlap
+                continue
+            scores[name] = quick
+            if self._bound(scores, weights) < floor:
+                return None
+            ratio = matcher.ratio()
+            scores[name] = ratio if overlap is None else max(ratio, overlap)
+        return self._combine(scores, weights)
+
+    def _bound(self, scores: dict[str, float], weights: dict[str, float]) -> float:
+        # Summed in the same order as ``_combine`` so that a bound is never
+        # below the exact score because of float rounding.
+        return sum(weights[name] * score for name, score in scores.items())
+
+    def _combine(
+        self, scores: dict[str, float], weights: dict[str, float]
+    ) -> tuple[float, str]:
+        contributions = {name: weights[name] * score for name, score in scores.items()}
         score = sum(contributions.values())
         matched_by = max(
             contributions.items(),
@@ -92,6 +387,11 @@ class WeightedTransactionSimilarityEngine:
         )[0]
         return score, matched_by
 
+    def _prepare(
+        self, item: TransactionCategorizationQuery | TransactionCategorizationDocument
+    ) -> DocumentFeatures:
+        return document_features(self._preprocessor, item)
+
     def _amount_similarity(
         self,
         *,
@@ -115,65 +415,27 @@ class WeightedTransactionSimilarityEngine:
     def _select_weights(
         self, *, query: TransactionCategorizationQuery
     ) -> dict[str, float]:
-        source_type = query.source_type.strip().lower()
-        merchant_present = bool(self._preprocessor.normalize(query.merchant))
-        notes_present = bool(self._preprocessor.normalize(query.notes))
-
-        if source_type == "blik" and merchant_present:
-            return {
-                "title": 0.25,
-                "merchant": 0.50,
-                "notes": 0.15,
-                "amount": 0.10,
-            }
-        if source_type == "allegro" and notes_present:
-            return {
-                "title": 0.20,
-                "merchant": 0.10,
-                "notes": 0.55,
-                "amount": 0.15,
-            }
-        if merchant_present:
-            return {
-                "title": 0.35,
-                "merchant": 0.40,
-                "notes": 0.15,
-                "amount": 0.10,
-            }
-        if notes_present:
-            return {
-                "title": 0.45,
-                "merchant": 0.00,
-                "notes": 0.40,
-                "amount": 0.15,
-            }
-        return {
-            "title": 0.75,
-            "merchant": 0.00,
-            "notes": 0.10,
-            "amount": 0.15,
-        }
+        return self._weights_for(self._prepare(query))
+
+    def _weights_for(self, query: DocumentFeatures) -> dict[str, float]:
+        return select_field_weights(query)
 
     def _text_similarity(self, left: str | None, right: str | None) -> float:
-        left_normalized = self._preprocessor.normalize(left)
-        right_normalized = self._preprocessor.normalize(right)
-        if not left_normalized or not right_normalized:
+        return self._features_similarity(
+            text_features(self._preprocessor, left),
+            text_features(self._preprocessor, right),
+        )
+
+    def _features_similarity(self, left: TextFeatures, right: TextFeatures) -> float:
+        if not left.normalized or not right.normalized:
             return 0.0
 
-        ratio = SequenceMatcher(None, left_normalized, right_normalized).ratio()
-        left_tokens = self._preprocessor.tokens(left)
-        right_tokens = self._preprocessor.tokens(right)
-        if not left_tokens or not right_tokens:
+        ratio = SequenceMatcher(None, left.normalized, right.normalized).ratio()
+        if not left.tokens or not right.tokens:
             return ratio
 
-        overlap = len(left_tokens & right_tokens) / len(left_tokens | right_tokens)
+        overlap = len(left.tokens & right.tokens) / len(left.tokens | right.tokens)
         return max(ratio, overlap)
 
     def _field_priority(self, field_name: str) -> int:
-        priorities = {
-            "merchant": 3,
-            "notes": 2,
-            "title": 1,
-            "amount": 0,
-        }
-        return priorities[field_name]
+        return FIELD_PRIORITIES[field_name]
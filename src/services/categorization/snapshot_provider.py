@@ -1,15 +1,24 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+import logging
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date
 from decimal import Decimal
 
 from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.corpus import CategorizationCorpus
 from services.categorization.models import TransactionCategorizationQuery
 from services.domain.category_suggestion import TransactionCategorizationDocument
 from services.domain.transaction import AccountType, Transaction, TxTag, TxType
 from services.exceptions import TransactionNotFound
+from services.snapshot.models import TransactionSnapshot
 from services.snapshot.service import TransactionSnapshotService
 
+logger = logging.getLogger(__name__)
+
+type CategorizableSelector = Callable[[Iterable[Transaction]], list[Transaction]]
+
 
 class CategorizationSnapshotProvider:
     async def get_candidate_documents_for_user(
@@ -27,29 +36,81 @@ class CategorizationSnapshotProvider:
     ) -> TransactionCategorizationQuery:
         raise NotImplementedError
 
+    async def get_queries_for_transaction_ids(
+        self, user_id: str, transaction_ids: Sequence[str]
+    ) -> dict[str, TransactionCategorizationQuery]:
+        """Queries keyed by transaction id; unknown ids are left out."""
+        queries: dict[str, TransactionCategorizationQuery] = {}
+        for transaction_id in transaction_ids:
+            try:
+                queries[transaction_id] = await self.get_query_for_transaction_id(
+                    user_id, transaction_id
+                )
+            except TransactionNotFound:
+                continue
+        return queries
+
+    async def get_queries_for_period(
+        self, user_id: str, start_date: date, end_date: date
+    ) -> dict[str, TransactionCategorizationQuery]:
+        raise NotImplementedError
+
+
+@dataclass(slots=True)
+class _CachedCorpus:
+    snapshot: TransactionSnapshot
+    revision: int
+    user_id: str
+    corpus: CategorizationCorpus
+    transactions_by_id: dict[int, Transaction]
+
 
 class SnapshotCategorizationProvider(CategorizationSnapshotProvider):
+    """Categorization input built from the transaction snapshot.
+
+    The candidate corpus and an id -> transaction map are cached for the
+    snapshot they were built from and its ``revision``. The snapshot is not
+    user-partitioned, so one corpus serves every user; its documents carry
+    the id of the user whose lookup built it.
+
+    Registered as a transaction update observer after the snapshot service,
+    it applies each write-through patch (e.g. an applied category) to the
+    cached corpus in place, which engines replay as a single-document edit.
+    Anything else that changes the snapshot rebuilds the corpus.
+
+    ``select_categorizable`` picks the transactions of a period to suggest
+    for, e.g. ``FireflyTxService.select_for_screening`` so a month batch
+    covers exactly the screening month. Without it, every uncategorized,
+    non-internal transaction is picked.
+    With ``stored_snapshot_only`` it reads the stored snapshot as is and never
+    triggers a refresh, whose locks belong to the request event loop; this is
+    what lets a background pass run it on a worker thread.
+    ``cache_hits``/``cache_misses`` count lookups against that cache.
+    """
+
     def __init__(
         self,
         *,
         snapshot_service: TransactionSnapshotService,
         amount_bucketizer: AmountBucketizer,
+        select_categorizable: CategorizableSelector | None = None,
+        stored_snapshot_only: bool = False,
     ) -> None:
         self._snapshot_service = snapshot_service
         self._amount_bucketizer = amount_bucketizer
+        self._select_categorizable = select_categorizable
+        self._stored_snapshot_only = stored_snapshot_only
+        self._cached: _CachedCorpus | None = None
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     async def get_candidate_documents_for_user(
         self, user_id: str
     ) -> Sequence[TransactionCategorizationDocument]:
         # This is a single-user application. user_id stays on the contract for
         # future compatibility, but the current snapshot is not user-partitioned.
-        snapshot = await self._snapshot_service.get_snapshot()
-        documents: list[TransactionCategorizationDocument] = []
-        for tx in snapshot.transactions:
-            document = self._to_document(tx=tx, user_id=user_id)
-            if document is not None:
-                documents.append(document)
-        return documents
+        snapshot = await self._current_snapshot()
+        return self._cached_for(snapshot, user_id=user_id).corpus
 
     async def get_documents_for_user(
         self, user_id: str
@@ -61,13 +122,109 @@ class SnapshotCategorizationProvider(CategorizationSnapshotProvider):
     ) -> TransactionCategorizationQuery:
         # This is a single-user application. user_id stays on the contract for
         # future compatibility, but the current snapshot is not user-partitioned.
-        snapshot = await self._snapshot_service.get_snapshot()
-        tx = self._find_transaction(
-            snapshot.transactions, transaction_id=transaction_id
-        )
+        snapshot = await self._current_snapshot()
+        cached = self._cached_for(snapshot, user_id=user_id)
+        tx = self._find_transaction(cached, transaction_id=transaction_id)
         if tx is None:
             raise TransactionNotFound(f"Transaction id {transaction_id} not found")
+        return self._to_query(tx)
 
+    async def get_queries_for_transaction_ids(
+        self, user_id: str, transaction_ids: Sequence[str]
+    ) -> dict[str, TransactionCategorizationQuery]:
+        snapshot = await self._current_snapshot()
+        cached = self._cached_for(snapshot, user_id=user_id)
+        queries: dict[str, TransactionCategorizationQuery] = {}
+        for transaction_id in transaction_ids:
+            tx = self._find_transaction(cached, transaction_id=transaction_id)
+            if tx is not None:
+                queries[transaction_id] = self._to_query(tx)
+        return queries
+
+    async def get_queries_for_period(
+        self, user_id: str, start_date: date, end_date: date
+    ) -> dict[str, TransactionCategorizationQuery]:
+        """Queries for the categorizable transactions in the range."""
+        snapshot = await self._current_snapshot()
+        in_range = snapshot.query.between(start_date, end_date)
+        if self._select_categorizable is not None:
+            selected = self._select_categorizable(in_range)
+        else:
+            selected = [
+                tx
+                for tx in in_range
+                if tx.category is None and not self._is_internal_operation(tx)
+            ]
+        return {str(tx.id): self._to_query(tx) for tx in selected}
+
+    async def on_transaction_updated(self, tx: Transaction) -> None:
+        cached = self._cached
+        if cached is None:
+            return
+        snapshot = await self._snapshot_service.get_cached_snapshot()
+        # Exactly one patch (this one) since the corpus was last in sync.
+        if snapshot is not cached.snapshot or snapshot.revision != cached.revision + 1:
+            return
+        document = self._to_document(tx=tx, user_id=cached.user_id)
+        if document is None:
+            cached.corpus.remove(str(tx.id))
+        else:
+            cached.corpus.upsert(document)
+        cached.transactions_by_id[tx.id] = tx
+        cached.revision = snapshot.revision
+        logger.debug(
+            "Categorization corpus patched",
+            extra={"transaction_id": tx.id, "revision": snapshot.revision},
+        )
+
+    async def _current_snapshot(self) -> TransactionSnapshot:
+        if not self._stored_snapshot_only:
+            return await self._snapshot_service.get_snapshot()
+        snapshot = await self._snapshot_service.get_cached_snapshot()
+        if snapshot is None:
+            raise TransactionNotFound("No transaction snapshot is stored")
+        return snapshot
+
+    def _cached_for(
+        self, snapshot: TransactionSnapshot, *, user_id: str
+    ) -> _CachedCorpus:
+        cached = self._cached
+        if (
+            cached is not None
+            and cached.snapshot is snapshot
+            and cached.revision == snapshot.revision
+        ):
+            self.cache_hits += 1
+            return cached
+
+        self.cache_misses += 1
+        documents: list[TransactionCategorizationDocument] = []
+        for tx in snapshot.query.categorized:
+            document = self._to_document(tx=tx, user_id=user_id)
+            if document is not None:
+                documents.append(document)
+        cached = _CachedCorpus(
+            snapshot=snapshot,
+            revision=snapshot.revision,
+            user_id=user_id,
+            corpus=CategorizationCorpus(
+                documents, revision=(snapshot.fetched_at, snapshot.revision)
+            ),
+            transactions_by_id={tx.id: tx for tx in snapshot.transactions},
+        )
+        self._cached = cached
+        logger.debug(
+            "Categorization corpus rebuilt",
+            extra={
+                "revision": snapshot.revision,
+                "document_count": len(documents),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+            },
+        )
+        return cached
+
+    def _to_query(self, tx: Transaction) -> TransactionCategorizationQuery:
         merchant = getattr(tx, "merchant", None)
         amount = self._transaction_amount(tx)
         return TransactionCategorizationQuery(
@@ -106,12 +263,13 @@ class SnapshotCategorizationProvider(CategorizationSnapshotProvider):
         )
 
     def _find_transaction(
-        self, transactions: Sequence[Transaction], *, transaction_id: str
+        self, cached: _CachedCorpus, *, transaction_id: str
     ) -> Transaction | None:
-        for tx in transactions:
-            if str(tx.id) == transaction_id:
-                return tx
-        return None
+        try:
+            tx_id = int(transaction_id)
+        except ValueError:
+            return None
+        return cached.transactions_by_id.get(tx_id)
 
     def _transaction_amount(self, tx: Transaction) -> Decimal:
         return tx.amount
@@ -0,0 +1,265 @@
+from __future__ import annotations
+
+import math
+from collections import Counter
+from collections.abc import Hashable, Sequence
+
+import numpy as np
+
+from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.corpus import CategorizationCorpus
+from services.categorization.features import DocumentFeatures, document_features
+from services.categorization.models import TransactionCategorizationQuery
+from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.categorization.similarity_engine import (
+    FIELD_PRIORITIES,
+    TransactionSimilarityEngine,
+    select_field_weights,
+    sort_matches,
+)
+from services.domain.category_suggestion import (
+    SimilarTransactionMatch,
+    TransactionCategorizationDocument,
+)
+
+# Score by bucket distance 0, 1, 2 and anything further apart.
+_AMOUNT_SCORES = np.array([1.0, 0.65, 0.35, 0.0])
+
+
+def char_ngrams(text: str, size: int) -> list[str]:
+    """Character n-grams of a normalized string padded with one space."""
+    if not text:
+        return []
+    padded = f" {text} "
+    if len(padded) <= size:
+        return [padded]
+    return [padded[start : start + size] for start in range(len(padded) - size + 1)]
+
+
+class _FieldVectors:
+    """L2-normalized TF-IDF vectors of one text field, stored column-wise.
+
+    Column storage (n-gram -> rows and weights) turns a cosine similarity
+    against every row into one ``np.bincount`` over the query's n-grams.
+    """
+
+    def __init__(self, texts: Sequence[str], *, ngram_size: int) -> None:
+        self._ngram_size = ngram_size
+        self._row_count = len(texts)
+        self.vocabulary: dict[str, int] = {}
+        row_counts: list[Counter[int]] = []
+        for text in texts:
+            row_counts.append(
+                Counter(
+                    self.vocabulary.setdefault(gram, len(self.vocabulary))
+                    for gram in char_ngrams(text, ngram_size)
+                )
+            )
+
+        document_frequency = np.zeros(len(self.vocabulary))
+        for counts in row_counts:
+            document_frequency[list(counts)] += 1
+        self.idf = np.log((1 + self._row_count) / (1 + document_frequency)) + 1
+
+        rows: list[int] = []
+        columns: list[int] = []
+        values: list[float] = []
+        for row, counts in enumerate(row_counts):
+            weights = [count * self.idf[column] for column, count in counts.items()]
+            norm = math.sqrt(sum(weight * weight for weight in weights))
+            for column, weight in zip(counts, weights, strict=True):
+                rows.append(row)
+                columns.append(column)
+                values.append(weight / norm)
+
+        column_array = np.asarray(columns, dtype=np.int64)
+        order = np.argsort(column_array, kind="stable")
+        self._rows = np.asarray(rows, dtype=np.int64)[order]
+        self._values = np.asarray(values, dtype=np.float64)[order]
+        self._column_starts = np.concatenate(
+            ([0], np.cumsum(np.bincount(column_array, minlength=len(self.vocabulary))))
+        ).astype(np.int64)
+
+    def cosine(self, text: str) -> np.ndarray:
+        """Cosine similarity of ``text`` against every row."""
+        counts = Counter(
+            column
+            for gram in char_ngrams(text, self._ngram_size)
+            if (column := self.vocabulary.get(gram)) is not None
+        )
+        if not counts:
+            return np.zeros(self._row_count)
+
+        columns = list(counts)
+        weights = np.fromiter(counts.values(), dtype=np.float64) * self.idf[columns]
+        weights /= np.linalg.norm(weights)
+        starts = self._column_starts[columns]
+        ends = self._column_starts[np.asarray(columns) + 1]
+        rows = np.concatenate(
+            [self._rows[start:end] for start, end in zip(starts, ends, strict=True)]
+        )
+        values = np.concatenate(
+            [
+                self._values[start:end] * weight
+                for start, end, weight in zip(starts, ends, weights, strict=True)
+            ]
+        )
+        return np.bincount(rows, weights=values, minlength=self._row_count)
+
+
+class _CorpusVectors:
+    def __init__(
+        self,
+        features: Sequence[DocumentFeatures],
+        *,
+        amount_bucketizer: AmountBucketizer,
+        ngram_size: int,
+    ) -> None:
+        self.fields = {
+            field: _FieldVectors(
+                [getattr(item, field).normalized for item in features],
+                ngram_size=ngram_size,
+            )
+            for field in ("title", "merchant", "notes")
+        }
+        self.bucket_indices = np.array(
+            [
+                amount_bucketizer.bucket_index(item.amount_bucket)
+                if item.amount_bucket
+                else -1
+                for item in features
+            ],
+            dtype=np.int64,
+        )
+        self.positions = {
+            item.transaction_id: position
+            for position, item in enumerate(features)
+            if item.transaction_id is not None
+        }
+
+
+class TfidfTransactionSimilarityEngine(TransactionSimilarityEngine):
+    """Character n-gram TF-IDF cosine scoring of a query against documents.
+
+    Title, merchant and notes are vectorized once per corpus revision; each
+    query is then scored against every document with one sparse
+    matrix-vector product per field. IDF weights are corpus-wide, so an
+    in-place corpus edit causes a rebuild rather than a local update. Field
+    weights and the amount bucket score are the same as in
+    ``WeightedTransactionSimilarityEngine``.
+    """
+
+    def __init__(
+        self,
+        *,
+        preprocessor: CategorizationTextPreprocessor,
+        amount_bucketizer: AmountBucketizer,
+        min_similarity_score: float = 0.35,
+        ngram_size: int = 3,
+    ) -> None:
+        self._preprocessor = preprocessor
+        self._amount_bucketizer = amount_bucketizer
+        self._min_similarity_score = min_similarity_score
+        self._ngram_size = ngram_size
+        self._vectors: tuple[Hashable, _CorpusVectors] | None = None
+
+    async def find_similar_batch(
+        self,
+        queries: Sequence[TransactionCategorizationQuery],
+        candidates: Sequence[TransactionCategorizationDocument],
+        limit: int = 20,
+    ) -> list[Sequence[SimilarTransactionMatch]]:
+        vectors = self._vectors_for(candidates)
+        return [
+            self._score_query(query, candidates, vectors, limit=limit)
+            for query in queries
+        ]
+
+    def _vectors_for(
+        self, candidates: Sequence[TransactionCategorizationDocument]
+    ) -> _CorpusVectors:
+        if not isinstance(candidates, CategorizationCorpus):
+            return self._build_vectors(
+                [document_features(self._preprocessor, item) for item in candidates]
+            )
+
+        if candidates.revision is None:
+            return self._build_vectors(candidates.features(self._preprocessor))
+        revision = (candidates.revision, candidates.edit_count)
+        if self._vectors is None or self._vectors[0] != revision:
+            self._vectors = (
+                revision,
+                self._build_vectors(candidates.features(self._preprocessor)),
+            )
+        return self._vectors[1]
+
+    def _build_vectors(self, features: Sequence[DocumentFeatures]) -> _CorpusVectors:
+        return _CorpusVectors(
+            features,
+            amount_bucketizer=self._amount_bucketizer,
+            ngram_size=self._ngram_size,
+        )
+
+    def _score_query(
+        self,
+        query: TransactionCategorizationQuery,
+        candidates: Sequence[TransactionCategorizationDocument],
+        vectors: _CorpusVectors,
+        *,
+        limit: int,
+    ) -> list[SimilarTransactionMatch]:
+        prepared = document_features(self._preprocessor, query)
+        weights = select_field_weights(prepared)
+
+        contributions: dict[str, np.ndarray] = {}
+        for field, field_vectors in vectors.fields.items():
+            text = getattr(prepared, field).normalized
+            contributions[field] = weights[field] * field_vectors.cosine(text)
+        contributions["amount"] = weights["amount"] * self._amount_scores(
+            prepared.amount_bucket, vectors.bucket_indices
+        )
+        scores = sum(contributions.values(), np.zeros(len(candidates)))
+
+        if query.transaction_id is not None:
+            own_position = vectors.positions.get(query.transaction_id)
+            if own_position is not None:
+                scores[own_position] = -1.0
+
+        positions = np.flatnonzero(scores >= self._min_similarity_score)
+        if len(positions) > limit:
+            # Keep everything that may tie with the limit-th score after
+            # rounding; the final order is decided by ``sort_matches``.
+            kth = np.partition(scores[positions], -limit)[-limit]
+            positions = positions[scores[positions] >= kth - 1e-4]
+
+        matches = []
+        for position in positions.tolist():
+            candidate = candidates[position]
+            matched_by = max(
+                contributions,
+                key=lambda field: (
+                    contributions[field][position],
+                    FIELD_PRIORITIES[field],
+                ),
+            )
+            matches.append(
+                SimilarTransactionMatch(
+                    transaction_id=candidate.transaction_id,
+                    category_id=candidate.category_id,
+                    category_name=candidate.category_name,
+                    similarity_score=round(float(scores[position]), 4),
+                    matched_by=matched_by,
+                )
+            )
+        return sort_matches(matches)[:limit]
+
+    def _amount_scores(
+        self, query_bucket: str, bucket_indices: np.ndarray
+    ) -> np.ndarray:
+        if not query_bucket:
+            return np.zeros(len(bucket_indices))
+        distance = np.abs(
+            bucket_indices - self._amount_bucketizer.bucket_index(query_bucket)
+        )
+        scores = _AMOUNT_SCORES[np.minimum(distance, len(_AMOUNT_SCORES) - 1)]
+        return np.where(bucket_indices < 0, 0.0, scores)
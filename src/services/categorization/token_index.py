@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+from services.categorization.features import DocumentFeatures, TextFeatures
+
+TEXT_FIELDS = ("title", "merchant", "notes")
+
+
+class CategorizationTokenIndex:
+    """Inverted index from normalized field tokens to corpus positions.
+
+    Tokens are keyed by their first ``prefix_length`` characters, so Polish
+    inflections ("biedronka", "biedronki") and truncated merchant names still
+    meet. Only the same field is looked up on both sides, because the engine
+    never compares a title with a merchant.
+
+    Candidate selection is lossy: the engine's fuzzy ratio can pass its
+    threshold for documents that share no key with the query (e.g. "zabka"
+    and "xzabka"), and those are never returned.
+
+    Keys held by more than ``max_key_share`` of the documents (e.g. "blik" or
+    a city name) are skipped during lookup. This keeps candidate lists short
+    but may drop documents that only share such words, so it is off (``None``)
+    unless configured.
+
+    ``add`` and ``discard`` update a single position in O(its tokens).
+    """
+
+    def __init__(
+        self,
+        documents: Sequence[DocumentFeatures],
+        *,
+        prefix_length: int = 4,
+        max_key_share: float | None = None,
+    ) -> None:
+        self._prefix_length = prefix_length
+        self._max_key_share = max_key_share
+        self._postings: dict[str, dict[str, set[int]]] = {
+            field: {} for field in TEXT_FIELDS
+        }
+        self._buckets: dict[str, set[int]] = {}
+        self._document_count = 0
+
+        for position, document in enumerate(documents):
+            self.add(position, document)
+
+    def add(self, position: int, document: DocumentFeatures) -> None:
+        for field in TEXT_FIELDS:
+            postings = self._postings[field]
+            for key in self.keys(getattr(document, field)):
+                postings.setdefault(key, set()).add(position)
+        self._buckets.setdefault(document.amount_bucket, set()).add(position)
+        self._document_count += 1
+
+    def discard(self, position: int, document: DocumentFeatures) -> None:
+        """Remove ``position``; ``document`` must be what was added there."""
+        for field in TEXT_FIELDS:
+            postings = self._postings[field]
+            for key in self.keys(getattr(document, field)):
+                matching = postings.get(key)
+                if matching is not None:
+                    matching.discard(position)
+                    if not matching:
+                        del postings[key]
+        bucket = self._buckets.get(document.amount_bucket)
+        if bucket is not None:
+            bucket.discard(position)
+        self._document_count -= 1
+
+    def keys(self, text: TextFeatures) -> set[str]:
+        return {token[: self._prefix_length] for token in text.tokens}
+
+    def candidate_positions(
+        self,
+        query: DocumentFeatures,
+        *,
+        bucket_fallback: bool = True,
+    ) -> list[int]:
+        """Positions sharing a token key with the query in any text field.
+
+        Without any token hit, documents from the query's amount bucket are
+        returned instead when ``bucket_fallback`` is enabled.
+        """
+        max_postings = (
+            self._document_count
+            if self._max_key_share is None
+            else self._document_count * self._max_key_share
+        )
+        positions: set[int] = set()
+        for field in TEXT_FIELDS:
+            postings = self._postings[field]
+            for key in self.keys(getattr(query, field)):
+                matching = postings.get(key, ())
+                if len(matching) <= max_postings:
+                    positions.update(matching)
+        if not positions and bucket_fallback:
+            positions = self._buckets.get(query.amount_bucket, set())
+        return sorted(positions)
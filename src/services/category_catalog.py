@@ -0,0 +1,86 @@
+import asyncio
+import hashlib
+import logging
+import time
+from collections.abc import Callable
+
+from services.domain.transaction import Category
+from services.firefly_tx_service import FireflyTxService
+
+logger = logging.getLogger(__name__)
+
+
+def categories_version(categories: list[Category]) -> str:
+    """Content hash of a category list, stable across restarts and workers."""
+    digest = hashlib.sha1(usedforsecurity=False)
+    for category in sorted(categories, key=lambda cat: cat.id):
+        digest.update(f"{category.id}\x1f{category.name}\x1e".encode())
+    return digest.hexdigest()[:16]
+
+
+class CategoryCatalog:
+    """Process-wide cache of Firefly categories used by screening.
+
+    Categories are reloaded once ``ttl_seconds`` have passed (``0`` reloads on
+    every call) and concurrent callers share a single Firefly request.
+    ``version`` is a content hash that clients can send back to skip
+    downloading an unchanged list.
+    """
+
+    def __init__(
+        self,
+        tx_service: FireflyTxService,
+        *,
+        ttl_seconds: int = 3600,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.tx_service = tx_service
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = asyncio.Lock()
+        self._categories: list[Category] | None = None
+        self._version: str | None = None
+        self._loaded_at = 0.0
+        self._generation = 0
+
+    @property
+    def version(self) -> str | None:
+        return self._version
+
+    async def get_categories(self, *, force_refresh: bool = False) -> list[Category]:
+        if not force_refresh and self._is_fresh():
+            assert self._categories is not None
+            return self._categories
+
+        generation = self._generation
+        async with self._lock:
+            # Whoever held the lock may have just loaded the list for us.
+            reloaded = self._generation != generation
+            if self._categories is None or not (
+                reloaded or (not force_refresh and self._is_fresh())
+            ):
+                await self._load()
+            assert self._categories is not None
+            return self._categories
+
+    def invalidate(self) -> None:
+        """Drop the cached list so the next call reloads it from Firefly."""
+        self._categories = None
+        logger.info("Category catalog invalidated")
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._categories is not None
+            and self._clock() - self._loaded_at < self.ttl_seconds
+        )
+
+    async def _load(self) -> None:
+        categories = await self.tx_service.get_categories()
+        self._categories = categories
+        self._version = categories_version(categories)
+        self._loaded_at = self._clock()
+        self._generation += 1
+        logger.debug(
+            "Category catalog loaded",
+            extra={"category_count": len(categories), "version": self._version},
+        )
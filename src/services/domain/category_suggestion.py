@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from datetime import datetime
 from decimal import Decimal
 
+from services.domain.job_base import JobStatus
+
 
 @dataclass(slots=True, frozen=True)
 class CategorySuggestion:
@@ -33,3 +36,13 @@ class SimilarTransactionMatch:
     category_name: str
     similarity_score: float
     matched_by: str
+
+
+@dataclass(slots=True)
+class SuggestionPrecomputeProgress:
+    status: JobStatus
+    revision: int | None = None
+    total: int = 0
+    completed: int = 0
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
@@ -30,7 +30,7 @@ class AccountType(StrEnum):
     RECONCILIATION = "reconciliation"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Category:
     id: int
     name: str
@@ -62,7 +62,7 @@ class Transaction(BaseMatchItem):
     id: int
     type: TxType
     description: str
-    tags: set[str]
+    tags: frozenset[str]
     notes: str | None
     category: Category | None
     currency: Currency
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Literal
+from uuid import UUID
+
+from services.domain.job_base import JobStatus
+
+
+@dataclass(frozen=True, slots=True)
+class TxOperation:
+    transaction_id: int
+    category_id: int | None = None
+    tags: frozenset[str] = frozenset()
+
+
+@dataclass(slots=True)
+class TxOperationOutcome:
+    transaction_id: int
+    status: Literal["success", "failed"]
+    reason: str | None = None
+
+
+@dataclass(slots=True)
+class TxBulkJob:
+    id: UUID
+    total: int
+    status: JobStatus
+    started_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    applied: int = 0
+    failed: int = 0
+    results: list[TxOperationOutcome] = field(default_factory=list)
+    finished_at: datetime | None = None
@@ -1,12 +1,19 @@
+import logging
+import time
 from datetime import date
+from typing import Protocol
 
 from ff_iii_luciferin.api import FireflyAPIError, FireflyClient
+from ff_iii_luciferin.domain.models import SimplifiedTx
 from ff_iii_luciferin.services.transactions import fetch_transactions_with_stats
 
 from services.domain.metrics import FetchMetrics
 from services.domain.transaction import Transaction, TransactionUpdate
+from services.firefly_pages import fetch_transaction_pages
 from services.mappers.firefly import tx_from_ff_tx, tx_update_to_ff_tx_update
 
+logger = logging.getLogger(__name__)
+
 
 class FireflyServiceError(RuntimeError):
     """Raised when Firefly III API calls fail."""
@@ -16,6 +23,10 @@ class FireflyServiceError(RuntimeError):
         self.status_code = status_code
 
 
+class TransactionUpdateObserver(Protocol):
+    async def on_transaction_updated(self, tx: Transaction) -> None: ...
+
+
 def filter_by_description(
     transactions: list[Transaction],
     description_filter: str,
@@ -54,8 +65,18 @@ class FireflyBaseService:
     def __init__(
         self,
         firefly_client: FireflyClient,
+        *,
+        fetch_concurrency: int = 1,
     ):
         self.firefly_client = firefly_client
+        # Pages requested at once when listing transactions; 1 keeps the
+        # client's sequential pagination.
+        self.fetch_concurrency = fetch_concurrency
+        self._update_observers: list[TransactionUpdateObserver] = []
+
+    def add_update_observer(self, observer: TransactionUpdateObserver) -> None:
+        """Register a callback fed with transactions after successful updates."""
+        self._update_observers.append(observer)
 
     async def fetch_transactions(
         self,
@@ -66,13 +87,24 @@ class FireflyBaseService:
         exclude_categorized: bool = False,
     ) -> list[Transaction]:
         try:
-            ff_txs = await self.firefly_client.fetch_transactions(
-                start_date=start_date,
-                end_date=end_date,
-                page_size=page_size,
-                max_pages=max_pages,
-            )
-            domain_txs = [tx_from_ff_tx(tx) for tx in ff_txs]
+            if self.fetch_concurrency > 1:
+                pages = await fetch_transaction_pages(
+                    self.firefly_client,
+                    max_in_flight=self.fetch_concurrency,
+                    start_date=start_date,
+                    end_date=end_date,
+                    page_size=page_size,
+                    max_pages=max_pages,
+                )
+                domain_txs = [tx for page in pages for tx in page.transactions]
+            else:
+                ff_txs = await self.firefly_client.fetch_transactions(
+                    start_date=start_date,
+                    end_date=end_date,
+                    page_size=page_size,
+                    max_pages=max_pages,
+                )
+                domain_txs = [tx_from_ff_tx(tx) for tx in ff_txs]
         except FireflyAPIError as e:
             raise FireflyServiceError(
                 message="Failed to fetch transactions from Firefly iii",
@@ -88,16 +120,39 @@ class FireflyBaseService:
     ) -> None:
         payload_ff = tx_update_to_ff_tx_update(payload)
         try:
-            await self.firefly_client.update_transaction(tx.id, payload_ff)
+            updated = await self.firefly_client.update_transaction(tx.id, payload_ff)
         except FireflyAPIError as e:
             raise FireflyServiceError(
                 message=f"Failed to update transaction {tx.id}",
                 status_code=e.status_code,
             ) from e
+        await self._notify_updated(updated)
+
+    async def _notify_updated(self, updated: SimplifiedTx) -> None:
+        # Firefly answers the PUT with the transaction as stored (after rules
+        # ran), which is what observers should see. Observer failures must not
+        # turn a successful update into an error for the caller.
+        if not self._update_observers:
+            return
+        try:
+            domain_tx = tx_from_ff_tx(updated)
+        except Exception:
+            logger.exception("Failed to map updated Firefly transaction")
+            return
+        for observer in self._update_observers:
+            try:
+                await observer.on_transaction_updated(domain_tx)
+            except Exception:
+                logger.exception(
+                    "Transaction update observer failed",
+                    extra={"transaction_id": domain_tx.id},
+                )
 
     async def fetch_transactions_with_metrics(
         self, start_date: date | None = None, end_date: date | None = None
     ) -> tuple[list[Transaction], FetchMetrics]:
+        if self.fetch_concurrency > 1:
+            return await self._fetch_pages_with_metrics(start_date, end_date)
         try:
             ff_txs, stats = await fetch_transactions_with_stats(
                 self.firefly_client, start_date=start_date, end_date=end_date
@@ -115,3 +170,28 @@ class FireflyBaseService:
             multipart=stats.multipart,
         )
         return domain_txs, domain_stats
+
+    async def _fetch_pages_with_metrics(
+        self, start_date: date | None, end_date: date | None
+    ) -> tuple[list[Transaction], FetchMetrics]:
+        start_ts = time.monotonic()
+        try:
+            pages = await fetch_transaction_pages(
+                self.firefly_client,
+                max_in_flight=self.fetch_concurrency,
+                start_date=start_date,
+                end_date=end_date,
+            )
+        except FireflyAPIError as e:
+            raise FireflyServiceError(
+                message="Failed to fetch transactions from Firefly iii",
+                status_code=e.status_code,
+            ) from e
+        domain_txs = [tx for page in pages for tx in page.transactions]
+        domain_stats = FetchMetrics(
+            total_transactions=len(domain_txs),
+            fetching_duration_ms=int((time.monotonic() - start_ts) * 1000),
+            invalid=sum(page.invalid for page in pages),
+            multipart=sum(page.multipart for page in pages),
+        )
+        return domain_txs, domain_stats
@@ -16,8 +16,8 @@ from settings import settings
 
 
 class FireflyEnrichmentService(FireflyBaseService):
-    def __init__(self, firefly_client: FireflyClient):
-        super().__init__(firefly_client)
+    def __init__(self, firefly_client: FireflyClient, *, fetch_concurrency: int = 1):
+        super().__init__(firefly_client, fetch_concurrency=fetch_concurrency)
 
     async def match_with_unmatched(
         self, candidates: Sequence[BaseMatchItem], filter_text: str, tag_done: TxTag
@@ -1,3 +1,4 @@
+from collections.abc import Iterable
 from datetime import date
 
 from ff_iii_luciferin.api import FireflyAPIError, FireflyClient
@@ -22,8 +23,10 @@ class FireflyTxService(FireflyBaseService):
         firefly_client: FireflyClient,
         filter_desc_blik: str,
         filter_desc_allegro: str,
+        *,
+        fetch_concurrency: int = 1,
     ):
-        super().__init__(firefly_client)
+        super().__init__(firefly_client, fetch_concurrency=fetch_concurrency)
         self.filter_desc_blik = filter_desc_blik
         self.filter_desc_allegro = filter_desc_allegro
 
@@ -33,8 +36,17 @@ class FireflyTxService(FireflyBaseService):
         domain_txs = await self.fetch_transactions(
             start_date=start_date, end_date=end_date, exclude_categorized=True
         )
+        return self.select_for_screening(domain_txs)
+
+    def select_for_screening(
+        self, transactions: Iterable[Transaction]
+    ) -> list[Transaction]:
+        """Keep uncategorized transactions that no other workflow handles."""
         filtered = filter_by_description(
-            domain_txs, self.filter_desc_blik, exact_match=True, exclude=True
+            [t for t in transactions if t.category is None],
+            self.filter_desc_blik,
+            exact_match=True,
+            exclude=True,
         )
         filtered = [t for t in filtered if TxTag.action_req not in t.tags]
         filtered = [
@@ -74,10 +86,35 @@ class FireflyTxService(FireflyBaseService):
         await self.update_transaction(tx, payload=payload)
 
     async def add_tag(self, tx: Transaction, tag: str) -> None:
-        tx.tags.add(tag)
+        tx.tags = tx.tags | {tag}
         paytoad = TransactionUpdate(tags=list(tx.tags))
         await self.update_transaction(tx, paytoad)
 
+    async def apply_changes(
+        self,
+        tx: Transaction,
+        *,
+        category_id: int | None = None,
+        tags: frozenset[str] = frozenset(),
+    ) -> bool:
+        """Set category and add tags in a single update.
+
+        ``tx`` is not modified, so it may come from a shared snapshot. Returns
+        False without calling Firefly when nothing would change.
+        """
+        category_changed = category_id is not None and (
+            tx.category is None or tx.category.id != category_id
+        )
+        new_tags = tags - tx.tags
+        if not category_changed and not new_tags:
+            return False
+        payload = TransactionUpdate(
+            category_id=category_id if category_changed else None,
+            tags=sorted(tx.tags | new_tags) if new_tags else None,
+        )
+        await self.update_transaction(tx, payload)
+        return True
+
     async def apply_category_by_id(self, tx_id: int, category_id: int) -> None:
         tx = await self.get_transaction(tx_id)
         await self.apply_category(tx=tx, category_id=category_id)
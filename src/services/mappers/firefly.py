@@ -11,22 +11,25 @@ from services.domain.transaction import (
     AccountRef,
     AccountType,
     Category,
-    Currency,
     FXContext,
     Transaction,
     TransactionUpdate,
     TxType,
 )
+from services.mappers.flyweight import default_pool
 
 
 def tx_from_ff_tx(tx: SimplifiedTx) -> Transaction:
+    # Repeated values are shared through the flyweight pool; see
+    # services.mappers.flyweight.
+    pool = default_pool
     fx = None
     if tx.fx is not None:
         fx = FXContext(
-            original_currency=Currency(
-                code=tx.fx.original_currency.code,
-                symbol=tx.fx.original_currency.symbol,
-                decimals=tx.fx.original_currency.decimals,
+            original_currency=pool.currency(
+                tx.fx.original_currency.code,
+                tx.fx.original_currency.symbol,
+                tx.fx.original_currency.decimals,
             ),
             original_amount=tx.fx.original_amount,
         )
@@ -44,16 +47,14 @@ def tx_from_ff_tx(tx: SimplifiedTx) -> Transaction:
         date=tx.date,
         amount=tx.amount,
         type=TxType(tx.type.value),
-        description=tx.description,
-        tags=set(tx.tags),
+        description=pool.text(tx.description),
+        tags=pool.tags(tx.tags),
         notes=tx.notes,
         category=(
-            Category(id=tx.category.id, name=tx.category.name) if tx.category else None
+            pool.category(tx.category.id, tx.category.name) if tx.category else None
         ),
-        currency=Currency(
-            code=tx.currency.code,
-            symbol=tx.currency.symbol,
-            decimals=tx.currency.decimals,
+        currency=pool.currency(
+            tx.currency.code, tx.currency.symbol, tx.currency.decimals
         ),
         fx=fx,
         source_account=source_account,
@@ -66,11 +67,8 @@ def category_from_ff_category(cat: SimplifiedCategory) -> Category:
 
 
 def account_ref_from_ff_account_ref(account: ff_account_ref) -> AccountRef:
-    return AccountRef(
-        id=account.id,
-        name=account.name,
-        type=AccountType(account.type.value),
-        iban=account.iban,
+    return default_pool.account(
+        account.id, account.name, AccountType(account.type.value), account.iban
     )
 
 
@@ -0,0 +1,63 @@
+"""Shared instances for values repeated across many snapshot transactions.
+
+A snapshot holds 100k+ transactions that reference a few dozen currencies,
+accounts, categories and tag combinations. Mapping them through a pool makes
+every row point at one frozen instance per distinct value instead of owning
+copies. Pooled values are immutable, so sharing them cannot leak edits
+between transactions.
+"""
+
+import sys
+from collections.abc import Iterable
+
+from services.domain.transaction import AccountRef, AccountType, Category, Currency
+
+
+class FlyweightPool:
+    def __init__(self) -> None:
+        self._currencies: dict[tuple[str, str, int], Currency] = {}
+        self._accounts: dict[tuple[int, str, AccountType, str | None], AccountRef] = {}
+        self._categories: dict[tuple[int, str], Category] = {}
+        self._tag_sets: dict[frozenset[str], frozenset[str]] = {}
+
+    def text(self, value: str) -> str:
+        return sys.intern(value)
+
+    def currency(self, code: str, symbol: str, decimals: int) -> Currency:
+        key = (code, symbol, decimals)
+        currency = self._currencies.get(key)
+        if currency is None:
+            currency = Currency(
+                code=self.text(code), symbol=self.text(symbol), decimals=decimals
+            )
+            self._currencies[key] = currency
+        return currency
+
+    def account(
+        self, id: int, name: str, type: AccountType, iban: str | None = None
+    ) -> AccountRef:
+        key = (id, name, type, iban)
+        account = self._accounts.get(key)
+        if account is None:
+            account = AccountRef(id=id, name=self.text(name), type=type, iban=iban)
+            self._accounts[key] = account
+        return account
+
+    def category(self, id: int, name: str) -> Category:
+        key = (id, name)
+        category = self._categories.get(key)
+        if category is None:
+            category = Category(id=id, name=self.text(name))
+            self._categories[key] = category
+        return category
+
+    def tags(self, tags: Iterable[str]) -> frozenset[str]:
+        key = frozenset(tags)
+        pooled = self._tag_sets.get(key)
+        if pooled is None:
+            pooled = frozenset(self.text(tag) for tag in key)
+            self._tag_sets[pooled] = pooled
+        return pooled
+
+
+default_pool = FlyweightPool()
@@ -4,13 +4,20 @@ from services.snapshot.metrics import (
     SnapshotTxMetricsService,
 )
 from services.snapshot.models import TransactionSnapshot
+from services.snapshot.scheduler import SnapshotRefreshScheduler
 from services.snapshot.service import TransactionSnapshotService
-from services.snapshot.store import InMemorySnapshotStore, SnapshotStore
+from services.snapshot.store import (
+    FileSnapshotStore,
+    InMemorySnapshotStore,
+    SnapshotStore,
+)
 
 __all__ = [
+    "FileSnapshotStore",
     "InMemorySnapshotStore",
     "SnapshotAllegroMetricsService",
     "SnapshotBlikMetricsService",
+    "SnapshotRefreshScheduler",
     "SnapshotStore",
     "TransactionSnapshot",
     "TransactionSnapshotService",
@@ -0,0 +1,225 @@
+"""Compact binary encoding of ``TransactionSnapshot`` for on-disk stores.
+
+Layout: ``MAGIC`` + big-endian ``(format_version, schema_version)`` header,
+followed by a zlib-compressed pickle that only contains primitive values
+(ints, strings, tuples, lists, dicts and ``None``). Repeated currencies,
+categories and accounts are stored once in lookup tables and referenced by
+index from each transaction row.
+"""
+
+from __future__ import annotations
+
+import io
+import pickle
+import struct
+import zlib
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+
+from services.domain.metrics import FetchMetrics
+from services.domain.transaction import (
+    AccountRef,
+    AccountType,
+    Currency,
+    FXContext,
+    Transaction,
+    TxType,
+)
+from services.mappers.flyweight import default_pool
+from services.snapshot.models import TransactionSnapshot
+
+MAGIC = b"FF3SNAP"
+FORMAT_VERSION = 1
+CURRENT_SCHEMA_VERSION = 1
+_HEADER = struct.Struct(">HH")
+
+
+class SnapshotFormatError(ValueError):
+    """Raised when a persisted snapshot cannot be decoded."""
+
+
+class SnapshotSchemaMismatch(SnapshotFormatError):
+    """Raised when a persisted snapshot was written with another schema."""
+
+    def __init__(self, schema_version: int) -> None:
+        super().__init__(
+            f"Snapshot schema version {schema_version} is not supported "
+            f"(expected {CURRENT_SCHEMA_VERSION})"
+        )
+        self.schema_version = schema_version
+
+
+class _PrimitiveUnpickler(pickle.Unpickler):
+    def find_class(self, module: str, name: str) -> Any:
+        raise SnapshotFormatError(f"Forbidden global in snapshot: {module}.{name}")
+
+
+class _Interner[T]:
+    def __init__(self) -> None:
+        self._index: dict[T, int] = {}
+        self.items: list[T] = []
+
+    def ref(self, item: T | None) -> int:
+        if item is None:
+            return -1
+        position = self._index.get(item)
+        if position is None:
+            position = len(self.items)
+            self._index[item] = position
+            self.items.append(item)
+        return position
+
+
+def encode_snapshot(snapshot: TransactionSnapshot) -> bytes:
+    currencies: _Interner[Currency] = _Interner()
+    accounts: _Interner[AccountRef] = _Interner()
+    categories: _Interner[tuple[int, str]] = _Interner()
+
+    rows = []
+    for tx in snapshot.transactions:
+        category = None if tx.category is None else (tx.category.id, tx.category.name)
+        fx = None
+        if tx.fx is not None:
+            fx = (currencies.ref(tx.fx.original_currency), str(tx.fx.original_amount))
+        rows.append(
+            (
+                tx.id,
+                tx.date.toordinal(),
+                str(tx.amount),
+                tx.type.value,
+                tx.description,
+                tuple(sorted(tx.tags)),
+                tx.notes,
+                categories.ref(category),
+                currencies.ref(tx.currency),
+                fx,
+                accounts.ref(tx.source_account),
+                accounts.ref(tx.destination_account),
+            )
+        )
+
+    payload = {
+        "fetched_at": snapshot.fetched_at.isoformat(),
+        "reconciled_at": (
+            None
+            if snapshot.reconciled_at is None
+            else snapshot.reconciled_at.isoformat()
+        ),
+        "revision": snapshot.revision,
+        "metrics": (
+            snapshot.metrics.total_transactions,
+            snapshot.metrics.fetching_duration_ms,
+            snapshot.metrics.invalid,
+            snapshot.metrics.multipart,
+        ),
+        "currencies": [(c.code, c.symbol, c.decimals) for c in currencies.items],
+        "accounts": [(a.id, a.name, a.type.value, a.iban) for a in accounts.items],
+        "categories": categories.items,
+        "transactions": rows,
+    }
+    body = zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL), 1)
+    return MAGIC + _HEADER.pack(FORMAT_VERSION, snapshot.schema_version) + body
+
+
+def read_schema_version(data: bytes) -> int:
+    header_end = len(MAGIC) + _HEADER.size
+    if len(data) < header_end or not data.startswith(MAGIC):
+        raise SnapshotFormatError("Not a transaction snapshot file")
+    format_version, schema_version = _HEADER.unpack(data[len(MAGIC) : header_end])
+    if format_version != FORMAT_VERSION:
+        raise SnapshotFormatError(
+            f"Snapshot format version {format_version} is not supported"
+        )
+    return schema_version
+
+
+def decode_snapshot(data: bytes) -> TransactionSnapshot:
+    schema_version = read_schema_version(data)
+    if schema_version != CURRENT_SCHEMA_VERSION:
+        raise SnapshotSchemaMismatch(schema_version)
+
+    try:
+        body = zlib.decompress(data[len(MAGIC) + _HEADER.size :])
+        payload = _PrimitiveUnpickler(io.BytesIO(body)).load()
+        return _snapshot_from_payload(payload, schema_version=schema_version)
+    except SnapshotFormatError:
+        raise
+    except Exception as exc:
+        raise SnapshotFormatError("Corrupted transaction snapshot file") from exc
+
+
+def _snapshot_from_payload(
+    payload: dict[str, Any], *, schema_version: int
+) -> TransactionSnapshot:
+    pool = default_pool
+    currencies = [
+        pool.currency(code, symbol, decimals)
+        for code, symbol, decimals in payload["currencies"]
+    ]
+    accounts = [
+        pool.account(account_id, name, AccountType(type_), iban)
+        for account_id, name, type_, iban in payload["accounts"]
+    ]
+    categories = [
+        pool.category(category_id, name) for category_id, name in payload["categories"]
+    ]
+
+    transactions = []
+    for (
+        tx_id,
+        ordinal,
+        amount,
+        tx_type,
+        description,
+        tags,
+        notes,
+        category_ref,
+        currency_ref,
+        fx,
+        source_ref,
+        destination_ref,
+    ) in payload["transactions"]:
+        transactions.append(
+            Transaction(
+                id=tx_id,
+                date=date.fromordinal(ordinal),
+                amount=Decimal(amount),
+                type=TxType(tx_type),
+                description=pool.text(description),
+                tags=pool.tags(tags),
+                notes=notes,
+                category=categories[category_ref] if category_ref >= 0 else None,
+                currency=currencies[currency_ref],
+                fx=(
+                    None
+                    if fx is None
+                    else FXContext(
+                        original_currency=currencies[fx[0]],
+                        original_amount=Decimal(fx[1]),
+                    )
+                ),
+                source_account=accounts[source_ref] if source_ref >= 0 else None,
+                destination_account=(
+                    accounts[destination_ref] if destination_ref >= 0 else None
+                ),
+            )
+        )
+
+    total, duration_ms, invalid, multipart = payload["metrics"]
+    reconciled_at = payload["reconciled_at"]
+    return TransactionSnapshot(
+        transactions=transactions,
+        metrics=FetchMetrics(
+            total_transactions=total,
+            fetching_duration_ms=duration_ms,
+            invalid=invalid,
+            multipart=multipart,
+        ),
+        fetched_at=datetime.fromisoformat(payload["fetched_at"]),
+        schema_version=schema_version,
+        reconciled_at=(
+            None if reconciled_at is None else datetime.fromisoformat(reconciled_at)
+        ),
+        revision=payload.get("revision", 0),
+    )
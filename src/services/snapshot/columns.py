@@ -0,0 +1,84 @@
+from collections.abc import Iterable, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from services.domain.transaction import Transaction, TxTag
+
+Mask = npt.NDArray[np.bool_]
+
+
+class SnapshotColumns:
+    """Columnar projection of a snapshot used by the statistics endpoints.
+
+    Every array has one entry per transaction, in snapshot order. Months are
+    stored as ``year * 12 + month - 1`` so histograms are a single
+    ``bincount``. Description masks are case-insensitive, matching
+    ``TransactionSnapshotQuery``, and memoized per filter.
+    """
+
+    def __init__(self, transactions: Sequence[Transaction]) -> None:
+        count = len(transactions)
+
+        def tx_mask(values: Iterable[bool]) -> Mask:
+            return np.fromiter(values, dtype=np.bool_, count=count)
+
+        # Descriptions repeat heavily, so each distinct one is lower-cased once
+        # and rows only carry its code.
+        codes: dict[str, int] = {}
+        self._description_codes = np.fromiter(
+            (codes.setdefault(tx.description, len(codes)) for tx in transactions),
+            dtype=np.int64,
+            count=count,
+        )
+        self._descriptions = [description.lower() for description in codes]
+        self._exact_cache: dict[str, Mask] = {}
+        self._contains_cache: dict[str, Mask] = {}
+
+        self.months = np.fromiter(
+            (tx.date.year * 12 + tx.date.month - 1 for tx in transactions),
+            dtype=np.int64,
+            count=count,
+        )
+        self.categorized = tx_mask(tx.category is not None for tx in transactions)
+        self.blik_done = tx_mask(TxTag.blik_done in tx.tags for tx in transactions)
+        self.allegro_done = tx_mask(
+            TxTag.allegro_done in tx.tags for tx in transactions
+        )
+        self.action_req = tx_mask(TxTag.action_req in tx.tags for tx in transactions)
+
+    def description_is(self, description: str) -> Mask:
+        needle = description.lower()
+        mask = self._exact_cache.get(needle)
+        if mask is None:
+            mask = self._description_mask(
+                [text == needle for text in self._descriptions]
+            )
+            self._exact_cache[needle] = mask
+        return mask
+
+    def description_contains(self, fragment: str) -> Mask:
+        needle = fragment.lower()
+        mask = self._contains_cache.get(needle)
+        if mask is None:
+            mask = self._description_mask(
+                [needle in text for text in self._descriptions]
+            )
+            self._contains_cache[needle] = mask
+        return mask
+
+    def count_by_month(self, mask: Mask) -> dict[str, int]:
+        """Per-month counts of the selected rows, keyed ``YYYY-MM`` in order."""
+        months = self.months[mask]
+        if months.size == 0:
+            return {}
+        first = int(months.min())
+        counts = np.bincount(months - first)
+        return {
+            f"{(first + offset) // 12:04d}-{(first + offset) % 12 + 1:02d}": int(n)
+            for offset, n in enumerate(counts.tolist())
+            if n
+        }
+
+    def _description_mask(self, matches: list[bool]) -> Mask:
+        return np.array(matches, dtype=np.bool_)[self._description_codes]
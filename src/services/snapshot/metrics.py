@@ -1,16 +1,16 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 
+from anyio import to_thread
+
 from services.domain.metrics import (
     AllegroMetrics,
     BlikStatisticsMetrics,
     TXStatisticsMetrics,
 )
-from services.domain.transaction import TxTag
-from services.firefly_base_service import filter_by_description, filter_out_categorized
+from services.snapshot.columns import SnapshotColumns
 from services.snapshot.models import TransactionSnapshot
 from services.snapshot.service import TransactionSnapshotService
-from services.tx_stats.helpers import group_tx_by_month
 
 
 class SnapshotMetricsService[T](ABC):
@@ -28,6 +28,12 @@ class SnapshotMetricsService[T](ABC):
     async def get_cached_snapshot_timestamp(self) -> datetime | None:
         return await self.snapshot_service.get_cached_snapshot_timestamp()
 
+    @staticmethod
+    async def _columns(snapshot: TransactionSnapshot) -> SnapshotColumns:
+        # Building the projection walks every transaction once per revision;
+        # keep that off the event loop. Mask arithmetic afterwards is cheap.
+        return await to_thread.run_sync(lambda: snapshot.columns)
+
     @abstractmethod
     async def _build_metrics(self, snapshot: TransactionSnapshot) -> T:
         raise NotImplementedError
@@ -43,25 +49,17 @@ class SnapshotAllegroMetricsService(SnapshotMetricsService[AllegroMetrics]):
         self.filter_desc_allegro = filter_desc_allegro
 
     async def _build_metrics(self, snapshot: TransactionSnapshot) -> AllegroMetrics:
-        filtered_by_desc_partial = filter_by_description(
-            snapshot.transactions,
-            self.filter_desc_allegro,
-            exact_match=False,
-        )
-        not_processed = [
-            tx
-            for tx in filtered_by_desc_partial
-            if not tx.tags or TxTag.allegro_done not in tx.tags
-        ]
-        not_processed_by_month = await group_tx_by_month(not_processed)
+        columns = await self._columns(snapshot)
+        allegro = columns.description_contains(self.filter_desc_allegro)
+        not_processed = allegro & ~columns.allegro_done
 
         return AllegroMetrics(
             total_transactions=snapshot.metrics.total_transactions,
             fetching_duration_ms=snapshot.metrics.fetching_duration_ms,
-            allegro_transactions=len(filtered_by_desc_partial),
-            not_processed_allegro_transactions=len(not_processed),
-            not_processed_by_month=not_processed_by_month,
-            time_stamp=snapshot.fetched_at,
+            allegro_transactions=int(allegro.sum()),
+            not_processed_allegro_transactions=int(not_processed.sum()),
+            not_processed_by_month=columns.count_by_month(not_processed),
+            time_stamp=snapshot.last_modified_at,
         )
 
 
@@ -77,41 +75,24 @@ class SnapshotBlikMetricsService(SnapshotMetricsService[BlikStatisticsMetrics]):
     async def _build_metrics(
         self, snapshot: TransactionSnapshot
     ) -> BlikStatisticsMetrics:
-        uncategorized = filter_out_categorized(snapshot.transactions)
-        filtered_by_desc_exact = filter_by_description(
-            uncategorized,
-            self.filter_desc_blik,
-            exact_match=True,
+        columns = await self._columns(snapshot)
+        pending = ~columns.categorized & ~columns.blik_done
+        not_processed = columns.description_is(self.filter_desc_blik) & pending
+        incomplete_processed = (
+            columns.description_contains(self.filter_desc_blik) & pending
         )
-        filtered_by_desc_partial = filter_by_description(
-            uncategorized,
-            self.filter_desc_blik,
-            exact_match=False,
-        )
-
-        not_processed = [
-            tx
-            for tx in filtered_by_desc_exact
-            if not tx.tags or TxTag.blik_done not in tx.tags
-        ]
-        incomplete_processed = [
-            tx
-            for tx in filtered_by_desc_partial
-            if not tx.tags or TxTag.blik_done not in tx.tags
-        ]
-        not_processed_by_month = await group_tx_by_month(not_processed)
-        incomplete_processed_by_month = await group_tx_by_month(incomplete_processed)
+        not_processed_count = int(not_processed.sum())
 
         return BlikStatisticsMetrics(
             total_transactions=snapshot.metrics.total_transactions,
             single_part_transactions=len(snapshot.transactions),
-            uncategorized_transactions=len(uncategorized),
-            filtered_by_description_exact=len(not_processed),
-            filtered_by_description_partial=len(incomplete_processed),
-            not_processed_transactions=len(not_processed),
-            not_processed_by_month=not_processed_by_month,
-            inclomplete_procesed_by_month=incomplete_processed_by_month,
-            time_stamp=snapshot.fetched_at,
+            uncategorized_transactions=int((~columns.categorized).sum()),
+            filtered_by_description_exact=not_processed_count,
+            filtered_by_description_partial=int(incomplete_processed.sum()),
+            not_processed_transactions=not_processed_count,
+            not_processed_by_month=columns.count_by_month(not_processed),
+            inclomplete_procesed_by_month=columns.count_by_month(incomplete_processed),
+            time_stamp=snapshot.last_modified_at,
             fetching_duration_ms=snapshot.metrics.fetching_duration_ms,
         )
 
@@ -130,35 +111,28 @@ class SnapshotTxMetricsService(SnapshotMetricsService[TXStatisticsMetrics]):
     async def _build_metrics(
         self, snapshot: TransactionSnapshot
     ) -> TXStatisticsMetrics:
-        txs_uncategorized = filter_out_categorized(snapshot.transactions)
-        txs_blik_ok = filter_by_description(
-            txs_uncategorized,
-            self.filter_desc_blik,
-            exact_match=True,
-            exclude=True,
+        columns = await self._columns(snapshot)
+        uncategorized = ~columns.categorized
+        blik_not_ok = columns.description_is(self.filter_desc_blik) & uncategorized
+        action_req = columns.action_req & uncategorized & ~blik_not_ok
+        allegro_not_ok = (
+            columns.description_contains(self.filter_desc_allegro)
+            & uncategorized
+            & ~columns.allegro_done
+            & ~blik_not_ok
+            & ~action_req
         )
-        txs_action_not_req = [
-            tx for tx in txs_blik_ok if TxTag.action_req not in tx.tags
-        ]
-        txs_allegro_ok = [
-            tx
-            for tx in txs_action_not_req
-            if not (
-                self.filter_desc_allegro in tx.description.lower()
-                and TxTag.allegro_done not in tx.tags
-            )
-        ]
-        categorizable_by_month = await group_tx_by_month(txs_allegro_ok)
+        categorizable = uncategorized & ~(blik_not_ok | action_req | allegro_not_ok)
 
         return TXStatisticsMetrics(
             total_transactions=snapshot.metrics.total_transactions,
             single_part_transactions=len(snapshot.transactions),
-            uncategorized_transactions=len(txs_uncategorized),
-            blik_not_ok=len(txs_uncategorized) - len(txs_blik_ok),
-            action_req=len(txs_blik_ok) - len(txs_action_not_req),
-            allegro_not_ok=len(txs_action_not_req) - len(txs_allegro_ok),
-            categorizable=len(txs_allegro_ok),
-            categorizable_by_month=categorizable_by_month,
-            time_stamp=snapshot.fetched_at,
+            uncategorized_transactions=int(uncategorized.sum()),
+            blik_not_ok=int(blik_not_ok.sum()),
+            action_req=int(action_req.sum()),
+            allegro_not_ok=int(allegro_not_ok.sum()),
+            categorizable=int(categorizable.sum()),
+            categorizable_by_month=columns.count_by_month(categorizable),
+            time_stamp=snapshot.last_modified_at,
             fetching_duration_ms=snapshot.metrics.fetching_duration_ms,
         )
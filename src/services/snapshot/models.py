@@ -1,8 +1,10 @@
-from dataclasses import dataclass
-from datetime import datetime
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
 
 from services.domain.metrics import FetchMetrics
 from services.domain.transaction import Transaction
+from services.snapshot.columns import SnapshotColumns
+from services.snapshot.query import TransactionSnapshotQuery
 
 
 @dataclass(slots=True)
@@ -11,7 +13,67 @@ class TransactionSnapshot:
     metrics: FetchMetrics
     fetched_at: datetime
     schema_version: int = 1
+    reconciled_at: datetime | None = None
+    revision: int = 0
+    patched_at: datetime | None = None
+    _query: TransactionSnapshotQuery | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _positions: dict[int, int] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _columns: SnapshotColumns | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
 
     @property
     def transaction_count(self) -> int:
         return len(self.transactions)
+
+    @property
+    def last_modified_at(self) -> datetime:
+        return self.patched_at or self.fetched_at
+
+    @property
+    def query(self) -> TransactionSnapshotQuery:
+        # Like ``columns``, may be built in a worker thread.
+        query = self._query
+        if query is None:
+            revision = self.revision
+            query = TransactionSnapshotQuery(self.transactions)
+            if self.revision == revision:
+                self._query = query
+        return query
+
+    @property
+    def columns(self) -> SnapshotColumns:
+        # May be built in a worker thread; a projection that raced with a
+        # patch is returned to its caller but not cached.
+        columns = self._columns
+        if columns is None:
+            revision = self.revision
+            columns = SnapshotColumns(self.transactions)
+            if self.revision == revision:
+                self._columns = columns
+        return columns
+
+    def replace_transaction(self, tx: Transaction) -> bool:
+        """Swap in an updated copy of a transaction and bump the revision.
+
+        Indexes are rebuilt lazily on the next ``query`` access; positions stay
+        valid because a replacement never reorders the list.
+        """
+        if self._positions is None:
+            self._positions = {
+                current.id: position
+                for position, current in enumerate(self.transactions)
+            }
+        position = self._positions.get(tx.id)
+        if position is None:
+            return False
+        self.transactions[position] = tx
+        self.revision += 1
+        self.patched_at = datetime.now(UTC)
+        self._query = None
+        self._columns = None
+        return True
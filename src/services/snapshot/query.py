@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from datetime import date
+
+from services.domain.transaction import Transaction
+
+
+class TransactionSnapshotQuery:
+    """Read-only lookup indexes built once over a snapshot's transactions.
+
+    Description lookups are case-insensitive, matching ``filter_by_description``.
+    """
+
+    def __init__(self, transactions: Sequence[Transaction]) -> None:
+        by_id: dict[int, Transaction] = {}
+        by_tag: dict[str, list[Transaction]] = {}
+        by_description: dict[str, list[Transaction]] = {}
+        categorized: list[Transaction] = []
+        uncategorized: list[Transaction] = []
+
+        for tx in transactions:
+            by_id[tx.id] = tx
+            for tag in tx.tags:
+                by_tag.setdefault(tag, []).append(tx)
+            by_description.setdefault(tx.description.lower(), []).append(tx)
+            if tx.category is None:
+                uncategorized.append(tx)
+            else:
+                categorized.append(tx)
+
+        by_date = sorted(transactions, key=lambda tx: tx.date)
+
+        self._by_id = by_id
+        self._by_tag = {tag: tuple(txs) for tag, txs in by_tag.items()}
+        self._by_description = {
+            description: tuple(txs) for description, txs in by_description.items()
+        }
+        self._by_date = tuple(by_date)
+        self._dates = [tx.date for tx in by_date]
+        self._categorized = tuple(categorized)
+        self._uncategorized = tuple(uncategorized)
+        self._contains_cache: dict[str, tuple[Transaction, ...]] = {}
+
+    @property
+    def categorized(self) -> tuple[Transaction, ...]:
+        return self._categorized
+
+    @property
+    def uncategorized(self) -> tuple[Transaction, ...]:
+        return self._uncategorized
+
+    def get(self, tx_id: int) -> Transaction | None:
+        return self._by_id.get(tx_id)
+
+    def between(
+        self, start_date: date | None = None, end_date: date | None = None
+    ) -> tuple[Transaction, ...]:
+        """Transactions booked within the inclusive range, oldest first."""
+        start = 0 if start_date is None else bisect_left(self._dates, start_date)
+        end = (
+            len(self._dates)
+            if end_date is None
+            else bisect_right(self._dates, end_date)
+        )
+        return self._by_date[start:end]
+
+    def with_tag(self, tag: str) -> tuple[Transaction, ...]:
+        return self._by_tag.get(tag, ())
+
+    def with_description(self, description: str) -> tuple[Transaction, ...]:
+        return self._by_description.get(description.lower(), ())
+
+    def description_contains(self, fragment: str) -> tuple[Transaction, ...]:
+        # Substring matches scan the distinct descriptions once per fragment;
+        # callers use a handful of configured filters, so results are memoized.
+        needle = fragment.lower()
+        cached = self._contains_cache.get(needle)
+        if cached is None:
+            cached = tuple(
+                tx
+                for description, txs in self._by_description.items()
+                if needle in description
+                for tx in txs
+            )
+            self._contains_cache[needle] = cached
+        return cached
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import random
+from collections.abc import Callable
+from contextlib import suppress
+
+from services.snapshot.service import TransactionSnapshotService
+
+logger = logging.getLogger(__name__)
+
+
+class SnapshotRefreshScheduler:
+    """Refreshes the transaction snapshot in the background on a fixed interval.
+
+    Each tick waits ``interval_seconds`` plus a random jitter. A tick is skipped
+    while another refresh is already running. After failures the interval
+    doubles per consecutive error, up to ``max_backoff_seconds``.
+    """
+
+    def __init__(
+        self,
+        snapshot_service: TransactionSnapshotService,
+        interval_seconds: int,
+        *,
+        jitter_seconds: int = 0,
+        max_backoff_seconds: int = 1800,
+        random_fn: Callable[[], float] = random.random,
+    ) -> None:
+        self.snapshot_service = snapshot_service
+        self.interval_seconds = interval_seconds
+        self.jitter_seconds = jitter_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self._random = random_fn
+        self._failures = 0
+        self._task: asyncio.Task[None] | None = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._task = asyncio.create_task(
+            self._run(), name="transaction-snapshot-scheduler"
+        )
+        logger.info(
+            "Transaction snapshot scheduler started",
+            extra={
+                "interval_seconds": self.interval_seconds,
+                "jitter_seconds": self.jitter_seconds,
+            },
+        )
+
+    async def stop(self) -> None:
+        task = self._task
+        if task is None:
+            return
+        self._task = None
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        logger.info("Transaction snapshot scheduler stopped")
+
+    async def run_once(self) -> bool:
+        """Run a single tick; returns False when it was skipped."""
+        if self.snapshot_service.refresh_in_progress:
+            logger.debug("Transaction snapshot refresh in flight, skipping tick")
+            return False
+        try:
+            await self.snapshot_service.refresh_snapshot(full=False)
+        except Exception:
+            self._failures += 1
+            logger.exception(
+                "Scheduled transaction snapshot refresh failed",
+                extra={"consecutive_failures": self._failures},
+            )
+        else:
+            self._failures = 0
+        return True
+
+    def next_delay(self) -> float:
+        delay = min(
+            self.interval_seconds * 2**self._failures,
+            max(self.max_backoff_seconds, self.interval_seconds),
+        )
+        return delay + self._random() * self.jitter_seconds
+
+    async def _run(self) -> None:
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.next_delay())
@@ -1,7 +1,11 @@
 import asyncio
 import logging
-from datetime import UTC, datetime
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from datetime import UTC, date, datetime, timedelta
 
+from services.domain.metrics import FetchMetrics
+from services.domain.transaction import Transaction
 from services.firefly_base_service import FireflyBaseService
 from services.snapshot.models import TransactionSnapshot
 from services.snapshot.store import SnapshotStore
@@ -9,6 +13,34 @@ from services.snapshot.store import SnapshotStore
 logger = logging.getLogger(__name__)
 SNAPSHOT_FETCH_TIMEOUT_SECONDS = 180
 
+type SnapshotListener = Callable[[TransactionSnapshot], None]
+
+
+def splice_transactions(
+    transactions: list[Transaction],
+    fresh: list[Transaction],
+    *,
+    start_date: date,
+    end_date: date | None = None,
+) -> list[Transaction]:
+    """Replace the ``start_date``..``end_date`` window with freshly fetched data.
+
+    Transactions outside the window are kept unless ``fresh`` carries the same id,
+    so a transaction re-dated into the window is not duplicated. Anything left
+    inside the window and missing from ``fresh`` was deleted in Firefly.
+    """
+    fresh_ids = {tx.id for tx in fresh}
+    newer: list[Transaction] = []
+    older: list[Transaction] = []
+    for tx in transactions:
+        if tx.id in fresh_ids:
+            continue
+        if end_date is not None and tx.date > end_date:
+            newer.append(tx)
+        elif tx.date < start_date:
+            older.append(tx)
+    return [*newer, *fresh, *older]
+
 
 class TransactionSnapshotService:
     def __init__(
@@ -16,34 +48,158 @@ class TransactionSnapshotService:
         store: SnapshotStore,
         firefly_service: FireflyBaseService,
         max_age_seconds: int = 300,
+        *,
+        stale_while_revalidate_seconds: int = 0,
+        delta_refresh_enabled: bool = False,
+        delta_overlap_days: int = 7,
+        full_reconcile_seconds: int = 3600,
     ) -> None:
         self.store = store
         self.firefly_service = firefly_service
         self.max_age_seconds = max_age_seconds
+        self.stale_while_revalidate_seconds = stale_while_revalidate_seconds
+        self.delta_refresh_enabled = delta_refresh_enabled
+        self.delta_overlap_days = delta_overlap_days
+        self.full_reconcile_seconds = full_reconcile_seconds
         self._refresh_lock = asyncio.Lock()
         self._refresh_task: asyncio.Task[TransactionSnapshot] | None = None
+        self._patch_logs: list[dict[int, Transaction]] = []
+        self._listeners: list[SnapshotListener] = []
+
+    @property
+    def max_staleness_seconds(self) -> int:
+        return self.max_age_seconds + self.stale_while_revalidate_seconds
+
+    @property
+    def refresh_in_progress(self) -> bool:
+        return self._refresh_task is not None and not self._refresh_task.done()
+
+    def add_listener(self, listener: SnapshotListener) -> None:
+        """Call ``listener`` with every snapshot stored by a refresh.
+
+        Write-through patches change the stored snapshot in place and are not
+        reported. Listeners run on the event loop and must not block.
+        """
+        self._listeners.append(listener)
 
     async def get_snapshot(self) -> TransactionSnapshot:
         snapshot = await self.store.get_snapshot()
         if snapshot is not None and not await self.store.is_stale(self.max_age_seconds):
             return snapshot
-        return await self._ensure_snapshot(force_refresh=False)
+        if (
+            snapshot is not None
+            and self.stale_while_revalidate_seconds > 0
+            and not await self.store.is_stale(self.max_staleness_seconds)
+        ):
+            async with self._refresh_lock:
+                self._start_refresh_task(full=False)
+            return snapshot
+        return await self._ensure_snapshot(force_refresh=False, full=False)
+
+    async def refresh_snapshot(self, *, full: bool = True) -> TransactionSnapshot:
+        """Refresh regardless of age; ``full=False`` allows a delta refresh."""
+        return await self._ensure_snapshot(force_refresh=True, full=full)
 
-    async def refresh_snapshot(self) -> TransactionSnapshot:
-        return await self._ensure_snapshot(force_refresh=True)
+    async def refresh_range(
+        self, start_date: date | None = None, end_date: date | None = None
+    ) -> TransactionSnapshot:
+        """Re-fetch only transactions booked within the inclusive date range.
+
+        The rest of the cached snapshot is kept as is, including its
+        ``fetched_at``, so the TTL still follows the last full or delta refresh.
+        Falls back to a full refresh when there is nothing cached yet.
+        """
+        if await self.store.get_snapshot() is None:
+            return await self.refresh_snapshot()
+
+        with self._track_patches() as patches:
+            fresh = await asyncio.wait_for(
+                self.firefly_service.fetch_transactions(
+                    start_date=start_date, end_date=end_date
+                ),
+                timeout=SNAPSHOT_FETCH_TIMEOUT_SECONDS,
+            )
+            # Splice into whatever is cached now: a full refresh may have been
+            # stored while the range was being fetched.
+            current = await self.store.get_snapshot()
+            if current is None:
+                return await self.refresh_snapshot()
+            transactions = splice_transactions(
+                current.transactions,
+                fresh,
+                start_date=start_date or date.min,
+                end_date=end_date,
+            )
+            snapshot = TransactionSnapshot(
+                transactions=transactions,
+                metrics=FetchMetrics(
+                    total_transactions=len(transactions),
+                    fetching_duration_ms=current.metrics.fetching_duration_ms,
+                    invalid=current.metrics.invalid,
+                    multipart=current.metrics.multipart,
+                ),
+                fetched_at=current.fetched_at,
+                schema_version=current.schema_version,
+                reconciled_at=current.reconciled_at,
+                revision=current.revision + 1,
+                patched_at=datetime.now(UTC),
+            )
+            for tx in patches.values():
+                snapshot.replace_transaction(tx)
+            await self.store.set_snapshot(snapshot)
+        self._notify_listeners(snapshot)
+
+        logger.info(
+            "Transaction snapshot range refreshed",
+            extra={
+                "start_date": None if start_date is None else start_date.isoformat(),
+                "end_date": None if end_date is None else end_date.isoformat(),
+                "fetched_count": len(fresh),
+                "transaction_count": len(transactions),
+            },
+        )
+        return snapshot
 
     async def get_cached_snapshot(self) -> TransactionSnapshot | None:
         return await self.store.get_snapshot()
 
+    async def get_fresh_snapshot(self) -> TransactionSnapshot | None:
+        """Cached snapshot within its TTL, without ever fetching from Firefly."""
+        snapshot = await self.store.get_snapshot()
+        if snapshot is None or await self.store.is_stale(self.max_age_seconds):
+            return None
+        return snapshot
+
     async def get_cached_snapshot_timestamp(self) -> datetime | None:
         snapshot = await self.store.get_snapshot()
         if snapshot is None:
             return None
-        if await self.store.is_stale(self.max_age_seconds):
+        if await self.store.is_stale(self.max_staleness_seconds):
             return None
-        return snapshot.fetched_at
+        return snapshot.last_modified_at
+
+    async def on_transaction_updated(self, tx: Transaction) -> None:
+        """Write-through patch after a successful update in Firefly.
 
-    async def _ensure_snapshot(self, *, force_refresh: bool) -> TransactionSnapshot:
+        The patched snapshot is stored again, so persistent stores do not serve
+        pre-update data after a restart; they may coalesce the writes of
+        consecutive patches. The patch is also remembered until
+        running refreshes (if any) have been stored, so a fetch that started
+        before the update cannot undo it.
+        """
+        for patches in self._patch_logs:
+            patches[tx.id] = tx
+        snapshot = await self.store.get_snapshot()
+        if snapshot is not None and snapshot.replace_transaction(tx):
+            await self.store.save_patched(snapshot)
+            logger.debug(
+                "Transaction snapshot patched",
+                extra={"transaction_id": tx.id, "revision": snapshot.revision},
+            )
+
+    async def _ensure_snapshot(
+        self, *, force_refresh: bool, full: bool
+    ) -> TransactionSnapshot:
         async with self._refresh_lock:
             if not force_refresh:
                 snapshot = await self.store.get_snapshot()
@@ -52,14 +208,7 @@ class TransactionSnapshotService:
                 ):
                     return snapshot
 
-            task = self._refresh_task
-            if task is None or task.done():
-                task = asyncio.create_task(
-                    self._fetch_and_store_snapshot(),
-                    name="transaction-snapshot-refresh",
-                )
-                task.add_done_callback(self._log_refresh_task_failure)
-                self._refresh_task = task
+            task = self._start_refresh_task(full=full)
 
         try:
             return await task
@@ -67,18 +216,110 @@ class TransactionSnapshotService:
             if task.done() and self._refresh_task is task:
                 self._refresh_task = None
 
-    async def _fetch_and_store_snapshot(self) -> TransactionSnapshot:
+    def _start_refresh_task(self, *, full: bool) -> asyncio.Task[TransactionSnapshot]:
+        # Callers must hold _refresh_lock; an in-flight refresh is always reused.
+        task = self._refresh_task
+        if task is None or task.done():
+            task = asyncio.create_task(
+                self._fetch_and_store_snapshot(full=full),
+                name="transaction-snapshot-refresh",
+            )
+            task.add_done_callback(self._log_refresh_task_failure)
+            self._refresh_task = task
+        return task
+
+    async def _fetch_and_store_snapshot(
+        self, *, full: bool = True
+    ) -> TransactionSnapshot:
+        with self._track_patches() as patches:
+            previous = await self.store.get_snapshot()
+            if not full and previous is not None and self._can_refresh_delta(previous):
+                snapshot = await self._fetch_delta_snapshot(previous)
+            else:
+                snapshot = await self._fetch_full_snapshot()
+
+            current = await self.store.get_snapshot()
+            if current is not None:
+                snapshot.revision = current.revision + 1
+            # Updates written while the fetch was running may be missing from it.
+            for tx in patches.values():
+                snapshot.replace_transaction(tx)
+            await self.store.set_snapshot(snapshot)
+        self._notify_listeners(snapshot)
+        return snapshot
+
+    def _notify_listeners(self, snapshot: TransactionSnapshot) -> None:
+        for listener in self._listeners:
+            try:
+                listener(snapshot)
+            except Exception:
+                logger.exception("Transaction snapshot listener failed")
+
+    @contextmanager
+    def _track_patches(self) -> Iterator[dict[int, Transaction]]:
+        patches: dict[int, Transaction] = {}
+        self._patch_logs.append(patches)
+        try:
+            yield patches
+        finally:
+            self._patch_logs.remove(patches)
+
+    async def _fetch_full_snapshot(self) -> TransactionSnapshot:
         transactions, metrics = await asyncio.wait_for(
             self.firefly_service.fetch_transactions_with_metrics(),
             timeout=SNAPSHOT_FETCH_TIMEOUT_SECONDS,
         )
-        snapshot = TransactionSnapshot(
+        fetched_at = datetime.now(UTC)
+        return TransactionSnapshot(
             transactions=transactions,
             metrics=metrics,
+            fetched_at=fetched_at,
+            reconciled_at=fetched_at,
+        )
+
+    async def _fetch_delta_snapshot(
+        self, previous: TransactionSnapshot
+    ) -> TransactionSnapshot:
+        # Firefly filters the transaction list by booking date only, so the delta
+        # covers everything booked since the last fetch minus the overlap window.
+        # Edits to older transactions are picked up by the periodic full reconcile.
+        start_date = (
+            previous.fetched_at - timedelta(days=self.delta_overlap_days)
+        ).date()
+        fresh, metrics = await asyncio.wait_for(
+            self.firefly_service.fetch_transactions_with_metrics(start_date=start_date),
+            timeout=SNAPSHOT_FETCH_TIMEOUT_SECONDS,
+        )
+        transactions = splice_transactions(
+            previous.transactions, fresh, start_date=start_date
+        )
+        logger.info(
+            "Transaction snapshot delta refresh applied",
+            extra={
+                "start_date": start_date.isoformat(),
+                "fetched_count": len(fresh),
+                "transaction_count": len(transactions),
+            },
+        )
+        return TransactionSnapshot(
+            transactions=transactions,
+            metrics=FetchMetrics(
+                total_transactions=len(transactions),
+                fetching_duration_ms=metrics.fetching_duration_ms,
+                invalid=previous.metrics.invalid,
+                multipart=previous.metrics.multipart,
+            ),
             fetched_at=datetime.now(UTC),
+            schema_version=previous.schema_version,
+            reconciled_at=previous.reconciled_at,
+        )
+
+    def _can_refresh_delta(self, snapshot: TransactionSnapshot) -> bool:
+        if not self.delta_refresh_enabled or snapshot.reconciled_at is None:
+            return False
+        return datetime.now(UTC) - snapshot.reconciled_at < timedelta(
+            seconds=self.full_reconcile_seconds
         )
-        await self.store.set_snapshot(snapshot)
-        return snapshot
 
     def _log_refresh_task_failure(
         self, task: asyncio.Task[TransactionSnapshot]
@@ -1,10 +1,26 @@
 from __future__ import annotations
 
+import asyncio
+import logging
+import os
+import tempfile
+import threading
 from abc import ABC, abstractmethod
+from contextlib import suppress
 from datetime import UTC, datetime, timedelta
+from pathlib import Path
 
+from anyio import to_thread
+
+from services.snapshot.codec import (
+    SnapshotFormatError,
+    decode_snapshot,
+    encode_snapshot,
+)
 from services.snapshot.models import TransactionSnapshot
 
+logger = logging.getLogger(__name__)
+
 
 class SnapshotStore(ABC):
     @abstractmethod
@@ -23,6 +39,14 @@ class SnapshotStore(ABC):
     async def is_stale(self, max_age_seconds: int) -> bool:
         raise NotImplementedError
 
+    async def save_patched(self, snapshot: TransactionSnapshot) -> None:
+        """Store a snapshot that was patched in place (a write-through update)."""
+        await self.set_snapshot(snapshot)
+
+    async def flush(self) -> None:
+        """Persist writes that ``save_patched`` may have deferred."""
+        return None
+
 
 class InMemorySnapshotStore(SnapshotStore):
     def __init__(self) -> None:
@@ -48,3 +72,136 @@ class InMemorySnapshotStore(SnapshotStore):
         return datetime.now(UTC) - snapshot.fetched_at > timedelta(
             seconds=max_age_seconds
         )
+
+
+class FileSnapshotStore(InMemorySnapshotStore):
+    """Snapshot store persisted to a single file for warm restarts.
+
+    The file is read lazily on first access and rewritten atomically on every
+    ``set_snapshot``. Files written with another schema version are discarded.
+
+    Write-through patches are persisted at most once per
+    ``patch_write_delay_seconds``: ``save_patched`` schedules one rewrite of
+    the whole snapshot that covers every patch made before it starts, so
+    applying categories in bulk does not re-encode the file per transaction.
+    Writes go through a unique temporary file and never overlap.
+    """
+
+    def __init__(
+        self, path: str | Path, *, patch_write_delay_seconds: float = 2.0
+    ) -> None:
+        super().__init__()
+        self.path = Path(path)
+        self.patch_write_delay_seconds = patch_write_delay_seconds
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        # Writes run on worker threads; a thread lock keeps them in order.
+        self._write_lock = threading.Lock()
+        self._patch_write: asyncio.Task[None] | None = None
+
+    async def get_snapshot(self) -> TransactionSnapshot | None:
+        await self._ensure_loaded()
+        return self._snapshot
+
+    async def set_snapshot(self, snapshot: TransactionSnapshot) -> None:
+        self._snapshot = snapshot
+        self._loaded = True
+        await to_thread.run_sync(self._write, snapshot)
+
+    async def save_patched(self, snapshot: TransactionSnapshot) -> None:
+        self._snapshot = snapshot
+        self._loaded = True
+        if self._patch_write is None or self._patch_write.done():
+            self._patch_write = asyncio.create_task(
+                self._write_patched(), name="transaction-snapshot-patch-write"
+            )
+
+    async def flush(self) -> None:
+        task = self._patch_write
+        if task is None or task.done():
+            return
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        await to_thread.run_sync(self._write_current)
+
+    async def invalidate(self) -> None:
+        self._snapshot = None
+        self._loaded = True
+        await to_thread.run_sync(self._remove)
+
+    async def is_stale(self, max_age_seconds: int) -> bool:
+        await self._ensure_loaded()
+        return await super().is_stale(max_age_seconds)
+
+    async def _write_patched(self) -> None:
+        await asyncio.sleep(self.patch_write_delay_seconds)
+        # Patches from here on schedule a write of their own.
+        self._patch_write = None
+        try:
+            await to_thread.run_sync(self._write_current)
+        except OSError:
+            logger.exception("Failed to persist transaction snapshot to %s", self.path)
+
+    def _write_current(self) -> None:
+        with self._write_lock:
+            snapshot = self._snapshot
+            if snapshot is not None:
+                self._write_locked(snapshot)
+
+    async def _ensure_loaded(self) -> None:
+        if self._loaded:
+            return
+        async with self._load_lock:
+            if self._loaded:
+                return
+            self._snapshot = await to_thread.run_sync(self._read)
+            self._loaded = True
+
+    def _read(self) -> TransactionSnapshot | None:
+        try:
+            data = self.path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError:
+            logger.exception("Failed to read transaction snapshot from %s", self.path)
+            return None
+
+        try:
+            snapshot = decode_snapshot(data)
+        except SnapshotFormatError as exc:
+            logger.warning(
+                "Discarding persisted transaction snapshot %s: %s", self.path, exc
+            )
+            self._remove()
+            return None
+
+        logger.info(
+            "Loaded persisted transaction snapshot",
+            extra={
+                "path": str(self.path),
+                "transaction_count": snapshot.transaction_count,
+            },
+        )
+        return snapshot
+
+    def _write(self, snapshot: TransactionSnapshot) -> None:
+        with self._write_lock:
+            self._write_locked(snapshot)
+
+    def _write_locked(self, snapshot: TransactionSnapshot) -> None:
+        data = encode_snapshot(snapshot)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            dir=self.path.parent, prefix=f"{self.path.name}.", delete=False
+        ) as tmp:
+            tmp.write(data)
+        try:
+            os.replace(tmp.name, self.path)
+        except OSError:
+            Path(tmp.name).unlink(missing_ok=True)
+            raise
+
+    def _remove(self) -> None:
+        with self._write_lock:
+            self.path.unlink(missing_ok=True)
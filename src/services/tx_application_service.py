@@ -1,19 +1,31 @@
+import asyncio
 import calendar
-from datetime import date
+import logging
+from datetime import UTC, date, datetime
+from uuid import UUID
 
 from api.mappers.tx import map_category_to_api, map_tx_to_api
 from api.models.tx import (
     ScreeningMonthResponse,
     TxTag,
 )
+from services.category_catalog import CategoryCatalog
+from services.domain.job_base import JobStatus
 from services.domain.metrics import TXStatisticsMetrics
+from services.domain.transaction import Transaction
+from services.domain.tx_bulk import TxBulkJob, TxOperation, TxOperationOutcome
 from services.exceptions import ExternalServiceFailed
 from services.firefly_base_service import FireflyServiceError
 from services.firefly_tx_service import FireflyTxService
+from services.snapshot.models import TransactionSnapshot
+from services.snapshot.service import TransactionSnapshotService
+from services.tx_state_store import TxStateStore
 from services.tx_stats.manager import TxMetricsManager
 from services.tx_stats.models import MetricsState
 from services.tx_stats.runner import MetricsProvider
 
+logger = logging.getLogger(__name__)
+
 
 class TxApplicationService:
     """
@@ -29,35 +41,62 @@ class TxApplicationService:
         *,
         tx_service: FireflyTxService,
         metrics_provider: MetricsProvider[TXStatisticsMetrics],
+        snapshot_service: TransactionSnapshotService | None = None,
+        category_catalog: CategoryCatalog | None = None,
+        state_store: TxStateStore | None = None,
+        update_concurrency: int = 1,
     ) -> None:
         self.tx_service = tx_service
         self.tx_metrics_manager = TxMetricsManager(provider=metrics_provider)
+        self.snapshot_service = snapshot_service
+        self.category_catalog = category_catalog or CategoryCatalog(tx_service)
+        self.state_store = state_store or TxStateStore()
+        self.update_concurrency = max(1, update_concurrency)
 
     # --------------------------------------------------
     # SCREENING
     # --------------------------------------------------
 
     async def get_screening_month(
-        self, *, year: int, month: int
+        self,
+        *,
+        year: int,
+        month: int,
+        live: bool = False,
+        categories_version: str | None = None,
     ) -> ScreeningMonthResponse | None:
+        """Screening candidates for a month, served from the snapshot.
+
+        ``live`` bypasses both the transaction snapshot and the category cache
+        and reads straight from Firefly. When ``categories_version`` matches
+        the catalog, the category list is left out of the response.
+        """
         start_date, end_date = self._month_range(year=year, month=month)
         try:
-            categories = await self.tx_service.get_categories()
-            txs = await self.tx_service.get_txs_for_screening(
-                start_date=start_date, end_date=end_date
-            )
+            categories = await self.category_catalog.get_categories(force_refresh=live)
+            if live or self.snapshot_service is None:
+                txs = await self.tx_service.get_txs_for_screening(
+                    start_date=start_date, end_date=end_date
+                )
+            else:
+                txs = await self._snapshot_txs_for_screening(start_date, end_date)
         except FireflyServiceError as e:
             raise ExternalServiceFailed(str(e)) from e
 
         if not txs:
             return None
 
+        version = self.category_catalog.version
+        unchanged = categories_version is not None and categories_version == version
         return ScreeningMonthResponse(
             year=year,
             month=month,
             remaining=len(txs),
             transactions=[map_tx_to_api(tx) for tx in txs],
-            categories=[map_category_to_api(cat) for cat in categories],
+            categories=None
+            if unchanged
+            else [map_category_to_api(cat) for cat in categories],
+            categories_version=version,
         )
 
     # --------------------------------------------------
@@ -78,6 +117,14 @@ class TxApplicationService:
         except FireflyServiceError as e:
             raise ExternalServiceFailed(str(e)) from e
 
+    async def start_bulk_job(self, *, operations: list[TxOperation]) -> TxBulkJob:
+        job = self.state_store.job_manager.create(total=len(operations))
+        asyncio.create_task(self._run_bulk_job(job=job, operations=operations))
+        return job
+
+    def get_bulk_job(self, *, job_id: UUID) -> TxBulkJob | None:
+        return self.state_store.job_manager.get(job_id)
+
     # --------------------------------------------------
     # METRICS
     # --------------------------------------------------
@@ -93,6 +140,71 @@ class TxApplicationService:
     # INTERNAL HELPERS
     # --------------------------------------------------
 
+    async def _snapshot_txs_for_screening(
+        self, start_date: date, end_date: date
+    ) -> list[Transaction]:
+        assert self.snapshot_service is not None
+        snapshot = await self.snapshot_service.get_snapshot()
+        # Newest first like Firefly; the sort is stable, so same-day
+        # transactions keep the snapshot's (Firefly's) order.
+        in_month = sorted(
+            snapshot.query.between(start_date, end_date),
+            key=lambda tx: tx.date,
+            reverse=True,
+        )
+        return self.tx_service.select_for_screening(in_month)
+
+    async def _run_bulk_job(
+        self, *, job: TxBulkJob, operations: list[TxOperation]
+    ) -> None:
+        job.status = JobStatus.RUNNING
+        semaphore = asyncio.Semaphore(self.update_concurrency)
+
+        async def run(operation: TxOperation) -> None:
+            async with semaphore:
+                outcome = await self._apply_operation(operation, snapshot)
+            if outcome.status == "success":
+                job.applied += 1
+            else:
+                job.failed += 1
+            job.results.append(outcome)
+
+        try:
+            snapshot = (
+                await self.snapshot_service.get_fresh_snapshot()
+                if self.snapshot_service is not None
+                else None
+            )
+            await asyncio.gather(*(run(operation) for operation in operations))
+            job.status = JobStatus.DONE
+        except Exception as e:
+            logger.exception("Transaction bulk job failed", extra={"job_id": job.id})
+            job.status = JobStatus.FAILED
+            job.results.append(
+                TxOperationOutcome(transaction_id=-1, status="failed", reason=str(e))
+            )
+        finally:
+            job.finished_at = datetime.now(UTC)
+
+    async def _apply_operation(
+        self, operation: TxOperation, snapshot: TransactionSnapshot | None
+    ) -> TxOperationOutcome:
+        tx_id = operation.transaction_id
+        # A fresh snapshot already holds the current tags and category (our own
+        # updates are written through), which saves the GET before each PUT.
+        tx = snapshot.query.get(tx_id) if snapshot is not None else None
+        try:
+            if tx is None:
+                tx = await self.tx_service.get_transaction(tx_id)
+            await self.tx_service.apply_changes(
+                tx, category_id=operation.category_id, tags=operation.tags
+            )
+        except Exception as e:
+            return TxOperationOutcome(
+                transaction_id=tx_id, status="failed", reason=str(e)
+            )
+        return TxOperationOutcome(transaction_id=tx_id, status="success")
+
     @staticmethod
     def _month_range(year: int, month: int) -> tuple[date, date]:
         first_day = date(year, month, 1)
@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from uuid import UUID, uuid4
+
+from services.domain.job_base import JobStatus
+from services.domain.tx_bulk import TxBulkJob
+
+
+class TxBulkJobManager:
+    def __init__(self) -> None:
+        self._jobs: dict[UUID, TxBulkJob] = {}
+
+    def create(self, *, total: int) -> TxBulkJob:
+        job = TxBulkJob(
+            id=uuid4(),
+            total=total,
+            status=JobStatus.PENDING,
+            started_at=datetime.now(UTC),
+        )
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: UUID) -> TxBulkJob | None:
+        return self._jobs.get(job_id)
+
+
+@dataclass
+class TxStateStore:
+    job_manager: TxBulkJobManager = field(default_factory=TxBulkJobManager)
+
+
+_state_store = TxStateStore()
+
+
+def get_tx_state_store() -> TxStateStore:
+    return _state_store
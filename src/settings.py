@@ -1,6 +1,6 @@
 import json
 import os
-from typing import Any, no_type_check
+from typing import Any, Literal, no_type_check
 
 from dotenv import load_dotenv
 from pydantic import field_validator
@@ -15,6 +15,8 @@ load_dotenv(ENV_PATH)
 class Settings(BaseSettings):
     FIREFLY_URL: str | None = None
     FIREFLY_TOKEN: str | None = None
+    FIREFLY_FETCH_CONCURRENCY: int = 1
+    FIREFLY_UPDATE_CONCURRENCY: int = 4
     allowed_origins: Any = ["*"]
     DEMO_MODE: bool = False
 
@@ -28,7 +30,24 @@ class Settings(BaseSettings):
     BLIK_DESCRIPTION_FILTER: str = "BLIK - płatność w internecie"
     TAG_BLIK_DONE: str = "blik_done"
     MATCH_WITH_UNMATCHED_FUTURE_DAYS: int = 7
+    CATEGORY_CACHE_TTL_SECONDS: int = 3600
+    CATEGORIZATION_ENGINE: Literal["weighted", "tfidf", "naive_bayes"] = "weighted"
+    CATEGORIZATION_PROCESS_WORKERS: int = 0
+    CATEGORIZATION_TOKEN_INDEX: bool = False
+    CATEGORIZATION_INDEX_BUCKET_FALLBACK: bool = True
+    CATEGORIZATION_INDEX_MAX_KEY_SHARE: float | None = None
+    CATEGORIZATION_PRECOMPUTE: bool = False
+    CATEGORIZATION_EXACT_HISTORY: bool = True
+    CATEGORIZATION_NAIVE_BAYES_BLEND: float = 0.0
     TRANSACTION_SNAPSHOT_TTL_SECONDS: int = 300
+    TRANSACTION_SNAPSHOT_STALE_WHILE_REVALIDATE_SECONDS: int = 0
+    TRANSACTION_SNAPSHOT_DELTA_REFRESH: bool = False
+    TRANSACTION_SNAPSHOT_DELTA_OVERLAP_DAYS: int = 7
+    TRANSACTION_SNAPSHOT_FULL_RECONCILE_SECONDS: int = 3600
+    TRANSACTION_SNAPSHOT_PATH: str | None = None
+    TRANSACTION_SNAPSHOT_REFRESH_INTERVAL_SECONDS: int = 0
+    TRANSACTION_SNAPSHOT_REFRESH_JITTER_SECONDS: int = 30
+    TRANSACTION_SNAPSHOT_REFRESH_MAX_BACKOFF_SECONDS: int = 1800
     REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     REFRESH_COOKIE_NAME: str = "refresh_token"
     REFRESH_TOKEN_SECURE: bool = False
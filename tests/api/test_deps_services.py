@@ -8,15 +8,23 @@ from services.allegro_service import AllegroService, allegro_client_factory
 from services.categorization import (
     AmountBucketizer,
     CategorizationTextPreprocessor,
+    CategorySuggestionPrecomputer,
     DefaultCategorySuggestionService,
+    ExactHistoryTable,
+    NaiveBayesCategoryClassifier,
+    PrecomputedCategorySuggestionService,
+    ProcessPoolSimilarityEngine,
     SnapshotCategorizationProvider,
+    TfidfTransactionSimilarityEngine,
     WeightedTransactionSimilarityEngine,
 )
+from services.category_catalog import CategoryCatalog
 from services.firefly_base_service import FireflyBaseService
 from services.firefly_enrichment_service import FireflyEnrichmentService
 from services.firefly_tx_service import FireflyTxService
 from services.secret_crypto_service import SecretCryptoService
 from services.snapshot import (
+    FileSnapshotStore,
     InMemorySnapshotStore,
     SnapshotAllegroMetricsService,
     SnapshotBlikMetricsService,
@@ -36,12 +44,15 @@ def clear_dependency_caches():
         deps_services.get_firefly_base_service,
         deps_services.get_firefly_enrichment_service,
         deps_services.get_firefly_tx_service,
+        deps_services.get_category_catalog,
         deps_services.get_snapshot_store,
         deps_services.get_transaction_snapshot_service,
         deps_services.get_snapshot_blik_metrics_service,
         deps_services.get_snapshot_allegro_metrics_service,
         deps_services.get_snapshot_tx_metrics_service,
         deps_services.get_category_suggestion_service,
+        deps_services.get_category_suggestion_precomputer,
+        deps_services._get_default_category_suggestion_service,
         deps_services.get_secret_crypto_service,
         deps_services.get_vault_session_store,
     ]:
@@ -102,25 +113,35 @@ def test_get_firefly_base_service_uses_firefly_client(monkeypatch):
 
 def test_get_firefly_enrichment_service_uses_firefly_client(monkeypatch):
     client = object()
+    snapshot_service = object()
 
     monkeypatch.setattr(deps_services, "get_firefly_client", lambda: client)
+    monkeypatch.setattr(
+        deps_services, "get_transaction_snapshot_service", lambda: snapshot_service
+    )
 
     service = deps_services.get_firefly_enrichment_service()
 
     assert isinstance(service, FireflyEnrichmentService)
     assert service.firefly_client is client
+    assert service._update_observers == [snapshot_service]
 
 
 def test_get_firefly_tx_service_uses_filters_from_settings(monkeypatch):
     client = object()
+    snapshot_service = object()
 
     monkeypatch.setattr(deps_services, "get_firefly_client", lambda: client)
+    monkeypatch.setattr(
+        deps_services, "get_transaction_snapshot_service", lambda: snapshot_service
+    )
     monkeypatch.setattr(
         deps_services,
         "settings",
         SimpleNamespace(
             BLIK_DESCRIPTION_FILTER="blik-x",
             ALLEGRO_DESCRIPTION_FILTER="allegro-x",
+            FIREFLY_FETCH_CONCURRENCY=4,
         ),
     )
 
@@ -130,6 +151,24 @@ def test_get_firefly_tx_service_uses_filters_from_settings(monkeypatch):
     assert service.firefly_client is client
     assert service.filter_desc_blik == "blik-x"
     assert service.filter_desc_allegro == "allegro-x"
+    assert service.fetch_concurrency == 4
+    assert service._update_observers == [snapshot_service]
+
+
+def test_get_category_catalog_uses_tx_service(monkeypatch):
+    tx_service = object()
+    monkeypatch.setattr(deps_services, "get_firefly_tx_service", lambda: tx_service)
+    monkeypatch.setattr(
+        deps_services, "settings", SimpleNamespace(CATEGORY_CACHE_TTL_SECONDS=120)
+    )
+
+    first = deps_services.get_category_catalog()
+    second = deps_services.get_category_catalog()
+
+    assert isinstance(first, CategoryCatalog)
+    assert first.tx_service is tx_service
+    assert first.ttl_seconds == 120
+    assert second is first
 
 
 def test_get_snapshot_store_returns_cached_in_memory_store():
@@ -140,6 +179,22 @@ def test_get_snapshot_store_returns_cached_in_memory_store():
     assert second is first
 
 
+def test_get_snapshot_store_returns_file_store_when_path_configured(
+    monkeypatch, tmp_path
+):
+    path = tmp_path / "snapshot.bin"
+    monkeypatch.setattr(
+        deps_services,
+        "settings",
+        SimpleNamespace(TRANSACTION_SNAPSHOT_PATH=str(path)),
+    )
+
+    store = deps_services.get_snapshot_store()
+
+    assert isinstance(store, FileSnapshotStore)
+    assert store.path == path
+
+
 def test_get_transaction_snapshot_service_uses_store_and_firefly_service(monkeypatch):
     store = MagicMock()
     firefly_service = MagicMock()
@@ -151,7 +206,13 @@ def test_get_transaction_snapshot_service_uses_store_and_firefly_service(monkeyp
     monkeypatch.setattr(
         deps_services,
         "settings",
-        SimpleNamespace(TRANSACTION_SNAPSHOT_TTL_SECONDS=86400),
+        SimpleNamespace(
+            TRANSACTION_SNAPSHOT_TTL_SECONDS=86400,
+            TRANSACTION_SNAPSHOT_STALE_WHILE_REVALIDATE_SECONDS=600,
+            TRANSACTION_SNAPSHOT_DELTA_REFRESH=True,
+            TRANSACTION_SNAPSHOT_DELTA_OVERLAP_DAYS=3,
+            TRANSACTION_SNAPSHOT_FULL_RECONCILE_SECONDS=7200,
+        ),
     )
 
     service = deps_services.get_transaction_snapshot_service()
@@ -160,6 +221,10 @@ def test_get_transaction_snapshot_service_uses_store_and_firefly_service(monkeyp
     assert service.store is store
     assert service.firefly_service is firefly_service
     assert service.max_age_seconds == 86400
+    assert service.stale_while_revalidate_seconds == 600
+    assert service.delta_refresh_enabled is True
+    assert service.delta_overlap_days == 3
+    assert service.full_reconcile_seconds == 7200
 
 
 def test_get_snapshot_blik_metrics_service_uses_snapshot_service(monkeypatch):
@@ -225,10 +290,12 @@ def test_get_snapshot_tx_metrics_service_uses_both_filters(monkeypatch):
 
 def test_get_category_suggestion_service_uses_snapshot_provider(monkeypatch):
     snapshot_service = MagicMock()
+    tx_service = MagicMock()
 
     monkeypatch.setattr(
         deps_services, "get_transaction_snapshot_service", lambda: snapshot_service
     )
+    monkeypatch.setattr(deps_services, "get_firefly_tx_service", lambda: tx_service)
 
     service = deps_services.get_category_suggestion_service()
 
@@ -246,6 +313,136 @@ def test_get_category_suggestion_service_uses_snapshot_provider(monkeypatch):
         is service._similarity_engine._amount_bucketizer
     )
     assert service._amount_bucketizer is service._similarity_engine._amount_bucketizer
+    assert service._similarity_engine._use_token_index is False
+    assert service._similarity_engine._max_key_share is None
+    assert isinstance(service._exact_history, ExactHistoryTable)
+    assert service._classifier is None
+    tx_service.add_update_observer.assert_called_once_with(service._snapshot_provider)
+    assert (
+        service._snapshot_provider._select_categorizable
+        == tx_service.select_for_screening
+    )
+    assert (
+        service._exact_history._preprocessor is service._similarity_engine._preprocessor
+    )
+
+
+def test_get_category_suggestion_service_selects_tfidf_engine(monkeypatch):
+    monkeypatch.setattr(
+        deps_services, "get_transaction_snapshot_service", lambda: MagicMock()
+    )
+    monkeypatch.setattr(deps_services, "get_firefly_tx_service", lambda: MagicMock())
+    monkeypatch.setattr(
+        deps_services,
+        "settings",
+        SimpleNamespace(
+            CATEGORIZATION_ENGINE="tfidf",
+            CATEGORIZATION_PROCESS_WORKERS=0,
+            CATEGORIZATION_PRECOMPUTE=False,
+            CATEGORIZATION_EXACT_HISTORY=False,
+            CATEGORIZATION_NAIVE_BAYES_BLEND=0.25,
+        ),
+    )
+
+    service = deps_services.get_category_suggestion_service()
+
+    assert isinstance(service, DefaultCategorySuggestionService)
+    assert isinstance(service._similarity_engine, TfidfTransactionSimilarityEngine)
+    assert service._amount_bucketizer is service._similarity_engine._amount_bucketizer
+    assert service._exact_history is None
+    assert isinstance(service._classifier, NaiveBayesCategoryClassifier)
+    assert service._classifier_weight == 0.25
+
+
+def test_get_category_suggestion_service_selects_naive_bayes_classifier(monkeypatch):
+    monkeypatch.setattr(
+        deps_services, "get_transaction_snapshot_service", lambda: MagicMock()
+    )
+    monkeypatch.setattr(deps_services, "get_firefly_tx_service", lambda: MagicMock())
+    monkeypatch.setattr(
+        deps_services,
+        "settings",
+        SimpleNamespace(
+            CATEGORIZATION_ENGINE="naive_bayes",
+            CATEGORIZATION_PROCESS_WORKERS=0,
+            CATEGORIZATION_TOKEN_INDEX=True,
+            CATEGORIZATION_INDEX_BUCKET_FALLBACK=True,
+            CATEGORIZATION_INDEX_MAX_KEY_SHARE=None,
+            CATEGORIZATION_PRECOMPUTE=False,
+            CATEGORIZATION_EXACT_HISTORY=True,
+            CATEGORIZATION_NAIVE_BAYES_BLEND=0.0,
+        ),
+    )
+
+    service = deps_services.get_category_suggestion_service()
+
+    assert isinstance(service._classifier, NaiveBayesCategoryClassifier)
+    assert service._classifier_weight == 1.0
+    assert isinstance(service._similarity_engine, WeightedTransactionSimilarityEngine)
+    assert service._classifier._preprocessor is service._exact_history._preprocessor
+
+
+def test_get_category_suggestion_service_offloads_to_worker_processes(monkeypatch):
+    monkeypatch.setattr(
+        deps_services, "get_transaction_snapshot_service", lambda: MagicMock()
+    )
+    monkeypatch.setattr(deps_services, "get_firefly_tx_service", lambda: MagicMock())
+    monkeypatch.setattr(
+        deps_services,
+        "settings",
+        SimpleNamespace(
+            CATEGORIZATION_ENGINE="tfidf",
+            CATEGORIZATION_PROCESS_WORKERS=3,
+            CATEGORIZATION_PRECOMPUTE=False,
+            CATEGORIZATION_EXACT_HISTORY=False,
+            CATEGORIZATION_NAIVE_BAYES_BLEND=0.0,
+        ),
+    )
+
+    service = deps_services.get_category_suggestion_service()
+
+    engine = service._similarity_engine
+    assert isinstance(engine, ProcessPoolSimilarityEngine)
+    assert engine._workers == 3
+    assert isinstance(engine._local_engine, TfidfTransactionSimilarityEngine)
+    assert engine._pool is None
+
+
+def test_get_category_suggestion_service_serves_precomputed_suggestions(monkeypatch):
+    snapshot_service = MagicMock()
+    tx_service = MagicMock()
+    monkeypatch.setattr(
+        deps_services, "get_transaction_snapshot_service", lambda: snapshot_service
+    )
+    monkeypatch.setattr(deps_services, "get_firefly_tx_service", lambda: tx_service)
+    monkeypatch.setattr(
+        deps_services,
+        "settings",
+        SimpleNamespace(
+            CATEGORIZATION_ENGINE="tfidf",
+            CATEGORIZATION_PROCESS_WORKERS=0,
+            CATEGORIZATION_PRECOMPUTE=True,
+            CATEGORIZATION_EXACT_HISTORY=False,
+            CATEGORIZATION_NAIVE_BAYES_BLEND=0.0,
+        ),
+    )
+
+    service = deps_services.get_category_suggestion_service()
+    precomputer = deps_services.get_category_suggestion_precomputer()
+
+    assert isinstance(service, PrecomputedCategorySuggestionService)
+    assert isinstance(precomputer, CategorySuggestionPrecomputer)
+    assert service.precomputer is precomputer
+    assert isinstance(service._service, DefaultCategorySuggestionService)
+    background = precomputer._suggestion_service
+    assert isinstance(background, DefaultCategorySuggestionService)
+    assert background is not service._service
+    assert background._snapshot_provider._stored_snapshot_only is True
+    assert service._service._snapshot_provider._stored_snapshot_only is False
+    tx_service.add_update_observer.assert_any_call(service._service._snapshot_provider)
+    tx_service.add_update_observer.assert_any_call(precomputer)
+    assert precomputer._select_categorizable == tx_service.select_for_screening
+    snapshot_service.add_listener.assert_called_once_with(precomputer.on_snapshot)
 
 
 def test_get_user_secrets_service_builds_repositories_from_db():
@@ -1,7 +1,7 @@
-from datetime import UTC, datetime
-from unittest.mock import AsyncMock
+from datetime import UTC, date, datetime
+from unittest.mock import AsyncMock, MagicMock
 
-from api.routers.system import get_transaction_snapshot_service
+from api.routers.system import get_category_catalog, get_transaction_snapshot_service
 from services.domain.metrics import FetchMetrics
 from services.snapshot.models import TransactionSnapshot
 from settings import settings
@@ -143,6 +143,79 @@ def test_transaction_snapshot_refresh_returns_snapshot_metadata(client, monkeypa
         "expires_at": "2026-03-27T10:00:00Z",
         "transaction_count": 0,
         "schema_version": 1,
+        "start_date": None,
+        "end_date": None,
         "timestamp": r.json()["timestamp"],
     }
     service.refresh_snapshot.assert_awaited_once_with()
+
+
+def test_transaction_snapshot_refresh_accepts_date_range(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_KEY", "internal-secret")
+    snapshot = TransactionSnapshot(
+        transactions=[],
+        metrics=FetchMetrics(
+            total_transactions=0,
+            fetching_duration_ms=10,
+            invalid=0,
+            multipart=0,
+        ),
+        fetched_at=datetime(2026, 3, 26, 10, 0, tzinfo=UTC),
+    )
+    service = AsyncMock()
+    service.max_age_seconds = 86400
+    service.refresh_range = AsyncMock(return_value=snapshot)
+
+    client.app.dependency_overrides[get_transaction_snapshot_service] = lambda: service
+
+    r = client.post(
+        "/api/system/transaction-snapshot/refresh",
+        params={"start_date": "2026-02-01", "end_date": "2026-03-31"},
+        headers={"X-Internal-Api-Key": "internal-secret"},
+    )
+
+    assert r.status_code == 200
+    assert r.json()["start_date"] == "2026-02-01"
+    assert r.json()["end_date"] == "2026-03-31"
+    service.refresh_range.assert_awaited_once_with(date(2026, 2, 1), date(2026, 3, 31))
+    service.refresh_snapshot.assert_not_awaited()
+
+
+def test_transaction_snapshot_refresh_rejects_inverted_date_range(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_KEY", "internal-secret")
+    service = AsyncMock()
+    client.app.dependency_overrides[get_transaction_snapshot_service] = lambda: service
+
+    r = client.post(
+        "/api/system/transaction-snapshot/refresh",
+        params={"start_date": "2026-03-31", "end_date": "2026-02-01"},
+        headers={"X-Internal-Api-Key": "internal-secret"},
+    )
+
+    assert r.status_code == 422
+    service.refresh_range.assert_not_awaited()
+
+
+def test_category_catalog_invalidate_drops_cached_categories(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_KEY", "internal-secret")
+    catalog = MagicMock()
+    client.app.dependency_overrides[get_category_catalog] = lambda: catalog
+
+    r = client.post(
+        "/api/system/category-catalog/invalidate",
+        headers={"X-Internal-Api-Key": "internal-secret"},
+    )
+
+    assert r.status_code == 204
+    catalog.invalidate.assert_called_once_with()
+
+
+def test_category_catalog_invalidate_requires_internal_api_key(client, monkeypatch):
+    monkeypatch.setattr(settings, "INTERNAL_API_KEY", "internal-secret")
+    catalog = MagicMock()
+    client.app.dependency_overrides[get_category_catalog] = lambda: catalog
+
+    r = client.post("/api/system/category-catalog/invalidate")
+
+    assert r.status_code == 401
+    catalog.invalidate.assert_not_called()
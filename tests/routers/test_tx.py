@@ -1,7 +1,12 @@
 from datetime import UTC, date, datetime
+from types import SimpleNamespace
+from uuid import UUID, uuid4
 
 from api.deps_runtime import get_tx_application_runtime
-from api.deps_services import get_category_suggestion_service
+from api.deps_services import (
+    get_category_suggestion_precomputer,
+    get_category_suggestion_service,
+)
 from api.models.tx import (
     ScreeningMonthResponse,
     SimplifiedCategory,
@@ -10,9 +15,13 @@ from api.models.tx import (
 )
 from api.routers.auth import create_access_token
 from services.db.repository import UserRepository
-from services.domain.category_suggestion import CategorySuggestion
+from services.domain.category_suggestion import (
+    CategorySuggestion,
+    SuggestionPrecomputeProgress,
+)
 from services.domain.job_base import JobStatus
 from services.domain.metrics import TXStatisticsMetrics
+from services.domain.tx_bulk import TxBulkJob, TxOperation, TxOperationOutcome
 from services.exceptions import ExternalServiceFailed, TransactionNotFound
 from services.tx_stats.models import MetricsState
 
@@ -46,8 +55,19 @@ class FakeTxApplicationService:
         self.apply_tag_error = apply_tag_error
         self.applied_categories: list[tuple[int, int]] = []
         self.applied_tags: list[tuple[int, TxTag]] = []
+        self.screening_calls: list[tuple[int, int, bool, str | None]] = []
+        self.bulk_operations: list[TxOperation] = []
+        self.bulk_jobs: dict[UUID, TxBulkJob] = {}
 
-    async def get_screening_month(self, *, year: int, month: int):
+    async def get_screening_month(
+        self,
+        *,
+        year: int,
+        month: int,
+        live: bool = False,
+        categories_version: str | None = None,
+    ):
+        self.screening_calls.append((year, month, live, categories_version))
         return self.screening_response
 
     async def apply_category(self, *, tx_id: int, category_id: int) -> None:
@@ -60,6 +80,15 @@ class FakeTxApplicationService:
             raise self.apply_tag_error
         self.applied_tags.append((tx_id, tag))
 
+    async def start_bulk_job(self, *, operations: list[TxOperation]) -> TxBulkJob:
+        self.bulk_operations.extend(operations)
+        job = TxBulkJob(id=uuid4(), total=len(operations), status=JobStatus.PENDING)
+        self.bulk_jobs[job.id] = job
+        return job
+
+    def get_bulk_job(self, *, job_id: UUID) -> TxBulkJob | None:
+        return self.bulk_jobs.get(job_id)
+
     async def get_tx_metrics(self):
         return self.metrics_state
 
@@ -86,6 +115,18 @@ class FakeCategorySuggestionService:
             raise TransactionNotFound(f"Transaction id {transaction_id} not found")
         return self.suggestions
 
+    async def suggest_for_transaction_ids(
+        self, *, user_id: str, transaction_ids: list[str], limit: int = 3
+    ):
+        self.calls.append((user_id, ",".join(transaction_ids), limit))
+        return dict.fromkeys(transaction_ids, self.suggestions)
+
+    async def suggest_for_month(
+        self, *, user_id: str, year: int, month: int, limit: int = 3
+    ):
+        self.calls.append((user_id, f"{year}-{month:02d}", limit))
+        return {"7": self.suggestions}
+
 
 def _metrics_state() -> MetricsState[TXStatisticsMetrics]:
     result = TXStatisticsMetrics(
@@ -151,6 +192,35 @@ def test_tx_screening_happy_path_returns_200(client, db):
     assert body["remaining"] == 1
     assert body["transactions"][0]["id"] == 1
     assert body["categories"][0]["name"] == "Food"
+    assert svc.screening_calls == [(2024, 1, False, None)]
+
+
+def test_tx_screening_passes_live_flag(client, db):
+    user = _create_user(db)
+    svc = FakeTxApplicationService(screening_response=_screening_response())
+    client.app.dependency_overrides[get_tx_application_runtime] = lambda: svc
+
+    response = client.get(
+        "/api/tx/screening?year=2024&month=1&live=true",
+        headers=_auth_header(str(user.id)),
+    )
+
+    assert response.status_code == 200
+    assert svc.screening_calls == [(2024, 1, True, None)]
+
+
+def test_tx_screening_passes_categories_version(client, db):
+    user = _create_user(db)
+    svc = FakeTxApplicationService(screening_response=_screening_response())
+    client.app.dependency_overrides[get_tx_application_runtime] = lambda: svc
+
+    response = client.get(
+        "/api/tx/screening?year=2024&month=1&categories_version=abc123",
+        headers=_auth_header(str(user.id)),
+    )
+
+    assert response.status_code == 200
+    assert svc.screening_calls == [(2024, 1, False, "abc123")]
 
 
 def test_tx_screening_no_results_returns_204(client, db):
@@ -199,6 +269,91 @@ def test_tx_apply_tag_external_error_returns_502(client, db):
     assert response.status_code == 502
 
 
+def test_tx_bulk_starts_job_with_operations(client, db):
+    user = _create_user(db)
+    svc = FakeTxApplicationService()
+    client.app.dependency_overrides[get_tx_application_runtime] = lambda: svc
+
+    response = client.post(
+        "/api/tx/bulk",
+        json={
+            "operations": [
+                {"transaction_id": 1, "category_id": 5},
+                {"transaction_id": 2, "tags": ["blik_done", "action_req"]},
+            ]
+        },
+        headers=_auth_header(str(user.id)),
+    )
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "pending"
+    assert body["total"] == 2
+    assert svc.bulk_operations == [
+        TxOperation(transaction_id=1, category_id=5),
+        TxOperation(transaction_id=2, tags=frozenset({"blik_done", "action_req"})),
+    ]
+
+
+def test_tx_bulk_rejects_invalid_operations(client, db):
+    user = _create_user(db)
+    svc = FakeTxApplicationService()
+    client.app.dependency_overrides[get_tx_application_runtime] = lambda: svc
+
+    for operations in (
+        [],
+        [{"transaction_id": 1}],
+        [
+            {"transaction_id": 1, "category_id": 5},
+            {"transaction_id": 1, "tags": ["blik_done"]},
+        ],
+    ):
+        response = client.post(
+            "/api/tx/bulk",
+            json={"operations": operations},
+            headers=_auth_header(str(user.id)),
+        )
+        assert response.status_code == 422
+
+    assert svc.bulk_operations == []
+
+
+def test_tx_bulk_job_status_returns_results(client, db):
+    user = _create_user(db)
+    svc = FakeTxApplicationService()
+    job = TxBulkJob(
+        id=uuid4(),
+        total=2,
+        status=JobStatus.DONE,
+        applied=1,
+        failed=1,
+        results=[
+            TxOperationOutcome(transaction_id=1, status="success"),
+            TxOperationOutcome(transaction_id=2, status="failed", reason="boom"),
+        ],
+    )
+    svc.bulk_jobs[job.id] = job
+    client.app.dependency_overrides[get_tx_application_runtime] = lambda: svc
+
+    response = client.get(
+        f"/api/tx/bulk-jobs/{job.id}", headers=_auth_header(str(user.id))
+    )
+    missing = client.get(
+        f"/api/tx/bulk-jobs/{uuid4()}", headers=_auth_header(str(user.id))
+    )
+    invalid = client.get("/api/tx/bulk-jobs/nope", headers=_auth_header(str(user.id)))
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "done"
+    assert response.json()["results"][1] == {
+        "transaction_id": 2,
+        "status": "failed",
+        "reason": "boom",
+    }
+    assert missing.status_code == 404
+    assert invalid.status_code == 400
+
+
 def test_tx_stats_happy_path_returns_200(client, db):
     user = _create_user(db)
     svc = FakeTxApplicationService(metrics_state=_metrics_state())
@@ -273,3 +428,92 @@ def test_tx_category_suggestions_missing_transaction_returns_404(client, db):
 
     assert response.status_code == 404
     assert response.json()["detail"] == "Transaction id 999 not found"
+
+
+def test_tx_batch_category_suggestions_by_ids_and_month(client, db):
+    user = _create_user(db)
+    suggestion = CategorySuggestion(
+        category_id="1",
+        category_name="Food",
+        score=0.91,
+        reason="similar merchant in previous transactions",
+    )
+    service = FakeCategorySuggestionService(suggestions=[suggestion])
+    client.app.dependency_overrides[get_category_suggestion_service] = lambda: service
+
+    by_ids = client.get(
+        "/api/tx/category-suggestions?transaction_ids=1&transaction_ids=2&limit=5",
+        headers=_auth_header(str(user.id)),
+    )
+    by_month = client.get(
+        "/api/tx/category-suggestions?year=2024&month=3",
+        headers=_auth_header(str(user.id)),
+    )
+
+    assert by_ids.status_code == 200
+    assert set(by_ids.json()["suggestions"]) == {"1", "2"}
+    assert by_ids.json()["suggestions"]["2"][0]["category_name"] == "Food"
+    assert by_month.status_code == 200
+    assert list(by_month.json()["suggestions"]) == ["7"]
+    assert service.calls == [
+        (str(user.id), "1,2", 5),
+        (str(user.id), "2024-03", 3),
+    ]
+
+
+def test_tx_batch_category_suggestions_requires_ids_or_month(client, db):
+    user = _create_user(db)
+    service = FakeCategorySuggestionService()
+    client.app.dependency_overrides[get_category_suggestion_service] = lambda: service
+
+    response = client.get(
+        "/api/tx/category-suggestions?year=2024",
+        headers=_auth_header(str(user.id)),
+    )
+
+    assert response.status_code == 422
+    assert service.calls == []
+
+
+def test_tx_suggestion_precompute_progress(client, db):
+    user = _create_user(db)
+    started_at = datetime(2024, 3, 1, 12, 0, tzinfo=UTC)
+    precomputer = SimpleNamespace(
+        progress=SuggestionPrecomputeProgress(
+            status=JobStatus.RUNNING,
+            revision=4,
+            total=120,
+            completed=50,
+            started_at=started_at,
+        )
+    )
+    client.app.dependency_overrides[get_category_suggestion_precomputer] = lambda: (
+        precomputer
+    )
+
+    response = client.get(
+        "/api/tx/category-suggestions/precompute",
+        headers=_auth_header(str(user.id)),
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {
+        "status": "running",
+        "revision": 4,
+        "total": 120,
+        "completed": 50,
+        "started_at": "2024-03-01T12:00:00Z",
+        "finished_at": None,
+    }
+
+
+def test_tx_suggestion_precompute_progress_returns_404_when_disabled(client, db):
+    user = _create_user(db)
+    client.app.dependency_overrides[get_category_suggestion_precomputer] = lambda: None
+
+    response = client.get(
+        "/api/tx/category-suggestions/precompute",
+        headers=_auth_header(str(user.id)),
+    )
+
+    assert response.status_code == 404
@@ -0,0 +1,172 @@
+from decimal import Decimal
+
+from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.corpus import CategorizationCorpus
+from services.categorization.exact_history import ExactHistoryTable
+from services.categorization.models import TransactionCategorizationQuery
+from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.domain.category_suggestion import (
+    CategorySuggestion,
+    TransactionCategorizationDocument,
+)
+
+BUCKETIZER = AmountBucketizer()
+
+
+def _document(
+    transaction_id: str,
+    category_name: str,
+    title: str,
+    merchant: str | None = None,
+) -> TransactionCategorizationDocument:
+    return TransactionCategorizationDocument(
+        transaction_id=transaction_id,
+        user_id="user-1",
+        category_id=category_name.lower(),
+        category_name=category_name,
+        title=title,
+        merchant=merchant,
+        notes=None,
+        amount=Decimal("20.00"),
+        amount_bucket=BUCKETIZER.bucket_for_amount(Decimal("20.00")),
+        source_type="bank",
+    )
+
+
+def _query(
+    title: str, merchant: str | None = None, transaction_id: str | None = None
+) -> TransactionCategorizationQuery:
+    return TransactionCategorizationQuery(
+        transaction_id=transaction_id,
+        title=title,
+        merchant=merchant,
+        notes=None,
+        amount=Decimal("20.00"),
+        amount_bucket=BUCKETIZER.bucket_for_amount(Decimal("20.00")),
+        source_type="bank",
+    )
+
+
+DOCUMENTS = [
+    _document("1", "Groceries", "Biedronka Warszawa"),
+    _document("2", "Groceries", "BIEDRONKA  WARSZAWA"),
+    _document("3", "Groceries", "Biedronka Warszawa"),
+    _document("4", "Home", "Biedronka Warszawa"),
+    _document("5", "Fuel", "Orlen"),
+    _document("6", "Restaurants", "BLIK platnosc", merchant="Starbucks"),
+    _document("7", "Restaurants", "BLIK platnosc", merchant="Starbuck's"),
+    _document("8", "Restaurants", "BLIK platnosc", merchant="STARBUCKS"),
+    _document("9", "Electronics", "Allegro", merchant="Allegro"),
+    _document("10", "Home", "Allegro", merchant="Allegro"),
+]
+
+
+def _table(**kwargs) -> ExactHistoryTable:
+    return ExactHistoryTable(preprocessor=CategorizationTextPreprocessor(), **kwargs)
+
+
+def test_exact_history_answers_dominant_normalized_title():
+    suggestions = _table(min_share=0.75).suggest(
+        _query("BIEDRONKA Warszawa"), DOCUMENTS, limit=3
+    )
+
+    assert suggestions == [
+        CategorySuggestion(
+            category_id="groceries",
+            category_name="Groceries",
+            score=0.75,
+            reason="same title in exact-history table",
+        ),
+        CategorySuggestion(
+            category_id="home",
+            category_name="Home",
+            score=0.25,
+            reason="same title in exact-history table",
+        ),
+    ]
+
+
+def test_exact_history_prefers_merchant_and_falls_back_without_dominance():
+    table = _table()
+
+    merchant = table.suggest(
+        _query("BLIK platnosc", merchant="starbucks"), DOCUMENTS, limit=3
+    )
+    ambiguous = table.suggest(_query("Allegro", merchant="Allegro"), DOCUMENTS, limit=3)
+    below_share = table.suggest(_query("Biedronka Warszawa"), DOCUMENTS, limit=3)
+    single = table.suggest(_query("Orlen"), DOCUMENTS, limit=3)
+    unknown = table.suggest(_query("Netflix"), DOCUMENTS, limit=3)
+
+    assert merchant is not None
+    assert [(s.category_id, s.score, s.reason) for s in merchant] == [
+        ("restaurants", 1.0, "same merchant in exact-history table")
+    ]
+    assert ambiguous is None
+    assert below_share is None
+    assert single is None
+    assert unknown is None
+
+
+def test_exact_history_leaves_query_transaction_out():
+    table = _table(min_share=0.75)
+
+    own = table.suggest(
+        _query("BLIK platnosc", merchant="Starbucks", transaction_id="6"),
+        DOCUMENTS,
+        limit=3,
+    )
+    tipped = table.suggest(
+        _query("Biedronka Warszawa", transaction_id="4"), DOCUMENTS, limit=1
+    )
+
+    assert own is not None
+    assert [(s.category_id, s.score) for s in own] == [("restaurants", 1.0)]
+    assert tipped is not None
+    assert [(s.category_id, s.score) for s in tipped] == [("groceries", 1.0)]
+
+
+def test_exact_history_builds_once_per_corpus_revision(monkeypatch):
+    table = _table()
+    builds = []
+    original = table._build
+
+    def counting_build(documents, features):
+        builds.append(len(documents))
+        return original(documents, features)
+
+    monkeypatch.setattr(table, "_build", counting_build)
+    corpus = CategorizationCorpus(DOCUMENTS, revision="r1")
+
+    table.suggest(_query("Orlen"), corpus, limit=3)
+    table.suggest(_query("Biedronka"), corpus, limit=3)
+    table.suggest(
+        _query("Orlen"), CategorizationCorpus(DOCUMENTS[:5], revision="r2"), limit=3
+    )
+
+    assert builds == [10, 5]
+
+
+def test_exact_history_replays_corpus_edits(monkeypatch):
+    table = _table(min_share=0.75)
+    builds = []
+    original = table._build
+
+    def counting_build(documents, features):
+        builds.append(len(documents))
+        return original(documents, features)
+
+    monkeypatch.setattr(table, "_build", counting_build)
+    corpus = CategorizationCorpus(DOCUMENTS, revision="r1")
+
+    before = table.suggest(_query("Allegro", merchant="Allegro"), corpus, limit=3)
+    corpus.upsert(_document("10", "Electronics", "Allegro", merchant="Allegro"))
+    relabelled = table.suggest(_query("Allegro", merchant="Allegro"), corpus, limit=3)
+    corpus.remove("4")
+    removed = table.suggest(_query("Biedronka Warszawa"), corpus, limit=3)
+
+    assert before is None
+    assert relabelled is not None
+    assert [(s.category_id, s.score) for s in relabelled] == [("electronics", 1.0)]
+    assert removed is not None
+    assert [(s.category_id, s.score) for s in removed] == [("groceries", 1.0)]
+    assert builds == [10]
@@ -0,0 +1,166 @@
+import math
+from decimal import Decimal
+
+import pytest
+
+from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.corpus import CategorizationCorpus
+from services.categorization.models import TransactionCategorizationQuery
+from services.categorization.naive_bayes import NaiveBayesCategoryClassifier
+from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.domain.category_suggestion import TransactionCategorizationDocument
+
+BUCKETIZER = AmountBucketizer()
+
+
+def _document(
+    transaction_id: str,
+    category_name: str,
+    title: str,
+    *,
+    merchant: str | None = None,
+    notes: str | None = None,
+    amount: str = "20.00",
+) -> TransactionCategorizationDocument:
+    return TransactionCategorizationDocument(
+        transaction_id=transaction_id,
+        user_id="user-1",
+        category_id=category_name.lower(),
+        category_name=category_name,
+        title=title,
+        merchant=merchant,
+        notes=notes,
+        amount=Decimal(amount),
+        amount_bucket=BUCKETIZER.bucket_for_amount(Decimal(amount)),
+        source_type="bank",
+    )
+
+
+def _query(
+    title: str,
+    *,
+    merchant: str | None = None,
+    notes: str | None = None,
+    amount: str = "20.00",
+    transaction_id: str | None = None,
+) -> TransactionCategorizationQuery:
+    return TransactionCategorizationQuery(
+        transaction_id=transaction_id,
+        title=title,
+        merchant=merchant,
+        notes=notes,
+        amount=Decimal(amount),
+        amount_bucket=BUCKETIZER.bucket_for_amount(Decimal(amount)),
+        source_type="bank",
+    )
+
+
+DOCUMENTS = [
+    _document("1", "Groceries", "Biedronka Warszawa", notes="zakupy"),
+    _document("2", "Groceries", "Lidl Kraków", notes="zakupy"),
+    _document("3", "Groceries", "Biedronka Gdańsk"),
+    _document("4", "Fuel", "Orlen stacja", notes="paliwo", amount="250.00"),
+    _document("5", "Fuel", "Shell stacja", notes="paliwo", amount="240.00"),
+    _document("6", "Transport", "Uber trip", amount="30.00"),
+]
+
+
+def _classifier(**kwargs) -> NaiveBayesCategoryClassifier:
+    return NaiveBayesCategoryClassifier(
+        preprocessor=CategorizationTextPreprocessor(), **kwargs
+    )
+
+
+def test_naive_bayes_ranks_categories_by_posterior_probability():
+    suggestions = _classifier().suggest(
+        _query("BIEDRONKA Poznań", notes="zakupy"), DOCUMENTS, limit=3
+    )
+
+    assert [suggestion.category_id for suggestion in suggestions][:1] == ["groceries"]
+    assert suggestions[0].score > 0.5
+    assert sum(suggestion.score for suggestion in suggestions) <= 1.0001
+    assert {suggestion.reason for suggestion in suggestions} == {
+        "words typical of this category in previous transactions"
+    }
+
+
+def test_naive_bayes_matches_hand_computed_posterior():
+    documents = [
+        _document("1", "Fuel", "orlen"),
+        _document("2", "Fuel", "orlen"),
+        _document("3", "Groceries", "lidl"),
+    ]
+    suggestions = _classifier(min_probability=0.0).suggest(
+        _query("orlen"), documents, limit=2
+    )
+
+    # Features: (title, orlen|lidl) and one amount bucket; vocabulary of 3.
+    fuel = math.log(3 / 5) + math.log(3 / 7) + math.log(3 / 7)
+    groceries = math.log(2 / 5) + math.log(1 / 5) + math.log(2 / 5)
+    expected = 1 / (1 + math.exp(groceries - fuel))
+    assert [(s.category_id, s.score) for s in suggestions] == [
+        ("fuel", round(expected, 4)),
+        ("groceries", round(1 - expected, 4)),
+    ]
+
+
+def test_naive_bayes_skips_queries_without_known_words_and_applies_limit():
+    classifier = _classifier()
+
+    unknown = classifier.suggest(_query("Netflix", amount="43.00"), DOCUMENTS, limit=3)
+    limited = classifier.suggest(_query("stacja", amount="245.00"), DOCUMENTS, limit=1)
+
+    assert unknown == []
+    assert [suggestion.category_id for suggestion in limited] == ["fuel"]
+    assert classifier.suggest(_query("Orlen"), [], limit=3) == []
+
+
+def test_naive_bayes_leaves_query_transaction_out():
+    documents = [*DOCUMENTS, _document("7", "Health", "Apteka Gemini")]
+    classifier = _classifier()
+
+    own = classifier.suggest(
+        _query("Apteka Gemini", transaction_id="7"), documents, limit=3
+    )
+    preview = classifier.suggest(_query("Apteka Gemini"), documents, limit=3)
+
+    assert own == []
+    assert preview[0].category_id == "health"
+
+
+def test_naive_bayes_trains_once_per_revision_and_replays_edits(monkeypatch):
+    classifier = _classifier()
+    trainings = []
+    original = classifier._train
+
+    def counting_train(documents, features):
+        trainings.append(len(documents))
+        return original(documents, features)
+
+    monkeypatch.setattr(classifier, "_train", counting_train)
+    corpus = CategorizationCorpus(DOCUMENTS, revision="r1")
+
+    classifier.suggest(_query("Uber"), corpus, limit=3)
+    corpus.upsert(_document("6", "Entertainment", "Uber trip", amount="30.00"))
+    corpus.upsert(_document("7", "Entertainment", "Cinema City"))
+    corpus.remove("1")
+    incremental = classifier.suggest(_query("Uber trip"), corpus, limit=3)
+    retrained = _classifier().suggest(
+        _query("Uber trip"),
+        CategorizationCorpus(list(corpus), revision="r2"),
+        limit=3,
+    )
+
+    assert incremental == retrained
+    assert incremental[0].category_id == "entertainment"
+    assert trainings == [6]
+
+
+@pytest.mark.parametrize("alpha", [0.5, 1.0])
+def test_naive_bayes_scores_match_between_corpus_and_plain_list(alpha):
+    query = _query("Orlen", notes="paliwo", amount="250.00")
+    classifier = _classifier(alpha=alpha)
+
+    assert classifier.suggest(
+        query, CategorizationCorpus(DOCUMENTS, revision="r1"), limit=3
+    ) == classifier.suggest(query, DOCUMENTS, limit=3)
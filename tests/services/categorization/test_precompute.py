@@ -0,0 +1,384 @@
+import asyncio
+import threading
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.precompute import (
+    CategorySuggestionPrecomputer,
+    PrecomputedCategorySuggestionService,
+)
+from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.categorization.service import (
+    CategorySuggestionService,
+    DefaultCategorySuggestionService,
+)
+from services.categorization.snapshot_provider import SnapshotCategorizationProvider
+from services.categorization.tfidf_engine import TfidfTransactionSimilarityEngine
+from services.domain.category_suggestion import CategorySuggestion
+from services.domain.job_base import JobStatus
+from services.domain.metrics import FetchMetrics
+from services.domain.transaction import Category, Currency, Transaction, TxType
+from services.snapshot.models import TransactionSnapshot
+
+
+def _transaction(
+    tx_id: int,
+    *,
+    categorized: bool = False,
+    description: str | None = None,
+    category: Category | None = None,
+) -> Transaction:
+    if categorized and category is None:
+        category = Category(id=1, name="Food")
+    return Transaction(
+        id=tx_id,
+        date=date(2024, 1, 1),
+        amount=Decimal("10.00"),
+        type=TxType.WITHDRAWAL,
+        description=description or f"tx-{tx_id}",
+        tags=set(),
+        notes=None,
+        category=category,
+        currency=Currency(code="PLN", symbol="zł", decimals=2),
+    )
+
+
+def _snapshot(*transactions: Transaction, revision: int = 0) -> TransactionSnapshot:
+    return TransactionSnapshot(
+        transactions=list(transactions),
+        metrics=FetchMetrics(
+            total_transactions=len(transactions),
+            fetching_duration_ms=1,
+            invalid=0,
+            multipart=0,
+        ),
+        fetched_at=datetime.now(UTC),
+        revision=revision,
+    )
+
+
+def _suggestion(transaction_id: str) -> CategorySuggestion:
+    return CategorySuggestion(
+        category_id=transaction_id,
+        category_name=f"category-{transaction_id}",
+        score=0.9,
+        reason="similar previous transactions",
+    )
+
+
+class _SnapshotService:
+    def __init__(self) -> None:
+        self.snapshot: TransactionSnapshot | None = None
+
+    async def get_snapshot(self) -> TransactionSnapshot | None:
+        return self.snapshot
+
+    async def get_cached_snapshot(self) -> TransactionSnapshot | None:
+        return self.snapshot
+
+
+class _SuggestionService(CategorySuggestionService):
+    def __init__(self, *, gate: threading.Event | None = None) -> None:
+        self.batches: list[list[str]] = []
+        self.single_calls: list[str] = []
+        self.threads: set[threading.Thread] = set()
+        self.gate = gate
+
+    async def suggest_for_transaction_ids(self, *, user_id, transaction_ids, limit=3):
+        self.batches.append(list(transaction_ids))
+        self.threads.add(threading.current_thread())
+        if self.gate is not None:
+            self.gate.wait()
+        return {
+            transaction_id: [_suggestion(transaction_id)] * limit
+            for transaction_id in transaction_ids
+        }
+
+    async def suggest_for_transaction_id(self, *, user_id, transaction_id, limit=3):
+        self.single_calls.append(transaction_id)
+        return [_suggestion("computed")]
+
+
+def _uncategorized(transactions):
+    return [tx for tx in transactions if tx.category is None]
+
+
+def _precomputer(snapshot_service, suggestion_service, **kwargs):
+    return CategorySuggestionPrecomputer(
+        snapshot_service=snapshot_service,
+        suggestion_service=suggestion_service,
+        select_categorizable=_uncategorized,
+        **kwargs,
+    )
+
+
+async def _until_scoring(suggestion_service: _SuggestionService) -> None:
+    while not suggestion_service.batches:
+        await asyncio.sleep(0.01)
+
+
+def test_precomputer_covers_categorizable_transactions_in_batches():
+    snapshot_service = _SnapshotService()
+    suggestion_service = _SuggestionService()
+    precomputer = _precomputer(snapshot_service, suggestion_service, batch_size=2)
+    snapshot = _snapshot(
+        _transaction(1),
+        _transaction(2, categorized=True),
+        _transaction(3),
+        _transaction(4),
+        revision=5,
+    )
+
+    async def scenario():
+        snapshot_service.snapshot = snapshot
+        precomputer.on_snapshot(snapshot)
+        await precomputer._task
+        return (
+            await precomputer.lookup(3, limit=2),
+            await precomputer.lookup(2, limit=3),
+            await precomputer.lookup(3, limit=5),
+        )
+
+    hit, categorized, over_limit = asyncio.run(scenario())
+
+    assert suggestion_service.batches == [["1", "3"], ["4"]]
+    assert threading.main_thread() not in suggestion_service.threads
+    assert hit == [_suggestion("3")] * 2
+    assert categorized is None
+    assert over_limit is None
+    assert set(precomputer._suggestions) == {1, 3, 4}
+    assert precomputer.progress.status == JobStatus.DONE
+    assert precomputer.progress.revision == 5
+    assert (precomputer.progress.total, precomputer.progress.completed) == (3, 3)
+    assert precomputer.progress.finished_at is not None
+
+
+def test_patch_rescores_only_related_transactions():
+    snapshot_service = _SnapshotService()
+    suggestion_service = _SuggestionService()
+    precomputer = _precomputer(snapshot_service, suggestion_service)
+    snapshot = _snapshot(
+        _transaction(1, description="Netflix monthly"),
+        _transaction(2, description="Netflix monthly"),
+        _transaction(3, description="Biedronka"),
+        _transaction(4, description="Orlen fuel"),
+    )
+    # The fake suggests category "<id>" for transaction <id>, so applying
+    # category 3 also changes what transaction 3 was suggested.
+    applied = _transaction(
+        2, description="Netflix monthly", category=Category(id=3, name="Streaming")
+    )
+
+    async def scenario():
+        snapshot_service.snapshot = snapshot
+        precomputer.on_snapshot(snapshot)
+        await precomputer._task
+        snapshot.replace_transaction(applied)
+        unnotified = await precomputer.lookup(4, limit=3)
+        await precomputer.on_transaction_updated(applied)
+        during = {
+            tx_id: await precomputer.lookup(tx_id, limit=3) for tx_id in (1, 3, 4)
+        }
+        await precomputer._task
+        after = {tx_id: await precomputer.lookup(tx_id, limit=3) for tx_id in (1, 2, 3)}
+        snapshot_service.snapshot = _snapshot(_transaction(1), revision=9)
+        await precomputer.on_transaction_updated(_transaction(1, categorized=True))
+        replaced = await precomputer.lookup(1, limit=3)
+        return unnotified, during, after, replaced
+
+    unnotified, during, after, replaced = asyncio.run(scenario())
+
+    assert unnotified is None
+    assert during == {1: None, 3: None, 4: [_suggestion("4")] * 3}
+    assert suggestion_service.batches == [["1", "2", "3", "4"], ["1", "3"]]
+    assert after == {1: [_suggestion("1")] * 3, 2: None, 3: [_suggestion("3")] * 3}
+    assert precomputer.progress.revision == 1
+    assert (precomputer.progress.total, precomputer.progress.completed) == (6, 6)
+    assert precomputer.progress.status == JobStatus.DONE
+    assert replaced is None
+
+
+def test_patch_while_scoring_discards_the_stale_batch_result():
+    async def scenario():
+        gate = threading.Event()
+        snapshot_service = _SnapshotService()
+        suggestion_service = _SuggestionService(gate=gate)
+        precomputer = _precomputer(snapshot_service, suggestion_service, batch_size=1)
+        snapshot = _snapshot(
+            _transaction(1, description="Netflix"),
+            _transaction(2, description="Netflix"),
+            _transaction(3, description="Orlen"),
+        )
+        applied = _transaction(2, description="Netflix", categorized=True)
+        snapshot_service.snapshot = snapshot
+        precomputer.on_snapshot(snapshot)
+        await _until_scoring(suggestion_service)
+        snapshot.replace_transaction(applied)
+        await precomputer.on_transaction_updated(applied)
+        gate.set()
+        await precomputer._task
+        return precomputer, suggestion_service
+
+    precomputer, suggestion_service = asyncio.run(scenario())
+
+    assert suggestion_service.batches == [["1"], ["1"], ["3"]]
+    assert set(precomputer._suggestions) == {1, 3}
+
+
+def test_applied_category_changes_suggestions_of_similar_transactions():
+    snapshot_service = _SnapshotService()
+    bucketizer = AmountBucketizer()
+
+    def suggestion_service(*, stored_snapshot_only: bool):
+        return DefaultCategorySuggestionService(
+            snapshot_provider=SnapshotCategorizationProvider(
+                snapshot_service=snapshot_service,
+                amount_bucketizer=bucketizer,
+                stored_snapshot_only=stored_snapshot_only,
+            ),
+            similarity_engine=TfidfTransactionSimilarityEngine(
+                preprocessor=CategorizationTextPreprocessor(),
+                amount_bucketizer=bucketizer,
+            ),
+            amount_bucketizer=bucketizer,
+        )
+
+    precomputer = _precomputer(
+        snapshot_service, suggestion_service(stored_snapshot_only=True)
+    )
+    service = PrecomputedCategorySuggestionService(
+        service=suggestion_service(stored_snapshot_only=False),
+        precomputer=precomputer,
+    )
+    streaming = Category(id=2, name="Streaming")
+    snapshot = _snapshot(
+        _transaction(1, description="Biedronka groceries", categorized=True),
+        _transaction(2, description="Netflix monthly plan"),
+        _transaction(3, description="Netflix monthly plan"),
+    )
+
+    async def scenario():
+        snapshot_service.snapshot = snapshot
+        precomputer.on_snapshot(snapshot)
+        await precomputer._task
+        before = await service.suggest_for_transaction_id(
+            user_id="user-1", transaction_id="3"
+        )
+        applied = _transaction(
+            2, description="Netflix monthly plan", category=streaming
+        )
+        snapshot.replace_transaction(applied)
+        await precomputer.on_transaction_updated(applied)
+        live = await service.suggest_for_transaction_id(
+            user_id="user-1", transaction_id="3"
+        )
+        await precomputer._task
+        precomputed = await precomputer.lookup(3, limit=3)
+        return before, live, precomputed
+
+    before, live, precomputed = asyncio.run(scenario())
+
+    assert "2" not in [suggestion.category_id for suggestion in before]
+    assert live[0].category_id == "2"
+    assert precomputed == live
+
+
+def test_newer_snapshot_cancels_running_precompute():
+    async def scenario():
+        gate = threading.Event()
+        snapshot_service = _SnapshotService()
+        suggestion_service = _SuggestionService(gate=gate)
+        precomputer = _precomputer(snapshot_service, suggestion_service, batch_size=1)
+        first = _snapshot(_transaction(1), _transaction(2), revision=1)
+        second = _snapshot(_transaction(3), revision=2)
+
+        precomputer.on_snapshot(first)
+        await _until_scoring(suggestion_service)
+        first_task = precomputer._task
+        snapshot_service.snapshot = second
+        precomputer.on_snapshot(second)
+        gate.set()
+        await precomputer._task
+        return precomputer, suggestion_service, first_task
+
+    precomputer, suggestion_service, first_task = asyncio.run(scenario())
+
+    assert first_task.cancelled()
+    assert suggestion_service.batches == [["1"], ["3"]]
+    assert set(precomputer._suggestions) == {3}
+    assert precomputer.progress.revision == 2
+    assert precomputer.progress.status == JobStatus.DONE
+
+
+def test_precompute_failure_is_reported_in_progress():
+    class _FailingService(_SuggestionService):
+        async def suggest_for_transaction_ids(self, **kwargs):
+            raise RuntimeError("engine failure")
+
+    async def scenario():
+        precomputer = _precomputer(_SnapshotService(), _FailingService())
+        precomputer.on_snapshot(_snapshot(_transaction(1)))
+        await precomputer._task
+        return precomputer.progress
+
+    progress = asyncio.run(scenario())
+
+    assert progress.status == JobStatus.FAILED
+    assert progress.completed == 0
+    assert progress.finished_at is not None
+
+
+def test_precomputer_stop_cancels_running_task():
+    async def scenario():
+        gate = threading.Event()
+        suggestion_service = _SuggestionService(gate=gate)
+        precomputer = _precomputer(_SnapshotService(), suggestion_service)
+        precomputer.on_snapshot(_snapshot(_transaction(1)))
+        await _until_scoring(suggestion_service)
+        task = precomputer._task
+        await precomputer.stop()
+        # Stopping does not wait for the batch already on its thread.
+        gate.set()
+        return precomputer, task
+
+    precomputer, task = asyncio.run(scenario())
+
+    assert task.cancelled()
+    assert not precomputer.running
+
+
+def test_precomputed_service_answers_lookups_and_falls_back():
+    snapshot_service = _SnapshotService()
+    inner = _SuggestionService()
+    precomputer = _precomputer(snapshot_service, inner)
+    service = PrecomputedCategorySuggestionService(
+        service=inner, precomputer=precomputer
+    )
+    snapshot = _snapshot(_transaction(1), _transaction(2, categorized=True))
+
+    async def scenario():
+        before = await service.suggest_for_transaction_id(
+            user_id="user-1", transaction_id="1"
+        )
+        snapshot_service.snapshot = snapshot
+        precomputer.on_snapshot(snapshot)
+        await precomputer._task
+        hit = await service.suggest_for_transaction_id(
+            user_id="user-1", transaction_id="1", limit=1
+        )
+        miss = await service.suggest_for_transaction_id(
+            user_id="user-1", transaction_id="2"
+        )
+        batch = await service.suggest_for_transaction_ids(
+            user_id="user-1", transaction_ids=["1"], limit=1
+        )
+        return before, hit, miss, batch
+
+    before, hit, miss, batch = asyncio.run(scenario())
+
+    assert before == [_suggestion("computed")]
+    assert hit == [_suggestion("1")]
+    assert miss == [_suggestion("computed")]
+    assert batch == {"1": [_suggestion("1")]}
+    assert inner.single_calls == ["1", "2"]
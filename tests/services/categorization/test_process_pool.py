@@ -0,0 +1,229 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from functools import partial
+
+from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.corpus import CategorizationCorpus
+from services.categorization.models import TransactionCategorizationQuery
+from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.categorization.process_pool import (
+    ProcessPoolSimilarityEngine,
+    shutdown_worker_pools,
+)
+from services.categorization.similarity_engine import (
+    TransactionSimilarityEngine,
+    WeightedTransactionSimilarityEngine,
+)
+from services.domain.category_suggestion import TransactionCategorizationDocument
+
+BUCKETIZER = AmountBucketizer()
+
+
+def _document(transaction_id: str, category: str, title: str, amount: str):
+    return TransactionCategorizationDocument(
+        transaction_id=transaction_id,
+        user_id="user-1",
+        category_id=category.lower(),
+        category_name=category,
+        title=title,
+        merchant=None,
+        notes=None,
+        amount=Decimal(amount),
+        amount_bucket=BUCKETIZER.bucket_for_amount(Decimal(amount)),
+        source_type="bank",
+    )
+
+
+def _query(title: str, amount: str = "20.00") -> TransactionCategorizationQuery:
+    return TransactionCategorizationQuery(
+        transaction_id=None,
+        title=title,
+        merchant=None,
+        notes=None,
+        amount=Decimal(amount),
+        amount_bucket=BUCKETIZER.bucket_for_amount(Decimal(amount)),
+        source_type="bank",
+    )
+
+
+DOCUMENTS = [
+    _document("1", "Groceries", "Biedronka Warszawa", "45.00"),
+    _document("2", "Fuel", "Orlen stacja paliw", "250.00"),
+    _document("3", "Groceries", "Lidl Kraków", "60.00"),
+    _document("4", "Transport", "Uber trip", "30.00"),
+]
+QUERIES = [
+    _query("BIEDRONKA 12", "40.00"),
+    _query("ORLEN STACJA", "240.00"),
+    _query("LIDL GDANSK", "55.00"),
+    _query("UBER", "25.00"),
+    _query("Netflix", "43.00"),
+]
+ENGINE_FACTORY = partial(
+    WeightedTransactionSimilarityEngine,
+    preprocessor=CategorizationTextPreprocessor(),
+    amount_bucketizer=BUCKETIZER,
+)
+
+
+class _ThreadPools:
+    def __init__(self) -> None:
+        self.started: list[tuple[int, object]] = []
+        self.executors: list[ThreadPoolExecutor] = []
+
+    def __call__(self, workers, initializer, initargs):
+        self.started.append((workers, initargs[2]))
+        executor = ThreadPoolExecutor(
+            max_workers=workers, initializer=initializer, initargs=initargs
+        )
+        self.executors.append(executor)
+        return executor
+
+
+def test_process_pool_engine_shards_queries_and_matches_local_results():
+    pools = _ThreadPools()
+    engine = ProcessPoolSimilarityEngine(
+        engine_factory=ENGINE_FACTORY, workers=2, executor_factory=pools
+    )
+    corpus = CategorizationCorpus(DOCUMENTS, revision="r1")
+
+    actual = asyncio.run(engine.find_similar_batch(QUERIES, corpus, limit=3))
+    expected = asyncio.run(ENGINE_FACTORY().find_similar_batch(QUERIES, DOCUMENTS, 3))
+
+    assert actual == expected
+    assert len(actual) == len(QUERIES)
+    assert pools.started == [(2, "r1")]
+    engine.close()
+
+
+def test_process_pool_engine_starts_one_pool_per_corpus_revision():
+    pools = _ThreadPools()
+    engine = ProcessPoolSimilarityEngine(
+        engine_factory=ENGINE_FACTORY, workers=1, executor_factory=pools
+    )
+    corpus = CategorizationCorpus(DOCUMENTS, revision="r1")
+
+    asyncio.run(engine.find_similar(QUERIES[0], corpus))
+    asyncio.run(engine.find_similar(QUERIES[1], corpus))
+    matches = asyncio.run(
+        engine.find_similar(
+            QUERIES[0], CategorizationCorpus(DOCUMENTS[1:], revision="r2")
+        )
+    )
+
+    assert pools.started == [(1, "r1"), (1, "r2")]
+    assert pools.executors[0]._shutdown
+    assert "1" not in {match.transaction_id for match in matches}
+    shutdown_worker_pools()
+    assert pools.executors[1]._shutdown
+
+
+def test_process_pool_engine_scores_candidates_without_revision_locally():
+    pools = _ThreadPools()
+    engine = ProcessPoolSimilarityEngine(
+        engine_factory=ENGINE_FACTORY, workers=2, executor_factory=pools
+    )
+
+    actual = asyncio.run(engine.find_similar_batch(QUERIES, DOCUMENTS))
+    expected = asyncio.run(ENGINE_FACTORY().find_similar_batch(QUERIES, DOCUMENTS))
+
+    assert actual == expected
+    assert pools.started == []
+    assert asyncio.run(engine.find_similar_batch([], DOCUMENTS)) == []
+
+
+def test_process_pool_engine_sends_corpus_edits_to_running_workers():
+    pools = _ThreadPools()
+    engine = ProcessPoolSimilarityEngine(
+        engine_factory=ENGINE_FACTORY, workers=1, executor_factory=pools
+    )
+    corpus = CategorizationCorpus(DOCUMENTS, revision="r1")
+
+    asyncio.run(engine.find_similar(QUERIES[0], corpus))
+    corpus.upsert(_document("5", "Subscriptions", "Netflix", "43.00"))
+    corpus.remove("1")
+    actual = asyncio.run(engine.find_similar_batch(QUERIES, corpus, limit=3))
+    expected = asyncio.run(
+        ENGINE_FACTORY().find_similar_batch(QUERIES, list(corpus), limit=3)
+    )
+
+    assert actual == expected
+    assert actual[-1][0].transaction_id == "5"
+    assert pools.started == [(1, "r1")]
+    engine.close()
+
+
+def test_process_pool_engine_rebases_workers_after_too_many_edits():
+    pools = _ThreadPools()
+    engine = ProcessPoolSimilarityEngine(
+        engine_factory=ENGINE_FACTORY,
+        workers=1,
+        executor_factory=pools,
+        max_replayed_edits=2,
+    )
+    corpus = CategorizationCorpus(DOCUMENTS, revision="r1")
+
+    asyncio.run(engine.find_similar(QUERIES[0], corpus))
+    corpus.upsert(_document("5", "Subscriptions", "Netflix", "43.00"))
+    corpus.remove("1")
+    asyncio.run(engine.find_similar(QUERIES[0], corpus))
+    corpus.remove("2")
+    actual = asyncio.run(engine.find_similar_batch(QUERIES, corpus, limit=3))
+    expected = asyncio.run(
+        ENGINE_FACTORY().find_similar_batch(QUERIES, list(corpus), limit=3)
+    )
+
+    assert actual == expected
+    assert pools.started == [(1, "r1"), (1, "r1")]
+    assert pools.executors[0]._shutdown
+    assert engine._pool is not None
+    assert engine._pool[2] == corpus.edit_count
+    engine.close()
+
+
+class _SlowEngine(TransactionSimilarityEngine):
+    async def find_similar_batch(self, queries, candidates, limit=20):
+        time.sleep(0.2)
+        return [[] for _ in queries]
+
+
+def test_process_pool_engine_keeps_event_loop_responsive():
+    engine = ProcessPoolSimilarityEngine(
+        engine_factory=_SlowEngine, workers=1, executor_factory=_ThreadPools()
+    )
+    corpus = CategorizationCorpus(DOCUMENTS, revision="r1")
+
+    async def scenario():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        result = await engine.find_similar_batch(QUERIES, corpus)
+        task.cancel()
+        return result, ticks
+
+    result, ticks = asyncio.run(scenario())
+
+    assert result == [[] for _ in QUERIES]
+    assert ticks >= 5
+    engine.close()
+
+
+def test_process_pool_engine_scores_in_spawned_worker_processes():
+    engine = ProcessPoolSimilarityEngine(engine_factory=ENGINE_FACTORY, workers=2)
+    corpus = CategorizationCorpus(DOCUMENTS, revision="r1")
+
+    try:
+        actual = asyncio.run(engine.find_similar_batch(QUERIES, corpus, limit=3))
+    finally:
+        engine.close()
+    expected = asyncio.run(ENGINE_FACTORY().find_similar_batch(QUERIES, DOCUMENTS, 3))
+
+    assert actual == expected
@@ -1,13 +1,19 @@
 import asyncio
+import random
 from decimal import Decimal
 
 from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.corpus import CategorizationCorpus
 from services.categorization.models import TransactionCategorizationQuery
 from services.categorization.preprocessor import CategorizationTextPreprocessor
 from services.categorization.similarity_engine import (
     WeightedTransactionSimilarityEngine,
+    sort_matches,
+)
+from services.domain.category_suggestion import (
+    SimilarTransactionMatch,
+    TransactionCategorizationDocument,
 )
-from services.domain.category_suggestion import TransactionCategorizationDocument
 
 
 def _document(
@@ -319,3 +325,370 @@ def test_similarity_engine_text_similarity_falls_back_to_ratio_without_tokens():
     )
 
     assert engine._text_similarity("left", "right") > 0.0
+
+
+def test_similarity_engine_batch_matches_single_query_results():
+    engine = WeightedTransactionSimilarityEngine(
+        preprocessor=CategorizationTextPreprocessor(),
+        amount_bucketizer=AmountBucketizer(),
+        min_similarity_score=0.0,
+    )
+    candidates = [
+        _document(
+            "1",
+            category_id="10",
+            category_name="Food",
+            title="Kawiarnia Starbucks",
+            merchant="Starbucks",
+            notes=None,
+            amount="12.00",
+            source_type="blik",
+        ),
+        _document(
+            "2",
+            category_id="20",
+            category_name="Transport",
+            title="Orlen stacja",
+            merchant=None,
+            notes="paliwo",
+            amount="250.00",
+        ),
+        _document(
+            "3",
+            category_id="30",
+            category_name="Shopping",
+            title="Allegro zakup",
+            merchant=None,
+            notes="kabel usb",
+            amount="35.00",
+            source_type="allegro",
+        ),
+    ]
+    bucketizer = AmountBucketizer()
+    queries = [
+        TransactionCategorizationQuery(
+            transaction_id=transaction_id,
+            title=title,
+            merchant=merchant,
+            notes=notes,
+            amount=Decimal(amount),
+            amount_bucket=bucketizer.bucket_for_amount(Decimal(amount)),
+            source_type=source_type,
+        )
+        for transaction_id, title, merchant, notes, amount, source_type in [
+            ("1", "Starbucks latte", "Starbucks", None, "11.00", "blik"),
+            (None, "ORLEN paliwo", None, "tankowanie", "240.00", "bank"),
+            ("9", "Allegro", None, "kabel hdmi", "30.00", "allegro"),
+        ]
+    ]
+
+    batch = asyncio.run(engine.find_similar_batch(queries, candidates, limit=2))
+    single = [
+        asyncio.run(engine.find_similar(query, candidates, limit=2))
+        for query in queries
+    ]
+
+    assert batch == single
+    assert all(match.transaction_id != "1" for match in batch[0])
+    assert all(len(matches) <= 2 for matches in batch)
+
+
+def _regression_corpus(seed: int = 11) -> tuple[CategorizationCorpus, list]:
+    rng = random.Random(seed)
+    merchants = {
+        "Groceries": ["Biedronka", "Lidl", "Żabka", "Kaufland", "Netto"],
+        "Fuel": ["Orlen", "Shell", "Circle K"],
+        "Restaurants": ["Starbucks", "Pizza Hut", "Bistro Pod Lipą"],
+        "Transport": ["Uber", "Bolt", "PKP Intercity"],
+        "Shopping": ["Rossmann", "Empik", "Media Expert"],
+    }
+    bucketizer = AmountBucketizer()
+
+    def entry(index: int):
+        category = rng.choice(list(merchants))
+        merchant = rng.choice(merchants[category])
+        amount = Decimal(rng.randrange(100, 60_000)) / 100
+        fields: tuple[str, str | None, str | None, str]
+        if rng.random() < 0.3:
+            title = f"BLIK - płatność w internecie {rng.randrange(10**8)}"
+            fields = (title, merchant, None, "blik")
+        else:
+            city = rng.choice(["WARSZAWA", "KRAKOW", "GDANSK"])
+            title = f"{merchant.upper()} {city} {rng.randrange(100)}"
+            notes = rng.choice([None, "zakupy", "paliwo do auta", "obiad"])
+            fields = (title, None, notes, "bank")
+        return category, amount, fields
+
+    documents = []
+    for index in range(300):
+        category, amount, (title, merchant, notes, source) = entry(index)
+        documents.append(
+            _document(
+                str(index),
+                category_id=category,
+                category_name=category,
+                title=title,
+                merchant=merchant,
+                notes=notes,
+                amount=str(amount),
+                source_type=source,
+            )
+        )
+    queries = []
+    for index in range(40):
+        _, amount, (title, merchant, notes, source) = entry(index)
+        queries.append(
+            TransactionCategorizationQuery(
+                transaction_id=f"q{index}",
+                title=title,
+                merchant=merchant,
+                notes=notes,
+                amount=amount,
+                amount_bucket=bucketizer.bucket_for_amount(amount),
+                source_type=source,
+            )
+        )
+    return CategorizationCorpus(documents, revision="r1"), queries
+
+
+def test_token_index_matches_exhaustive_scan_on_regression_corpus():
+    corpus, queries = _regression_corpus()
+    exhaustive = WeightedTransactionSimilarityEngine(
+        preprocessor=CategorizationTextPreprocessor(),
+        amount_bucketizer=AmountBucketizer(),
+    )
+    indexed = WeightedTransactionSimilarityEngine(
+        preprocessor=CategorizationTextPreprocessor(),
+        amount_bucketizer=AmountBucketizer(),
+        use_token_index=True,
+    )
+
+    expected = asyncio.run(exhaustive.find_similar_batch(queries, corpus))
+    actual = [asyncio.run(indexed.find_similar(query, corpus)) for query in queries]
+
+    assert actual == expected
+    assert any(expected)
+
+
+def test_token_index_misses_fuzzy_matches_without_a_shared_token_key():
+    documents = [
+        _document(
+            "1",
+            category_id="10",
+            category_name="Groceries",
+            title="xzabka warszawa",
+            merchant=None,
+            notes=None,
+            amount="300.00",
+        )
+    ]
+    query = TransactionCategorizationQuery(
+        transaction_id=None,
+        title="zabka",
+        merchant=None,
+        notes=None,
+        amount=Decimal("20.00"),
+        amount_bucket=AmountBucketizer().bucket_for_amount(Decimal("20.00")),
+        source_type="bank",
+    )
+    corpus = CategorizationCorpus(documents, revision="r1")
+    exhaustive = WeightedTransactionSimilarityEngine(
+        preprocessor=CategorizationTextPreprocessor(),
+        amount_bucketizer=AmountBucketizer(),
+    )
+    indexed = WeightedTransactionSimilarityEngine(
+        preprocessor=CategorizationTextPreprocessor(),
+        amount_bucketizer=AmountBucketizer(),
+        use_token_index=True,
+    )
+
+    expected = asyncio.run(exhaustive.find_similar(query, corpus))
+
+    assert [match.transaction_id for match in expected] == ["1"]
+    assert asyncio.run(indexed.find_similar(query, corpus)) == []
+
+
+def test_token_index_is_built_once_per_corpus_revision(monkeypatch):
+    corpus, queries = _regression_corpus()
+    engine = WeightedTransactionSimilarityEngine(
+        preprocessor=CategorizationTextPreprocessor(),
+        amount_bucketizer=AmountBucketizer(),
+        use_token_index=True,
+    )
+    builds = []
+    original = engine._build_index
+
+    def counting_build(features):
+        builds.append(len(features))
+        return original(features)
+
+    monkeypatch.setattr(engine, "_build_index", counting_build)
+
+    asyncio.run(engine.find_similar(queries[0], corpus))
+    asyncio.run(engine.find_similar(queries[1], corpus))
+    asyncio.run(
+        engine.find_similar(
+            queries[2], CategorizationCorpus(list(corpus)[:100], revision="r2")
+        )
+    )
+
+    assert builds == [300, 100]
+
+
+def test_corpus_features_are_normalized_once_and_reused_across_queries():
+    class _CountingPreprocessor(CategorizationTextPreprocessor):
+        calls = 0
+
+        def normalize(self, value):
+            type(self).calls += 1
+            return super().normalize(value)
+
+    corpus, queries = _regression_corpus()
+    preprocessor = _CountingPreprocessor()
+    engine = WeightedTransactionSimilarityEngine(
+        preprocessor=preprocessor,
+        amount_bucketizer=AmountBucketizer(),
+    )
+    reference = WeightedTransactionSimilarityEngine(
+        preprocessor=CategorizationTextPreprocessor(),
+        amount_bucketizer=AmountBucketizer(),
+    )
+
+    first = asyncio.run(engine.find_similar(queries[0], corpus))
+    calls_after_first = _CountingPreprocessor.calls
+    second = asyncio.run(engine.find_similar(queries[1], corpus))
+
+    assert corpus.features(preprocessor) is corpus.features(preprocessor)
+    # Only the query's title, merchant and notes are normalized (and tokenized).
+    assert _CountingPreprocessor.calls - calls_after_first <= 6
+    assert first == asyncio.run(reference.find_similar(queries[0], list(corpus)))
+    assert second == asyncio.run(reference.find_similar(queries[1], list(corpus)))
+
+
+def test_corpus_edits_are_replayed_onto_features_and_token_index(monkeypatch):
+    corpus, queries = _regression_corpus()
+    preprocessor = CategorizationTextPreprocessor()
+    engine = WeightedTransactionSimilarityEngine(
+        preprocessor=preprocessor,
+        amount_bucketizer=AmountBucketizer(),
+        use_token_index=True,
+    )
+    builds = []
+    original = engine._build_index
+
+    def counting_build(features):
+        builds.append(len(features))
+        return original(features)
+
+    monkeypatch.setattr(engine, "_build_index", counting_build)
+    asyncio.run(engine.find_similar(queries[0], corpus))
+
+    relabelled = corpus[5]
+    assert corpus.upsert(
+        _document(
+            relabelled.transaction_id,
+            category_id="Shopping",
+            category_name="Shopping",
+            title="ROSSMANN WARSZAWA 7",
+            merchant=None,
+            notes=None,
+            amount="35.00",
+        )
+    )
+    assert not corpus.upsert(corpus[5])
+    assert corpus.remove("0")
+    assert corpus.remove(corpus[-1].transaction_id)
+    assert not corpus.remove("missing")
+    assert corpus.upsert(
+        _document(
+            "new",
+            category_id="Fuel",
+            category_name="Fuel",
+            title="ORLEN KRAKOW 3",
+            merchant=None,
+            notes="paliwo do auta",
+            amount="210.00",
+        )
+    )
+
+    rebuilt = CategorizationCorpus(list(corpus), revision="rebuilt")
+    reference = WeightedTransactionSimilarityEngine(
+        preprocessor=preprocessor,
+        amount_bucketizer=AmountBucketizer(),
+    )
+
+    assert corpus.edit_count == 4
+    assert len(corpus) == 299
+    assert corpus[0].transaction_id == "299"
+    assert corpus.features(preprocessor) == rebuilt.features(preprocessor)
+    assert asyncio.run(engine.find_similar_batch(queries, corpus)) == asyncio.run(
+        reference.find_similar_batch(queries, rebuilt)
+    )
+    assert builds == [300]
+
+
+def _exhaustive(engine, query, candidates, *, limit):
+    prepared = engine._prepare(query)
+    weights = engine._weights_for(prepared)
+    matches = []
+    for candidate in candidates:
+        if candidate.transaction_id == query.transaction_id:
+            continue
+        score, matched_by = engine._score_prepared(
+            query=prepared, candidate=engine._prepare(candidate), weights=weights
+        )
+        if score >= engine._min_similarity_score:
+            matches.append(
+                SimilarTransactionMatch(
+                    transaction_id=candidate.transaction_id,
+                    category_id=candidate.category_id,
+                    category_name=candidate.category_name,
+                    similarity_score=round(score, 4),
+                    matched_by=matched_by,
+                )
+            )
+    return sort_matches(matches)[:limit]
+
+
+def test_bounded_top_k_matches_exhaustive_scoring():
+    corpus, queries = _regression_corpus(seed=5)
+    queries = queries[:20]
+    for min_similarity_score in (0.0, 0.35):
+        engine = WeightedTransactionSimilarityEngine(
+            preprocessor=CategorizationTextPreprocessor(),
+            amount_bucketizer=AmountBucketizer(),
+            min_similarity_score=min_similarity_score,
+        )
+        for limit in (1, 3, 20):
+            actual = asyncio.run(engine.find_similar_batch(queries, corpus, limit))
+            expected = [
+                _exhaustive(engine, query, corpus, limit=limit) for query in queries
+            ]
+            assert actual == expected
+
+
+def test_score_bounded_prunes_only_below_floor():
+    engine = WeightedTransactionSimilarityEngine(
+        preprocessor=CategorizationTextPreprocessor(),
+        amount_bucketizer=AmountBucketizer(),
+    )
+    corpus, queries = _regression_corpus()
+    query = engine._prepare(queries[0])
+    weights = engine._weights_for(query)
+
+    pruned = 0
+    for candidate in corpus.features(engine._preprocessor):
+        exact = engine._score_prepared(
+            query=query, candidate=candidate, weights=weights
+        )
+        at_score = engine._score_bounded(
+            query=query, candidate=candidate, weights=weights, floor=exact[0]
+        )
+        above_score = engine._score_bounded(
+            query=query, candidate=candidate, weights=weights, floor=exact[0] + 0.05
+        )
+        assert at_score == exact
+        assert above_score in (None, exact)
+        pruned += above_score is None
+
+    assert pruned > 0
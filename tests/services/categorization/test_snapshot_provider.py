@@ -1,6 +1,7 @@
 import asyncio
 from datetime import date, datetime
 from decimal import Decimal
+from unittest.mock import MagicMock
 
 import pytest
 
@@ -20,6 +21,7 @@ from services.domain.transaction import (
     TxType,
 )
 from services.exceptions import TransactionNotFound
+from services.firefly_tx_service import FireflyTxService
 from services.snapshot.models import TransactionSnapshot
 
 
@@ -30,6 +32,9 @@ class _SnapshotService:
     async def get_snapshot(self) -> TransactionSnapshot:
         return self._snapshot
 
+    async def get_cached_snapshot(self) -> TransactionSnapshot:
+        return self._snapshot
+
 
 def _transaction(
     *,
@@ -42,13 +47,15 @@ def _transaction(
     merchant: str | None = None,
     source_account: AccountRef | None = None,
     destination_account: AccountRef | None = None,
+    tx_date: date = date(2024, 1, 1),
+    description: str | None = None,
 ) -> Transaction:
     tx = Transaction(
         id=tx_id,
-        date=date(2024, 1, 1),
+        date=tx_date,
         amount=amount,
         type=tx_type,
-        description=f"tx-{tx_id}",
+        description=description or f"tx-{tx_id}",
         tags=tags or set(),
         notes=notes,
         category=category,
@@ -267,3 +274,317 @@ def test_get_query_for_transaction_id_finds_later_transaction():
 
     assert query.transaction_id == "2"
     assert query.notes == "target"
+
+
+def test_get_queries_for_transaction_ids_and_period_read_one_snapshot():
+    snapshot = TransactionSnapshot(
+        transactions=[
+            _transaction(
+                tx_id=1,
+                tx_type=TxType.WITHDRAWAL,
+                amount=Decimal("5.00"),
+                category=None,
+                tx_date=date(2024, 2, 1),
+            ),
+            _transaction(
+                tx_id=2,
+                tx_type=TxType.WITHDRAWAL,
+                amount=Decimal("9.00"),
+                category=Category(id=10, name="Food"),
+                tx_date=date(2024, 2, 10),
+            ),
+            _transaction(
+                tx_id=3,
+                tx_type=TxType.TRANSFER,
+                amount=Decimal("50.00"),
+                category=None,
+                tx_date=date(2024, 2, 12),
+            ),
+            _transaction(
+                tx_id=4,
+                tx_type=TxType.WITHDRAWAL,
+                amount=Decimal("7.00"),
+                category=None,
+                tx_date=date(2024, 2, 29),
+            ),
+            _transaction(
+                tx_id=5,
+                tx_type=TxType.WITHDRAWAL,
+                amount=Decimal("7.00"),
+                category=None,
+                tx_date=date(2024, 3, 1),
+            ),
+        ],
+        metrics=FetchMetrics(
+            total_transactions=5,
+            fetching_duration_ms=1,
+            invalid=0,
+            multipart=0,
+        ),
+        fetched_at=datetime(2024, 1, 1),
+    )
+    provider = SnapshotCategorizationProvider(
+        snapshot_service=_SnapshotService(snapshot),
+        amount_bucketizer=AmountBucketizer(),
+    )
+
+    by_ids = asyncio.run(
+        provider.get_queries_for_transaction_ids("user-1", ["2", "404", "x", "5"])
+    )
+    by_period = asyncio.run(
+        provider.get_queries_for_period("user-1", date(2024, 2, 1), date(2024, 2, 29))
+    )
+
+    assert list(by_ids) == ["2", "5"]
+    assert by_ids["2"].amount_bucket == "0-10"
+    assert list(by_period) == ["1", "4"]
+
+
+def test_candidate_corpus_is_cached_until_snapshot_revision_changes():
+    snapshot = TransactionSnapshot(
+        transactions=[
+            _transaction(
+                tx_id=1,
+                tx_type=TxType.WITHDRAWAL,
+                amount=Decimal("5.00"),
+                category=Category(id=10, name="Food"),
+            ),
+            _transaction(
+                tx_id=2,
+                tx_type=TxType.WITHDRAWAL,
+                amount=Decimal("9.00"),
+                category=None,
+            ),
+        ],
+        metrics=FetchMetrics(
+            total_transactions=2,
+            fetching_duration_ms=1,
+            invalid=0,
+            multipart=0,
+        ),
+        fetched_at=datetime(2024, 1, 1),
+    )
+    provider = SnapshotCategorizationProvider(
+        snapshot_service=_SnapshotService(snapshot),
+        amount_bucketizer=AmountBucketizer(),
+    )
+
+    first = asyncio.run(provider.get_candidate_documents_for_user("user-1"))
+    query = asyncio.run(provider.get_query_for_transaction_id("user-1", "2"))
+    second = asyncio.run(provider.get_candidate_documents_for_user("user-1"))
+    other_user = asyncio.run(provider.get_candidate_documents_for_user("user-2"))
+
+    assert second is first
+    assert other_user is first
+    assert query.transaction_id == "2"
+    assert (provider.cache_hits, provider.cache_misses) == (3, 1)
+
+    updated = _transaction(
+        tx_id=2,
+        tx_type=TxType.WITHDRAWAL,
+        amount=Decimal("9.00"),
+        category=Category(id=20, name="Fuel"),
+    )
+    assert snapshot.replace_transaction(updated)
+    third = asyncio.run(provider.get_candidate_documents_for_user("user-1"))
+
+    assert third is not first
+    assert [document.transaction_id for document in third] == ["1", "2"]
+    assert (provider.cache_hits, provider.cache_misses) == (3, 2)
+
+
+def test_transaction_update_patches_cached_corpus_in_place():
+    snapshot = TransactionSnapshot(
+        transactions=[
+            _transaction(
+                tx_id=1,
+                tx_type=TxType.WITHDRAWAL,
+                amount=Decimal("5.00"),
+                category=Category(id=10, name="Food"),
+            ),
+            _transaction(
+                tx_id=2,
+                tx_type=TxType.WITHDRAWAL,
+                amount=Decimal("9.00"),
+                category=None,
+            ),
+            _transaction(
+                tx_id=3,
+                tx_type=TxType.WITHDRAWAL,
+                amount=Decimal("7.00"),
+                category=Category(id=10, name="Food"),
+            ),
+        ],
+        metrics=FetchMetrics(
+            total_transactions=3,
+            fetching_duration_ms=1,
+            invalid=0,
+            multipart=0,
+        ),
+        fetched_at=datetime(2024, 1, 1),
+    )
+    provider = SnapshotCategorizationProvider(
+        snapshot_service=_SnapshotService(snapshot),
+        amount_bucketizer=AmountBucketizer(),
+    )
+
+    async def apply(tx: Transaction) -> None:
+        assert snapshot.replace_transaction(tx)
+        await provider.on_transaction_updated(tx)
+
+    async def scenario():
+        corpus = await provider.get_candidate_documents_for_user("user-1")
+        await apply(
+            _transaction(
+                tx_id=2,
+                tx_type=TxType.WITHDRAWAL,
+                amount=Decimal("9.00"),
+                category=Category(id=20, name="Fuel"),
+            )
+        )
+        await apply(
+            _transaction(
+                tx_id=1,
+                tx_type=TxType.WITHDRAWAL,
+                amount=Decimal("5.00"),
+                category=None,
+            )
+        )
+        patched = await provider.get_candidate_documents_for_user("user-1")
+        query = await provider.get_query_for_transaction_id("user-1", "1")
+        return corpus, patched, query
+
+    corpus, patched, query = asyncio.run(scenario())
+
+    assert patched is corpus
+    assert corpus.edit_count == 2
+    assert [document.transaction_id for document in corpus] == ["2", "3"]
+    assert corpus[0].category_name == "Fuel"
+    assert query.transaction_id == "1"
+    assert (provider.cache_hits, provider.cache_misses) == (2, 1)
+
+
+def test_transaction_update_after_missed_patch_rebuilds_corpus():
+    snapshot = TransactionSnapshot(
+        transactions=[
+            _transaction(
+                tx_id=1,
+                tx_type=TxType.WITHDRAWAL,
+                amount=Decimal("5.00"),
+                category=None,
+            ),
+        ],
+        metrics=FetchMetrics(
+            total_transactions=1,
+            fetching_duration_ms=1,
+            invalid=0,
+            multipart=0,
+        ),
+        fetched_at=datetime(2024, 1, 1),
+    )
+    provider = SnapshotCategorizationProvider(
+        snapshot_service=_SnapshotService(snapshot),
+        amount_bucketizer=AmountBucketizer(),
+    )
+    categorized = _transaction(
+        tx_id=1,
+        tx_type=TxType.WITHDRAWAL,
+        amount=Decimal("5.00"),
+        category=Category(id=10, name="Food"),
+    )
+
+    async def scenario():
+        corpus = await provider.get_candidate_documents_for_user("user-1")
+        snapshot.replace_transaction(categorized)
+        snapshot.replace_transaction(categorized)
+        await provider.on_transaction_updated(categorized)
+        return corpus, await provider.get_candidate_documents_for_user("user-1")
+
+    corpus, rebuilt = asyncio.run(scenario())
+
+    assert corpus.edit_count == 0
+    assert rebuilt is not corpus
+    assert [document.transaction_id for document in rebuilt] == ["1"]
+
+
+def test_get_queries_for_period_uses_screening_selection():
+    def uncategorized(tx_id: int, **kwargs) -> Transaction:
+        return _transaction(
+            tx_id=tx_id,
+            tx_type=TxType.WITHDRAWAL,
+            amount=Decimal("10.00"),
+            category=None,
+            tx_date=date(2024, 2, 5),
+            **kwargs,
+        )
+
+    snapshot = TransactionSnapshot(
+        transactions=[
+            uncategorized(1, description="Biedronka"),
+            uncategorized(2, description="BLIK - płatność w internecie"),
+            uncategorized(3, description="Allegro zakup"),
+            uncategorized(4, description="Allegro zakup", tags={TxTag.allegro_done}),
+            uncategorized(5, description="Orlen", tags={TxTag.action_req}),
+        ],
+        metrics=FetchMetrics(
+            total_transactions=5,
+            fetching_duration_ms=1,
+            invalid=0,
+            multipart=0,
+        ),
+        fetched_at=datetime(2024, 1, 1),
+    )
+    tx_service = FireflyTxService(
+        MagicMock(),
+        filter_desc_blik="BLIK - płatność w internecie",
+        filter_desc_allegro="allegro",
+    )
+    provider = SnapshotCategorizationProvider(
+        snapshot_service=_SnapshotService(snapshot),
+        amount_bucketizer=AmountBucketizer(),
+        select_categorizable=tx_service.select_for_screening,
+    )
+
+    queries = asyncio.run(
+        provider.get_queries_for_period("user-1", date(2024, 2, 1), date(2024, 2, 29))
+    )
+
+    assert sorted(queries) == ["1", "4"]
+
+
+def test_stored_snapshot_only_never_refreshes():
+    snapshot = TransactionSnapshot(
+        transactions=[
+            _transaction(
+                tx_id=1, tx_type=TxType.WITHDRAWAL, amount=Decimal("5"), category=None
+            )
+        ],
+        metrics=FetchMetrics(
+            total_transactions=1,
+            fetching_duration_ms=1,
+            invalid=0,
+            multipart=0,
+        ),
+        fetched_at=datetime(2024, 1, 1),
+    )
+    snapshot_service = MagicMock()
+    snapshot_service.get_snapshot.side_effect = AssertionError("refresh")
+    provider = SnapshotCategorizationProvider(
+        snapshot_service=snapshot_service,
+        amount_bucketizer=AmountBucketizer(),
+        stored_snapshot_only=True,
+    )
+
+    async def stored():
+        return snapshot
+
+    async def missing():
+        return None
+
+    snapshot_service.get_cached_snapshot = stored
+    queries = asyncio.run(provider.get_queries_for_transaction_ids("user-1", ["1"]))
+    snapshot_service.get_cached_snapshot = missing
+
+    assert list(queries) == ["1"]
+    with pytest.raises(TransactionNotFound, match="No transaction snapshot"):
+        asyncio.run(provider.get_query_for_transaction_id("user-1", "1"))
@@ -1,13 +1,16 @@
 import asyncio
+from datetime import date
 from decimal import Decimal
 
 import pytest
 
 from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.exact_history import ExactHistoryTable
 from services.categorization.models import (
     CategorizationQuery,
     TransactionCategorizationQuery,
 )
+from services.categorization.naive_bayes import NaiveBayesCategoryClassifier
 from services.categorization.preprocessor import CategorizationTextPreprocessor
 from services.categorization.service import (
     CategorySuggestionService,
@@ -29,6 +32,21 @@ class _Provider:
     async def get_candidate_documents_for_user(self, user_id: str):
         return self.documents
 
+    async def get_queries_for_transaction_ids(
+        self, user_id: str, transaction_ids: list[str]
+    ):
+        return {
+            transaction_id: await self.get_query_for_transaction_id(
+                user_id, transaction_id
+            )
+            for transaction_id in transaction_ids
+            if transaction_id != "404"
+        }
+
+    async def get_queries_for_period(self, user_id: str, start_date, end_date):
+        self.period = (start_date, end_date)
+        return await self.get_queries_for_transaction_ids(user_id, ["7"])
+
     async def get_query_for_transaction_id(self, user_id: str, transaction_id: str):
         return TransactionCategorizationQuery(
             transaction_id=transaction_id,
@@ -50,6 +68,10 @@ class _Engine:
         self.calls.append((query, candidates, limit))
         return self.matches
 
+    async def find_similar_batch(self, *, queries, candidates, limit: int = 20):
+        self.calls.append((queries, candidates, limit))
+        return [self.matches for _ in queries]
+
 
 def test_suggestion_service_aggregates_scores_by_category():
     bucketizer = AmountBucketizer()
@@ -251,6 +273,58 @@ def test_suggestion_service_maps_notes_reason_when_best_match_comes_from_notes()
     assert suggestions[0].reason == "similar notes in previous transactions"
 
 
+def test_suggestion_service_batch_scores_all_queries_with_one_engine_call():
+    engine = _Engine(
+        matches=[
+            SimilarTransactionMatch(
+                transaction_id="1",
+                category_id="10",
+                category_name="Food",
+                similarity_score=0.8,
+                matched_by="merchant",
+            )
+        ]
+    )
+    provider = _Provider([])
+    service = DefaultCategorySuggestionService(
+        snapshot_provider=provider,
+        similarity_engine=engine,
+        amount_bucketizer=AmountBucketizer(),
+    )
+
+    by_ids = asyncio.run(
+        service.suggest_for_transaction_ids(
+            user_id="user-1", transaction_ids=["1", "404", "2"]
+        )
+    )
+    by_month = asyncio.run(
+        service.suggest_for_month(user_id="user-1", year=2024, month=2)
+    )
+
+    assert list(by_ids) == ["1", "2"]
+    assert by_ids["2"][0].category_id == "10"
+    assert list(by_month) == ["7"]
+    assert provider.period == (date(2024, 2, 1), date(2024, 2, 29))
+    assert len(engine.calls) == 2
+    assert [query.transaction_id for query in engine.calls[0][0]] == ["1", "2"]
+
+
+def test_suggestion_service_batch_skips_engine_without_queries():
+    engine = _Engine(matches=[])
+    service = DefaultCategorySuggestionService(
+        snapshot_provider=_Provider([]),
+        similarity_engine=engine,
+        amount_bucketizer=AmountBucketizer(),
+    )
+
+    suggestions = asyncio.run(
+        service.suggest_for_transaction_ids(user_id="user-1", transaction_ids=["404"])
+    )
+
+    assert suggestions == {}
+    assert engine.calls == []
+
+
 def test_suggestion_service_base_contract_raises_not_implemented():
     with pytest.raises(NotImplementedError):
         asyncio.run(
@@ -275,3 +349,194 @@ def test_suggestion_service_base_contract_raises_not_implemented():
                 transaction_id="1",
             )
         )
+
+
+def test_suggestion_service_answers_exact_history_hits_without_engine():
+    bucketizer = AmountBucketizer()
+    documents = [
+        TransactionCategorizationDocument(
+            transaction_id=str(index),
+            user_id="user-1",
+            category_id="10",
+            category_name="Food",
+            title="coffee",
+            merchant="Starbucks",
+            notes=None,
+            amount=Decimal("12.00"),
+            amount_bucket=bucketizer.bucket_for_amount(Decimal("12.00")),
+            source_type="blik",
+        )
+        for index in range(1, 4)
+    ]
+    engine = _Engine(
+        matches=[
+            SimilarTransactionMatch(
+                transaction_id="1",
+                category_id="20",
+                category_name="Transport",
+                similarity_score=0.8,
+                matched_by="title",
+            )
+        ]
+    )
+    service = DefaultCategorySuggestionService(
+        snapshot_provider=_Provider(documents),
+        similarity_engine=engine,
+        amount_bucketizer=bucketizer,
+        exact_history=ExactHistoryTable(preprocessor=CategorizationTextPreprocessor()),
+    )
+    preview = CategorizationQuery(
+        transaction_id=None,
+        title="bus ticket",
+        merchant="Jakdojade",
+        notes=None,
+        amount=Decimal("4.40"),
+        source_type="blik",
+    )
+
+    by_id = asyncio.run(
+        service.suggest_for_transaction_id(user_id="user-1", transaction_id="99")
+    )
+    batch = asyncio.run(
+        service.suggest_for_transaction_ids(
+            user_id="user-1", transaction_ids=["1", "99"]
+        )
+    )
+    fallback = asyncio.run(
+        service.suggest_for_transaction(user_id="user-1", transaction=preview)
+    )
+
+    assert [(s.category_id, s.reason) for s in by_id] == [
+        ("10", "same merchant in exact-history table")
+    ]
+    assert list(batch) == ["1", "99"]
+    assert batch["1"] == by_id
+    assert batch["99"] == by_id
+    assert [s.category_id for s in fallback] == ["20"]
+    assert len(engine.calls) == 1
+
+
+def _classifier_documents() -> list[TransactionCategorizationDocument]:
+    bucketizer = AmountBucketizer()
+    return [
+        TransactionCategorizationDocument(
+            transaction_id=str(index),
+            user_id="user-1",
+            category_id=category_id,
+            category_name=category_name,
+            title=title,
+            merchant=merchant,
+            notes=None,
+            amount=Decimal("12.00"),
+            amount_bucket=bucketizer.bucket_for_amount(Decimal("12.00")),
+            source_type="blik",
+        )
+        for index, (category_id, category_name, title, merchant) in enumerate(
+            [
+                ("10", "Food", "coffee", "Starbucks"),
+                ("10", "Food", "coffee shop", "Costa"),
+                ("20", "Transport", "bus ticket", "Jakdojade"),
+            ],
+            start=1,
+        )
+    ]
+
+
+def test_suggestion_service_switches_to_classifier_and_falls_back_to_engine():
+    engine = _Engine(
+        matches=[
+            SimilarTransactionMatch(
+                transaction_id="3",
+                category_id="20",
+                category_name="Transport",
+                similarity_score=0.8,
+                matched_by="title",
+            )
+        ]
+    )
+    service = DefaultCategorySuggestionService(
+        snapshot_provider=_Provider(_classifier_documents()),
+        similarity_engine=engine,
+        amount_bucketizer=AmountBucketizer(),
+        classifier=NaiveBayesCategoryClassifier(
+            preprocessor=CategorizationTextPreprocessor()
+        ),
+    )
+    unknown = CategorizationQuery(
+        transaction_id=None,
+        title="Netflix",
+        merchant=None,
+        notes=None,
+        amount=Decimal("43.00"),
+        source_type="bank",
+    )
+
+    by_id = asyncio.run(
+        service.suggest_for_transaction_id(user_id="user-1", transaction_id="99")
+    )
+    batch = asyncio.run(
+        service.suggest_for_transaction_ids(
+            user_id="user-1", transaction_ids=["99", "98"]
+        )
+    )
+    fallback = asyncio.run(
+        service.suggest_for_transaction(user_id="user-1", transaction=unknown)
+    )
+
+    assert by_id[0].category_id == "10"
+    assert by_id[0].reason == "words typical of this category in previous transactions"
+    assert batch == {"99": by_id, "98": by_id}
+    assert [(s.category_id, s.reason) for s in fallback] == [
+        ("20", "similar title pattern in previous transactions")
+    ]
+    assert len(engine.calls) == 1
+
+
+def test_suggestion_service_blends_classifier_into_engine_scores():
+    engine = _Engine(
+        matches=[
+            SimilarTransactionMatch(
+                transaction_id="3",
+                category_id="20",
+                category_name="Transport",
+                similarity_score=0.8,
+                matched_by="title",
+            )
+        ]
+    )
+    classifier = NaiveBayesCategoryClassifier(
+        preprocessor=CategorizationTextPreprocessor()
+    )
+    service = DefaultCategorySuggestionService(
+        snapshot_provider=_Provider(_classifier_documents()),
+        similarity_engine=engine,
+        amount_bucketizer=AmountBucketizer(),
+        classifier=classifier,
+        classifier_weight=0.25,
+    )
+
+    suggestions = asyncio.run(
+        service.suggest_for_transaction_id(user_id="user-1", transaction_id="99")
+    )
+    query = asyncio.run(_Provider([]).get_query_for_transaction_id("user-1", "99"))
+    classified = {
+        s.category_id: s.score
+        for s in classifier.suggest(query, _classifier_documents(), limit=20)
+    }
+
+    assert [(s.category_id, s.score, s.reason) for s in suggestions] == sorted(
+        [
+            (
+                "20",
+                round(0.25 * classified.get("20", 0.0) + 0.75 * 0.8, 4),
+                "similar title pattern in previous transactions",
+            ),
+            (
+                "10",
+                round(0.25 * classified["10"], 4),
+                "words typical of this category in previous transactions",
+            ),
+        ],
+        key=lambda item: -item[1],
+    )
+    assert len(engine.calls) == 1
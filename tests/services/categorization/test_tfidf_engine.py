@@ -0,0 +1,160 @@
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.corpus import CategorizationCorpus
+from services.categorization.models import TransactionCategorizationQuery
+from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.categorization.tfidf_engine import (
+    TfidfTransactionSimilarityEngine,
+    char_ngrams,
+)
+from services.domain.category_suggestion import TransactionCategorizationDocument
+
+
+def _document(
+    transaction_id: str,
+    category_name: str,
+    title: str,
+    *,
+    merchant: str | None = None,
+    notes: str | None = None,
+    amount: str = "20.00",
+) -> TransactionCategorizationDocument:
+    return TransactionCategorizationDocument(
+        transaction_id=transaction_id,
+        user_id="user-1",
+        category_id=category_name.lower(),
+        category_name=category_name,
+        title=title,
+        merchant=merchant,
+        notes=notes,
+        amount=Decimal(amount),
+        amount_bucket=AmountBucketizer().bucket_for_amount(Decimal(amount)),
+        source_type="bank",
+    )
+
+
+def _query(
+    title: str,
+    *,
+    transaction_id: str | None = None,
+    merchant: str | None = None,
+    notes: str | None = None,
+    amount: str = "20.00",
+    source_type: str = "bank",
+) -> TransactionCategorizationQuery:
+    return TransactionCategorizationQuery(
+        transaction_id=transaction_id,
+        title=title,
+        merchant=merchant,
+        notes=notes,
+        amount=Decimal(amount),
+        amount_bucket=AmountBucketizer().bucket_for_amount(Decimal(amount)),
+        source_type=source_type,
+    )
+
+
+def _engine(**kwargs) -> TfidfTransactionSimilarityEngine:
+    return TfidfTransactionSimilarityEngine(
+        preprocessor=CategorizationTextPreprocessor(),
+        amount_bucketizer=AmountBucketizer(),
+        **kwargs,
+    )
+
+
+DOCUMENTS = [
+    _document("1", "Groceries", "Biedronka Warszawa", amount="45.00"),
+    _document("2", "Fuel", "Orlen stacja", notes="paliwo", amount="250.00"),
+    _document("3", "Restaurants", "BLIK platnosc", merchant="Starbucks"),
+    _document("4", "Groceries", "Lidl Kraków", amount="60.00"),
+    _document("5", "Transport", "Uber trip", amount="30.00"),
+]
+
+
+def test_char_ngrams_pad_text_and_keep_short_values():
+    assert char_ngrams("lidl", 3) == [" li", "lid", "idl", "dl "]
+    assert char_ngrams("a", 3) == [" a "]
+    assert char_ngrams("", 3) == []
+
+
+def test_tfidf_engine_ranks_closest_text_first_and_reports_field():
+    engine = _engine()
+
+    matches = asyncio.run(
+        engine.find_similar(_query("BIEDRONKA WARSZAWA 12", amount="40.00"), DOCUMENTS)
+    )
+    blik = asyncio.run(
+        engine.find_similar(
+            _query("BLIK platnosc", merchant="Starbuks", source_type="blik"),
+            DOCUMENTS,
+        )
+    )
+
+    assert [match.transaction_id for match in matches][:1] == ["1"]
+    assert matches[0].matched_by == "title"
+    assert blik[0].transaction_id == "3"
+    assert blik[0].matched_by == "merchant"
+    assert all(match.similarity_score >= 0.35 for match in matches + blik)
+
+
+def test_tfidf_engine_skips_own_transaction_and_applies_limit():
+    engine = _engine(min_similarity_score=0.0)
+
+    matches = asyncio.run(
+        engine.find_similar(_query("Lidl Kraków", transaction_id="4"), DOCUMENTS)
+    )
+    everything = asyncio.run(engine.find_similar(_query("Lidl Kraków"), DOCUMENTS))
+    limited = asyncio.run(
+        engine.find_similar(_query("Lidl Kraków"), DOCUMENTS, limit=2)
+    )
+
+    assert "4" not in {match.transaction_id for match in matches}
+    assert len(matches) == len(DOCUMENTS) - 1
+    assert everything[0].transaction_id == "4"
+    assert limited == everything[:2]
+
+
+def test_tfidf_engine_scores_match_between_corpus_and_plain_list():
+    engine = _engine(min_similarity_score=0.0)
+    queries = [_query("Orlen", notes="paliwo 95"), _query("Uber trip", amount="35.00")]
+
+    from_list = asyncio.run(engine.find_similar_batch(queries, DOCUMENTS))
+    from_corpus = asyncio.run(
+        engine.find_similar_batch(
+            queries, CategorizationCorpus(DOCUMENTS, revision="r1")
+        )
+    )
+
+    assert from_corpus == from_list
+    assert from_list[0][0].transaction_id == "2"
+    assert from_list[1][0].transaction_id == "5"
+    assert from_list[1][0].similarity_score == pytest.approx(0.75 + 0.15, abs=1e-4)
+
+
+def test_tfidf_engine_vectorizes_once_per_corpus_revision(monkeypatch):
+    engine = _engine()
+    builds = []
+    original = engine._build_vectors
+
+    def counting_build(features):
+        builds.append(len(features))
+        return original(features)
+
+    monkeypatch.setattr(engine, "_build_vectors", counting_build)
+    corpus = CategorizationCorpus(DOCUMENTS, revision="r1")
+
+    asyncio.run(engine.find_similar(_query("Lidl"), corpus))
+    asyncio.run(engine.find_similar(_query("Orlen"), corpus))
+    asyncio.run(
+        engine.find_similar(
+            _query("Uber"), CategorizationCorpus(DOCUMENTS[:2], revision="r2")
+        )
+    )
+    # IDF weights are corpus-wide, so an in-place edit vectorizes again.
+    corpus.remove(DOCUMENTS[0].transaction_id)
+    asyncio.run(engine.find_similar(_query("Lidl"), corpus))
+
+    assert builds == [5, 2, 4]
@@ -0,0 +1,114 @@
+from decimal import Decimal
+
+from services.categorization.amount_bucketizer import AmountBucketizer
+from services.categorization.features import DocumentFeatures, document_features
+from services.categorization.models import TransactionCategorizationQuery
+from services.categorization.preprocessor import CategorizationTextPreprocessor
+from services.categorization.token_index import CategorizationTokenIndex
+from services.domain.category_suggestion import TransactionCategorizationDocument
+
+
+def _document(
+    transaction_id: str,
+    title: str,
+    *,
+    merchant: str | None = None,
+    notes: str | None = None,
+    amount: str = "20.00",
+) -> TransactionCategorizationDocument:
+    return TransactionCategorizationDocument(
+        transaction_id=transaction_id,
+        user_id="user-1",
+        category_id="10",
+        category_name="Food",
+        title=title,
+        merchant=merchant,
+        notes=notes,
+        amount=Decimal(amount),
+        amount_bucket=AmountBucketizer().bucket_for_amount(Decimal(amount)),
+        source_type="bank",
+    )
+
+
+def _query(
+    title: str,
+    *,
+    merchant: str | None = None,
+    notes: str | None = None,
+    amount: str = "20.00",
+) -> DocumentFeatures:
+    query = TransactionCategorizationQuery(
+        transaction_id=None,
+        title=title,
+        merchant=merchant,
+        notes=notes,
+        amount=Decimal(amount),
+        amount_bucket=AmountBucketizer().bucket_for_amount(Decimal(amount)),
+        source_type="bank",
+    )
+    return document_features(PREPROCESSOR, query)
+
+
+def _features(
+    documents: list[TransactionCategorizationDocument],
+) -> list[DocumentFeatures]:
+    return [document_features(PREPROCESSOR, document) for document in documents]
+
+
+PREPROCESSOR = CategorizationTextPreprocessor()
+DOCUMENTS = [
+    _document("1", "Biedronka Warszawa"),
+    _document("2", "Orlen stacja", notes="paliwo"),
+    _document("3", "BLIK platnosc", merchant="Żabka"),
+    _document("4", "Przelew", amount="300.00"),
+    _document("5", "Biedronki Kraków"),
+]
+
+
+def test_candidate_positions_match_token_prefixes_within_the_same_field():
+    index = CategorizationTokenIndex(_features(DOCUMENTS))
+
+    assert index.candidate_positions(_query("BIEDRONKA 123")) == [0, 4]
+    assert index.candidate_positions(_query("x", merchant="zabka")) == [2]
+    assert index.candidate_positions(_query("x", notes="paliwo 95")) == [1]
+    # "orlen" only appears in a title, so a merchant lookup does not find it.
+    query = _query("y", merchant="Orlen")
+    assert index.candidate_positions(query, bucket_fallback=False) == []
+
+
+def test_candidate_positions_fall_back_to_amount_bucket_without_token_hits():
+    index = CategorizationTokenIndex(_features(DOCUMENTS))
+    query = _query("Netflix", amount="280.00")
+
+    assert index.candidate_positions(query) == [3]
+    assert index.candidate_positions(query, bucket_fallback=False) == []
+
+
+def test_candidate_positions_skip_keys_above_max_share():
+    documents = [
+        _document(str(i), f"BLIK platnosc {name}")
+        for i, name in enumerate(["lidl", "lidl", "orlen", "rossmann"])
+    ]
+    index = CategorizationTokenIndex(_features(documents), max_key_share=0.5)
+
+    assert index.candidate_positions(_query("BLIK platnosc lidl")) == [0, 1]
+
+
+def test_add_and_discard_match_a_rebuilt_index():
+    index = CategorizationTokenIndex(_features(DOCUMENTS[:4]))
+    replacement = _document("3", "Orlen paliwo", amount="300.00")
+
+    index.discard(2, _features([DOCUMENTS[2]])[0])
+    index.add(2, _features([replacement])[0])
+    index.add(4, _features([DOCUMENTS[4]])[0])
+    rebuilt = CategorizationTokenIndex(
+        _features([*DOCUMENTS[:2], replacement, DOCUMENTS[3], DOCUMENTS[4]])
+    )
+
+    for query in [
+        _query("BIEDRONKA"),
+        _query("x", merchant="zabka"),
+        _query("orlen"),
+        _query("Netflix", amount="280.00"),
+    ]:
+        assert index.candidate_positions(query) == rebuilt.candidate_positions(query)
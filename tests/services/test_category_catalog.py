@@ -0,0 +1,109 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from services.category_catalog import CategoryCatalog, categories_version
+from services.domain.transaction import Category
+from services.firefly_tx_service import FireflyTxService
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def build_tx_service(*results: list[Category]) -> MagicMock:
+    tx_service = MagicMock(spec=FireflyTxService)
+    tx_service.get_categories = AsyncMock(side_effect=list(results))
+    return tx_service
+
+
+def test_get_categories_reuses_list_until_ttl_expires():
+    food = [Category(id=1, name="Food")]
+    fuel = [Category(id=1, name="Food"), Category(id=2, name="Fuel")]
+    tx_service = build_tx_service(food, fuel)
+    clock = FakeClock()
+    catalog = CategoryCatalog(tx_service, ttl_seconds=60, clock=clock)
+
+    async def run_test() -> None:
+        assert await catalog.get_categories() == food
+        clock.now = 59
+        assert await catalog.get_categories() == food
+        assert tx_service.get_categories.await_count == 1
+
+        clock.now = 60
+        assert await catalog.get_categories() == fuel
+        assert tx_service.get_categories.await_count == 2
+
+    asyncio.run(run_test())
+
+
+def test_concurrent_callers_share_one_firefly_request():
+    categories = [Category(id=1, name="Food")]
+    release = asyncio.Event()
+
+    async def slow_get_categories() -> list[Category]:
+        await release.wait()
+        return categories
+
+    tx_service = MagicMock(spec=FireflyTxService)
+    tx_service.get_categories = AsyncMock(side_effect=slow_get_categories)
+    catalog = CategoryCatalog(tx_service)
+
+    async def run_test() -> None:
+        calls = [
+            asyncio.create_task(catalog.get_categories(force_refresh=i == 0))
+            for i in range(5)
+        ]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*calls)
+
+        assert all(result is categories for result in results)
+        tx_service.get_categories.assert_awaited_once_with()
+
+    asyncio.run(run_test())
+
+
+def test_force_refresh_and_invalidate_reload_from_firefly():
+    first = [Category(id=1, name="Food")]
+    second = [Category(id=1, name="Groceries")]
+    third = [Category(id=1, name="Groceries"), Category(id=3, name="Rent")]
+    tx_service = build_tx_service(first, second, third)
+    catalog = CategoryCatalog(tx_service)
+
+    async def run_test() -> None:
+        assert await catalog.get_categories() == first
+        assert await catalog.get_categories(force_refresh=True) == second
+        catalog.invalidate()
+        assert await catalog.get_categories() == third
+
+    asyncio.run(run_test())
+
+    assert tx_service.get_categories.await_count == 3
+
+
+def test_version_follows_category_content():
+    tx_service = build_tx_service(
+        [Category(id=2, name="Fuel"), Category(id=1, name="Food")],
+        [Category(id=1, name="Food"), Category(id=2, name="Fuel")],
+        [Category(id=1, name="Food"), Category(id=2, name="Car")],
+    )
+    catalog = CategoryCatalog(tx_service, ttl_seconds=0)
+
+    async def load_version() -> str | None:
+        await catalog.get_categories()
+        return catalog.version
+
+    assert catalog.version is None
+    first = asyncio.run(load_version())
+    second = asyncio.run(load_version())
+    renamed = asyncio.run(load_version())
+
+    assert first == second
+    assert renamed != first
+    assert first == categories_version(
+        [Category(id=1, name="Food"), Category(id=2, name="Fuel")]
+    )
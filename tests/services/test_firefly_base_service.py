@@ -255,3 +255,54 @@ def test_fetch_transactions_with_metrics_raises_firefly_service_error():
         ),
     ):
         asyncio.run(service.fetch_transactions_with_metrics())
+
+
+def test_update_transaction_notifies_observers_with_updated_transaction():
+    firefly_client = MagicMock()
+    firefly_client.update_transaction = AsyncMock(
+        return_value=SimpleNamespace(
+            id=7,
+            date=date(2024, 1, 1),
+            amount=Decimal("10.00"),
+            type=SimpleNamespace(value="withdrawal"),
+            description="Updated",
+            tags=["done"],
+            notes=None,
+            category=SimpleNamespace(id=3, name="Food"),
+            currency=SimpleNamespace(code="PLN", symbol="zl", decimals=2),
+            fx=None,
+            source_account=None,
+            destination_account=None,
+        )
+    )
+    failing_observer = MagicMock()
+    failing_observer.on_transaction_updated = AsyncMock(
+        side_effect=RuntimeError("boom")
+    )
+    observer = MagicMock()
+    observer.on_transaction_updated = AsyncMock()
+    service = FireflyBaseService(firefly_client)
+    service.add_update_observer(failing_observer)
+    service.add_update_observer(observer)
+    tx = Transaction(
+        id=7,
+        date=date(2024, 1, 1),
+        amount=Decimal("10.00"),
+        type=TxType.WITHDRAWAL,
+        description="Test",
+        tags=set(),
+        notes=None,
+        category=None,
+        currency=DEFAULT_CURRENCY,
+    )
+
+    asyncio.run(
+        service.update_transaction(tx, payload=TransactionUpdate(description="Updated"))
+    )
+
+    observer.on_transaction_updated.assert_awaited_once()
+    updated = observer.on_transaction_updated.await_args.args[0]
+    assert updated.id == 7
+    assert updated.description == "Updated"
+    assert updated.tags == {"done"}
+    assert updated.category is not None and updated.category.name == "Food"
@@ -11,14 +11,16 @@ from ff_iii_luciferin.domain.models import (
     SimplifiedAccountRef as FfAccountRef,
 )
 from ff_iii_luciferin.domain.models import (
+    SimplifiedCategory,
     SimplifiedTx,
 )
 from ff_iii_luciferin.domain.models import (
     TxType as FfTxType,
 )
 
-from services.domain.transaction import AccountRef, AccountType, TxType
+from services.domain.transaction import AccountRef, AccountType, Category, TxType
 from services.mappers.firefly import tx_from_ff_tx
+from services.mappers.flyweight import FlyweightPool
 
 
 def test_tx_from_ff_tx_maps_account_refs():
@@ -62,3 +64,46 @@ def test_tx_from_ff_tx_maps_account_refs():
         type=AccountType.EXPENSE,
         iban=None,
     )
+
+
+def _ff_tx(tx_id: int, tags: list[str]) -> SimplifiedTx:
+    return SimplifiedTx(
+        id=tx_id,
+        date=date(2024, 1, 1),
+        amount=Decimal("10.00"),
+        type=FfTxType.WITHDRAWAL,
+        description="".join(["Sto", "re"]),
+        tags=tags,
+        notes=None,
+        category=SimplifiedCategory(id=3, name="".join(["Fo", "od"])),
+        currency=FfCurrency(code="PLN", symbol="zl", decimals=2),
+        fx=None,
+        source_account=FfAccountRef(
+            id=11, name="Main account", type=FfAccountType.ASSET, iban="PL123"
+        ),
+    )
+
+
+def test_tx_from_ff_tx_shares_repeated_values():
+    first = tx_from_ff_tx(_ff_tx(1, ["b", "a"]))
+    second = tx_from_ff_tx(_ff_tx(2, ["a", "b"]))
+
+    assert first.currency is second.currency
+    assert first.category is second.category
+    assert first.category == Category(id=3, name="Food")
+    assert first.source_account is second.source_account
+    assert first.tags is second.tags
+    assert first.tags == {"a", "b"}
+    assert first.description is second.description
+
+
+def test_flyweight_pool_keeps_distinct_values_apart():
+    pool = FlyweightPool()
+
+    assert pool.category(1, "Food") is pool.category(1, "Food")
+    assert pool.category(1, "Food") is not pool.category(1, "Groceries")
+    assert pool.account(1, "Main", AccountType.ASSET) is not pool.account(
+        1, "Main", AccountType.ASSET, "PL123"
+    )
+    assert pool.tags([]) is pool.tags(set())
+    assert pool.tags(["a"]) != pool.tags(["a", "b"])
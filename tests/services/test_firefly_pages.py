@@ -0,0 +1,194 @@
+import asyncio
+import inspect
+from importlib.metadata import version
+from types import SimpleNamespace
+from typing import Any
+from unittest.mock import AsyncMock
+
+import pytest
+from ff_iii_luciferin.api import FireflyAPIError, FireflyClient
+
+from services.firefly_base_service import FireflyBaseService, FireflyServiceError
+from services.firefly_pages import (
+    PAGE_ADAPTER_CLIENT_VERSION,
+    fetch_transaction_pages,
+    request_transaction_page,
+)
+
+
+def _split(tx_id: int) -> dict[str, Any]:
+    return {
+        "type": "withdrawal",
+        "date": "2024-01-01T00:00:00+00:00",
+        "amount": "10.00",
+        "description": f"tx {tx_id}",
+        "source_id": "1",
+        "destination_id": "2",
+        "currency_code": "PLN",
+        "currency_symbol": "zl",
+        "currency_decimal_places": 2,
+    }
+
+
+def _tx(tx_id: int, splits: int = 1) -> dict[str, Any]:
+    return {
+        "type": "transactions",
+        "id": str(tx_id),
+        "attributes": {"transactions": [_split(tx_id) for _ in range(splits)]},
+        "links": {"self": f"https://firefly.test/transactions/{tx_id}"},
+    }
+
+
+def _page(
+    txs: list[dict[str, Any]], *, total_pages: int | None, has_next: bool
+) -> dict[str, Any]:
+    pagination = None if total_pages is None else {"total_pages": total_pages}
+    return {
+        "data": txs,
+        "meta": {"pagination": pagination},
+        "links": {"next": "https://firefly.test/next" if has_next else None},
+    }
+
+
+class FakeFireflyClient:
+    def __init__(self, pages: dict[int, dict[str, Any]], delays=None) -> None:
+        self.base_url = "https://firefly.test"
+        self.pages = pages
+        self.delays = delays or {}
+        self.requested: list[int] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def _request(self, method: str, url: str, **kwargs: Any) -> Any:
+        page = kwargs["params"]["page"]
+        self.requested.append(page)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delays.get(page, 0))
+            response = self.pages[page]
+            if isinstance(response, Exception):
+                raise response
+            return response
+        finally:
+            self.in_flight -= 1
+
+
+def test_fetch_transaction_pages_keeps_page_order_and_bounds_concurrency():
+    client = FakeFireflyClient(
+        {
+            1: _page([_tx(1), _tx(2)], total_pages=4, has_next=True),
+            2: _page([_tx(3), _tx(90, splits=2)], total_pages=4, has_next=True),
+            3: _page([_tx(4)], total_pages=4, has_next=True),
+            4: _page([_tx(5)], total_pages=4, has_next=False),
+        },
+        delays={2: 0.03, 3: 0.01},
+    )
+
+    pages = asyncio.run(fetch_transaction_pages(client, max_in_flight=2))
+
+    assert [[tx.id for tx in page.transactions] for page in pages] == [
+        [1, 2],
+        [3],
+        [4],
+        [5],
+    ]
+    assert [page.multipart for page in pages] == [0, 1, 0, 0]
+    assert client.max_in_flight == 2
+
+
+def test_fetch_transaction_pages_respects_max_pages():
+    client = FakeFireflyClient(
+        {
+            1: _page([_tx(1)], total_pages=5, has_next=True),
+            2: _page([_tx(2)], total_pages=5, has_next=True),
+        }
+    )
+
+    pages = asyncio.run(fetch_transaction_pages(client, max_in_flight=4, max_pages=2))
+
+    assert len(pages) == 2
+    assert sorted(client.requested) == [1, 2]
+
+
+def test_fetch_transaction_pages_follows_links_without_pagination_meta():
+    client = FakeFireflyClient(
+        {
+            1: _page([_tx(1)], total_pages=None, has_next=True),
+            2: _page([_tx(2)], total_pages=None, has_next=False),
+        }
+    )
+
+    pages = asyncio.run(fetch_transaction_pages(client, max_in_flight=4))
+
+    assert [[tx.id for tx in page.transactions] for page in pages] == [[1], [2]]
+    assert client.requested == [1, 2]
+
+
+def test_fetch_transactions_with_metrics_uses_concurrent_pages():
+    client = FakeFireflyClient(
+        {
+            1: _page([_tx(1), _tx(90, splits=2)], total_pages=2, has_next=True),
+            2: _page([_tx(2)], total_pages=2, has_next=False),
+        }
+    )
+    service = FireflyBaseService(client, fetch_concurrency=4)
+
+    transactions, metrics = asyncio.run(service.fetch_transactions_with_metrics())
+
+    assert [tx.id for tx in transactions] == [1, 2]
+    assert metrics.total_transactions == 2
+    assert metrics.multipart == 1
+    assert metrics.invalid == 0
+
+
+def test_fetch_transactions_wraps_concurrent_page_errors():
+    client = FakeFireflyClient(
+        {
+            1: _page([_tx(1)], total_pages=3, has_next=True),
+            2: FireflyAPIError("boom", status_code=500),
+            3: _page([_tx(3)], total_pages=3, has_next=False),
+        }
+    )
+    service = FireflyBaseService(client, fetch_concurrency=2)
+
+    with pytest.raises(FireflyServiceError) as exc_info:
+        asyncio.run(service.fetch_transactions())
+
+    assert exc_info.value.status_code == 500
+
+
+def test_fetch_transactions_keeps_sequential_client_by_default():
+    firefly_client = SimpleNamespace(fetch_transactions=AsyncMock(return_value=[]))
+    service = FireflyBaseService(firefly_client)
+
+    assert asyncio.run(service.fetch_transactions()) == []
+    firefly_client.fetch_transactions.assert_awaited_once()
+
+
+def test_page_adapter_is_pinned_to_the_installed_client():
+    # request_transaction_page calls FireflyClient._request; re-check it
+    # before bumping ff-iii-luciferin.
+    assert version("ff-iii-luciferin") == PAGE_ADAPTER_CLIENT_VERSION
+    assert list(inspect.signature(FireflyClient._request).parameters) == [
+        "self",
+        "method",
+        "url",
+        "kwargs",
+    ]
+
+
+def test_request_transaction_page_gets_the_transactions_endpoint():
+    client = SimpleNamespace(
+        base_url="https://firefly.test",
+        _request=AsyncMock(return_value=_page([_tx(1)], total_pages=1, has_next=False)),
+    )
+
+    page = asyncio.run(request_transaction_page(client, {"limit": 10, "page": 2}))
+
+    assert [tx.id for tx in page.data] == ["1"]
+    client._request.assert_awaited_once_with(
+        "get",
+        "https://firefly.test/api/v1/transactions",
+        params={"limit": 10, "page": 2},
+    )
@@ -7,7 +7,13 @@ from unittest.mock import AsyncMock, MagicMock
 import pytest
 from ff_iii_luciferin.api import FireflyAPIError
 
-from services.domain.transaction import Currency, Transaction, TxTag, TxType
+from services.domain.transaction import (
+    Category,
+    Currency,
+    Transaction,
+    TxTag,
+    TxType,
+)
 from services.firefly_base_service import FireflyServiceError
 from services.firefly_tx_service import FireflyTxService
 
@@ -221,6 +227,59 @@ def test_add_tag_mutates_transaction_and_updates_tags():
     assert set(payload.tags or []) == {"existing", "new-tag"}
 
 
+def test_apply_changes_sends_category_and_tags_in_one_update():
+    service = FireflyTxService(
+        MagicMock(), filter_desc_blik="blik", filter_desc_allegro="allegro"
+    )
+    tx = Transaction(
+        id=9,
+        date=date(2024, 1, 5),
+        amount=Decimal("10.00"),
+        type=TxType.WITHDRAWAL,
+        description="test",
+        tags=frozenset({"existing"}),
+        notes=None,
+        category=None,
+        currency=DEFAULT_CURRENCY,
+    )
+    service.update_transaction = AsyncMock()
+
+    changed = asyncio.run(
+        service.apply_changes(tx, category_id=33, tags=frozenset({"new-tag"}))
+    )
+
+    assert changed is True
+    payload = service.update_transaction.await_args.args[1]
+    assert payload.category_id == 33
+    assert payload.tags == ["existing", "new-tag"]
+    assert tx.tags == frozenset({"existing"})
+
+
+def test_apply_changes_skips_update_when_nothing_changes():
+    service = FireflyTxService(
+        MagicMock(), filter_desc_blik="blik", filter_desc_allegro="allegro"
+    )
+    tx = Transaction(
+        id=9,
+        date=date(2024, 1, 5),
+        amount=Decimal("10.00"),
+        type=TxType.WITHDRAWAL,
+        description="test",
+        tags=frozenset({"blik_done"}),
+        notes=None,
+        category=Category(id=33, name="Food"),
+        currency=DEFAULT_CURRENCY,
+    )
+    service.update_transaction = AsyncMock()
+
+    changed = asyncio.run(
+        service.apply_changes(tx, category_id=33, tags=frozenset({"blik_done"}))
+    )
+
+    assert changed is False
+    service.update_transaction.assert_not_awaited()
+
+
 def test_apply_category_by_id_delegates_to_helpers():
     service = FireflyTxService(
         MagicMock(), filter_desc_blik="blik", filter_desc_allegro="allegro"
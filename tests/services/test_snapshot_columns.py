@@ -0,0 +1,115 @@
+import asyncio
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+from services.domain.metrics import FetchMetrics
+from services.domain.transaction import Category, Currency, Transaction, TxType
+from services.snapshot.columns import SnapshotColumns
+from services.snapshot.models import TransactionSnapshot
+from services.tx_stats.helpers import group_tx_by_month
+
+DEFAULT_CURRENCY = Currency(code="PLN", symbol="zl", decimals=2)
+
+
+def _transaction(
+    tx_id: int,
+    tx_date: date,
+    description: str,
+    *,
+    tags: frozenset[str] = frozenset(),
+    categorized: bool = False,
+) -> Transaction:
+    return Transaction(
+        id=tx_id,
+        date=tx_date,
+        amount=Decimal("10.00"),
+        type=TxType.WITHDRAWAL,
+        description=description,
+        tags=tags,
+        notes=None,
+        category=Category(id=1, name="Food") if categorized else None,
+        currency=DEFAULT_CURRENCY,
+    )
+
+
+def build_transactions() -> list[Transaction]:
+    return [
+        _transaction(1, date(2023, 12, 31), "BLIK payment"),
+        _transaction(2, date(2024, 1, 5), "blik PAYMENT"),
+        _transaction(
+            3, date(2024, 1, 20), "BLIK payment ref 7", tags=frozenset({"blik_done"})
+        ),
+        _transaction(4, date(2024, 3, 1), "Allegro order", categorized=True),
+        _transaction(5, date(2024, 3, 2), "allegro x", tags=frozenset({"action_req"})),
+    ]
+
+
+def test_snapshot_columns_builds_case_insensitive_masks():
+    columns = SnapshotColumns(build_transactions())
+
+    assert columns.description_is("BLIK payment").tolist() == [
+        True,
+        True,
+        False,
+        False,
+        False,
+    ]
+    assert columns.description_contains("blik").tolist() == [
+        True,
+        True,
+        True,
+        False,
+        False,
+    ]
+    assert columns.description_contains("ALLEGRO").tolist() == [
+        False,
+        False,
+        False,
+        True,
+        True,
+    ]
+    assert columns.categorized.tolist() == [False, False, False, True, False]
+    assert columns.blik_done.tolist() == [False, False, True, False, False]
+    assert columns.action_req.tolist() == [False, False, False, False, True]
+    assert columns.description_is("blik payment") is columns.description_is(
+        "BLIK payment"
+    )
+
+
+def test_count_by_month_matches_pandas_grouping():
+    transactions = build_transactions()
+    columns = SnapshotColumns(transactions)
+    mask = ~columns.categorized
+
+    expected = asyncio.run(
+        group_tx_by_month([tx for tx in transactions if tx.category is None])
+    )
+
+    assert columns.count_by_month(mask) == expected
+    assert columns.count_by_month(mask) == {
+        "2023-12": 1,
+        "2024-01": 2,
+        "2024-03": 1,
+    }
+    assert columns.count_by_month(columns.categorized & columns.blik_done) == {}
+
+
+def test_snapshot_rebuilds_columns_after_patch():
+    transactions = build_transactions()
+    snapshot = TransactionSnapshot(
+        transactions=transactions,
+        metrics=FetchMetrics(
+            total_transactions=5, fetching_duration_ms=1, invalid=0, multipart=0
+        ),
+        fetched_at=datetime.now(UTC),
+    )
+    before = snapshot.columns
+
+    assert snapshot.columns is before
+
+    snapshot.replace_transaction(
+        _transaction(1, date(2023, 12, 31), "BLIK payment", categorized=True)
+    )
+
+    assert snapshot.columns is not before
+    assert snapshot.columns.categorized.tolist()[0] is True
@@ -0,0 +1,122 @@
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+from services.domain.metrics import FetchMetrics
+from services.domain.transaction import Category, Currency, Transaction, TxTag, TxType
+from services.snapshot.models import TransactionSnapshot
+from services.snapshot.query import TransactionSnapshotQuery
+
+DEFAULT_CURRENCY = Currency(code="PLN", symbol="zl", decimals=2)
+
+
+def _tx(
+    tx_id: int,
+    *,
+    tx_date: date,
+    description: str,
+    tags: set[str] | None = None,
+    category: Category | None = None,
+) -> Transaction:
+    return Transaction(
+        id=tx_id,
+        date=tx_date,
+        amount=Decimal("10.00"),
+        type=TxType.WITHDRAWAL,
+        description=description,
+        tags=tags or set(),
+        notes=None,
+        category=category,
+        currency=DEFAULT_CURRENCY,
+    )
+
+
+def _transactions() -> list[Transaction]:
+    return [
+        _tx(1, tx_date=date(2024, 3, 1), description="BLIK", tags={TxTag.blik_done}),
+        _tx(2, tx_date=date(2024, 1, 15), description="Allegro order"),
+        _tx(
+            3,
+            tx_date=date(2024, 2, 1),
+            description="blik",
+            category=Category(id=1, name="Food"),
+        ),
+        _tx(4, tx_date=date(2024, 2, 29), description="allegro.pl", tags={"x"}),
+        _tx(5, tx_date=date(2024, 1, 1), description="other"),
+    ]
+
+
+def test_snapshot_query_looks_up_by_id_tag_and_category():
+    query = TransactionSnapshotQuery(_transactions())
+
+    assert query.get(4).description == "allegro.pl"
+    assert query.get(404) is None
+    assert [tx.id for tx in query.with_tag(TxTag.blik_done)] == [1]
+    assert query.with_tag("missing") == ()
+    assert [tx.id for tx in query.categorized] == [3]
+    assert [tx.id for tx in query.uncategorized] == [1, 2, 4, 5]
+
+
+def test_snapshot_query_matches_descriptions_case_insensitively():
+    query = TransactionSnapshotQuery(_transactions())
+
+    assert sorted(tx.id for tx in query.with_description("Blik")) == [1, 3]
+    assert sorted(tx.id for tx in query.description_contains("ALLEGRO")) == [2, 4]
+    assert query.description_contains("allegro") is query.description_contains(
+        "Allegro"
+    )
+
+
+def test_snapshot_query_returns_inclusive_date_ranges_in_date_order():
+    query = TransactionSnapshotQuery(_transactions())
+
+    assert [tx.id for tx in query.between(date(2024, 1, 15), date(2024, 2, 29))] == [
+        2,
+        3,
+        4,
+    ]
+    assert [tx.id for tx in query.between(start_date=date(2024, 2, 2))] == [4, 1]
+    assert [tx.id for tx in query.between(end_date=date(2024, 1, 1))] == [5]
+    assert query.between(date(2025, 1, 1), date(2025, 1, 31)) == ()
+
+
+def test_transaction_snapshot_builds_query_once():
+    snapshot = TransactionSnapshot(
+        transactions=_transactions(),
+        metrics=FetchMetrics(
+            total_transactions=5, fetching_duration_ms=1, invalid=0, multipart=0
+        ),
+        fetched_at=datetime.now(UTC),
+    )
+
+    assert snapshot.query is snapshot.query
+    assert snapshot.query.get(1) is snapshot.transactions[0]
+
+
+def test_transaction_snapshot_does_not_cache_query_that_raced_with_a_patch(
+    monkeypatch,
+):
+    snapshot = TransactionSnapshot(
+        transactions=_transactions(),
+        metrics=FetchMetrics(
+            total_transactions=5, fetching_duration_ms=1, invalid=0, multipart=0
+        ),
+        fetched_at=datetime.now(UTC),
+    )
+    patched = _tx(2, tx_date=date(2024, 1, 15), description="Allegro refund")
+
+    class _PatchedWhileBuilding(TransactionSnapshotQuery):
+        def __init__(self, transactions):
+            super().__init__(transactions)
+            # A write-through patch landing while a worker thread builds.
+            snapshot.replace_transaction(patched)
+
+    monkeypatch.setattr(
+        "services.snapshot.models.TransactionSnapshotQuery", _PatchedWhileBuilding
+    )
+    raced = snapshot.query
+    monkeypatch.setattr(
+        "services.snapshot.models.TransactionSnapshotQuery", TransactionSnapshotQuery
+    )
+
+    assert raced.get(2) is not patched
+    assert snapshot.query.get(2) is patched
@@ -0,0 +1,92 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi.testclient import TestClient
+
+from main import create_app
+from services.firefly_base_service import FireflyServiceError
+from services.snapshot.scheduler import SnapshotRefreshScheduler
+
+
+def build_service(*, in_progress: bool = False) -> MagicMock:
+    service = MagicMock()
+    service.refresh_in_progress = in_progress
+    service.refresh_snapshot = AsyncMock()
+    return service
+
+
+def test_run_once_requests_delta_capable_refresh():
+    service = build_service()
+    scheduler = SnapshotRefreshScheduler(service, 60)
+
+    assert asyncio.run(scheduler.run_once()) is True
+
+    service.refresh_snapshot.assert_awaited_once_with(full=False)
+
+
+def test_run_once_skips_tick_while_refresh_is_in_flight():
+    service = build_service(in_progress=True)
+    scheduler = SnapshotRefreshScheduler(service, 60)
+
+    assert asyncio.run(scheduler.run_once()) is False
+
+    service.refresh_snapshot.assert_not_awaited()
+
+
+def test_next_delay_backs_off_after_failures_and_resets_on_success():
+    service = build_service()
+    service.refresh_snapshot = AsyncMock(
+        side_effect=[
+            FireflyServiceError("down", status_code=503),
+            FireflyServiceError("down", status_code=503),
+            FireflyServiceError("down", status_code=503),
+            None,
+        ]
+    )
+    scheduler = SnapshotRefreshScheduler(
+        service,
+        60,
+        jitter_seconds=10,
+        max_backoff_seconds=200,
+        random_fn=lambda: 0.5,
+    )
+
+    assert scheduler.next_delay() == 65
+
+    delays = []
+    for _ in range(4):
+        asyncio.run(scheduler.run_once())
+        delays.append(scheduler.next_delay())
+
+    assert delays == [125, 205, 205, 65]
+
+
+def test_stop_cancels_running_refresh_loop():
+    async def run_test() -> None:
+        service = build_service()
+        release = asyncio.Event()
+        service.refresh_snapshot = AsyncMock(side_effect=release.wait)
+        scheduler = SnapshotRefreshScheduler(service, 60)
+
+        scheduler.start()
+        await asyncio.sleep(0)
+        assert scheduler.running
+
+        await scheduler.stop()
+
+        assert not scheduler.running
+        service.refresh_snapshot.assert_awaited_once()
+
+    asyncio.run(run_test())
+
+
+def test_create_app_lifespan_starts_and_stops_scheduler():
+    scheduler = MagicMock()
+    scheduler.stop = AsyncMock()
+    app = create_app(snapshot_scheduler=scheduler)
+
+    with TestClient(app):
+        scheduler.start.assert_called_once_with()
+        scheduler.stop.assert_not_awaited()
+
+    scheduler.stop.assert_awaited_once_with()
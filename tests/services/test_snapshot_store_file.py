@@ -0,0 +1,169 @@
+import asyncio
+import pickle
+import struct
+import zlib
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from services.domain.metrics import FetchMetrics
+from services.domain.transaction import (
+    AccountRef,
+    AccountType,
+    Category,
+    Currency,
+    FXContext,
+    Transaction,
+    TxType,
+)
+from services.snapshot.codec import (
+    MAGIC,
+    SnapshotFormatError,
+    SnapshotSchemaMismatch,
+    decode_snapshot,
+    encode_snapshot,
+)
+from services.snapshot.models import TransactionSnapshot
+from services.snapshot.store import FileSnapshotStore
+
+PLN = Currency(code="PLN", symbol="zł", decimals=2)
+EUR = Currency(code="EUR", symbol="€", decimals=2)
+
+
+def build_snapshot(
+    *, fetched_at: datetime | None = None, schema_version: int = 1
+) -> TransactionSnapshot:
+    fetched_at = fetched_at or datetime.now(UTC)
+    account = AccountRef(id=1, name="Main", type=AccountType.ASSET, iban="PL61")
+    return TransactionSnapshot(
+        transactions=[
+            Transaction(
+                id=10,
+                date=date(2024, 1, 5),
+                amount=Decimal("-12.34"),
+                type=TxType.WITHDRAWAL,
+                description="Żabka",
+                tags={"blik_done", "action_req"},
+                notes="zakupy",
+                category=Category(id=3, name="Food"),
+                currency=PLN,
+                fx=FXContext(original_currency=EUR, original_amount=Decimal("2.90")),
+                source_account=account,
+                destination_account=AccountRef(
+                    id=7, name="Żabka", type=AccountType.EXPENSE
+                ),
+            ),
+            Transaction(
+                id=11,
+                date=date(2024, 1, 6),
+                amount=Decimal("100.00"),
+                type=TxType.DEPOSIT,
+                description="Salary",
+                tags=set(),
+                notes=None,
+                category=None,
+                currency=PLN,
+                destination_account=account,
+            ),
+        ],
+        metrics=FetchMetrics(
+            total_transactions=2,
+            fetching_duration_ms=120,
+            invalid=1,
+            multipart=3,
+        ),
+        fetched_at=fetched_at,
+        schema_version=schema_version,
+        reconciled_at=fetched_at - timedelta(minutes=5),
+    )
+
+
+def test_encode_decode_snapshot_roundtrip():
+    snapshot = build_snapshot()
+
+    decoded = decode_snapshot(encode_snapshot(snapshot))
+
+    assert decoded == snapshot
+    assert decoded.transactions[0].source_account is (
+        decoded.transactions[1].destination_account
+    )
+
+
+def test_decode_snapshot_rejects_other_schema_version():
+    data = encode_snapshot(build_snapshot(schema_version=99))
+
+    with pytest.raises(SnapshotSchemaMismatch) as exc_info:
+        decode_snapshot(data)
+
+    assert exc_info.value.schema_version == 99
+
+
+def test_decode_snapshot_rejects_garbage_and_foreign_globals():
+    with pytest.raises(SnapshotFormatError):
+        decode_snapshot(b"not a snapshot")
+
+    header = MAGIC + struct.pack(">HH", 1, 1)
+    with pytest.raises(SnapshotFormatError):
+        decode_snapshot(header + b"corrupted")
+
+    evil = zlib.compress(pickle.dumps(Decimal("1")))
+    with pytest.raises(SnapshotFormatError, match="Forbidden global"):
+        decode_snapshot(header + evil)
+
+
+def test_file_snapshot_store_persists_across_instances(tmp_path):
+    path = tmp_path / "nested" / "snapshot.bin"
+    snapshot = build_snapshot()
+
+    asyncio.run(FileSnapshotStore(path).set_snapshot(snapshot))
+    restored_store = FileSnapshotStore(path)
+
+    assert path.exists()
+    assert asyncio.run(restored_store.is_stale(300)) is False
+    assert asyncio.run(restored_store.get_snapshot()) == snapshot
+
+
+def test_file_snapshot_store_returns_none_when_file_is_missing(tmp_path):
+    store = FileSnapshotStore(tmp_path / "missing.bin")
+
+    assert asyncio.run(store.get_snapshot()) is None
+    assert asyncio.run(store.is_stale(300)) is True
+
+
+def test_file_snapshot_store_discards_incompatible_file(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    path.write_bytes(encode_snapshot(build_snapshot(schema_version=0)))
+    store = FileSnapshotStore(path)
+
+    assert asyncio.run(store.get_snapshot()) is None
+    assert not path.exists()
+
+
+def test_file_snapshot_store_invalidate_removes_file(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    store = FileSnapshotStore(path)
+    asyncio.run(store.set_snapshot(build_snapshot()))
+
+    asyncio.run(store.invalidate())
+
+    assert asyncio.run(store.get_snapshot()) is None
+    assert not path.exists()
+    assert asyncio.run(FileSnapshotStore(path).get_snapshot()) is None
+
+
+def test_file_snapshot_store_concurrent_writes_use_separate_temp_files(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    store = FileSnapshotStore(path)
+    snapshots = [build_snapshot() for _ in range(8)]
+    for revision, snapshot in enumerate(snapshots):
+        snapshot.revision = revision
+
+    async def scenario():
+        await asyncio.gather(*(store.set_snapshot(s) for s in snapshots))
+
+    asyncio.run(scenario())
+    restored = asyncio.run(FileSnapshotStore(path).get_snapshot())
+
+    assert restored is not None
+    assert [p.name for p in tmp_path.iterdir()] == ["snapshot.bin"]
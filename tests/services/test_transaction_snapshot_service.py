@@ -6,8 +6,8 @@ from unittest.mock import AsyncMock, MagicMock
 from services.domain.metrics import FetchMetrics
 from services.domain.transaction import Currency, Transaction, TxType
 from services.snapshot.models import TransactionSnapshot
-from services.snapshot.service import TransactionSnapshotService
-from services.snapshot.store import InMemorySnapshotStore
+from services.snapshot.service import TransactionSnapshotService, splice_transactions
+from services.snapshot.store import FileSnapshotStore, InMemorySnapshotStore
 
 DEFAULT_CURRENCY = Currency(code="PLN", symbol="zl", decimals=2)
 
@@ -217,3 +217,516 @@ def test_get_cached_snapshot_timestamp_returns_none_for_stale_snapshot():
         assert await service.get_cached_snapshot_timestamp() is None
 
     asyncio.run(run_test())
+
+
+def test_get_fresh_snapshot_ignores_stale_snapshot_without_fetching():
+    async def run_test() -> None:
+        store = InMemorySnapshotStore()
+        firefly_service = MagicMock()
+        firefly_service.fetch_transactions_with_metrics = AsyncMock()
+        service = TransactionSnapshotService(
+            store=store,
+            firefly_service=firefly_service,
+            max_age_seconds=300,
+            stale_while_revalidate_seconds=600,
+        )
+        assert await service.get_fresh_snapshot() is None
+
+        fresh = TransactionSnapshot(
+            transactions=[build_transaction()],
+            metrics=build_metrics(),
+            fetched_at=datetime.now(UTC),
+        )
+        await store.set_snapshot(fresh)
+        assert await service.get_fresh_snapshot() is fresh
+
+        fresh.fetched_at = datetime.now(UTC) - timedelta(seconds=301)
+        assert await service.get_fresh_snapshot() is None
+        firefly_service.fetch_transactions_with_metrics.assert_not_awaited()
+
+    asyncio.run(run_test())
+
+
+def _transaction(tx_id: int, tx_date: date, description: str = "Test") -> Transaction:
+    return Transaction(
+        id=tx_id,
+        date=tx_date,
+        amount=Decimal("12.34"),
+        type=TxType.WITHDRAWAL,
+        description=description,
+        tags=set(),
+        notes=None,
+        category=None,
+        currency=DEFAULT_CURRENCY,
+    )
+
+
+def test_get_snapshot_applies_delta_refresh_when_recently_reconciled():
+    store = InMemorySnapshotStore()
+    fetched_at = datetime.now(UTC) - timedelta(seconds=301)
+    old_tx = _transaction(1, (fetched_at - timedelta(days=30)).date())
+    edited_tx = _transaction(2, fetched_at.date(), description="before")
+    deleted_tx = _transaction(3, fetched_at.date())
+    previous = TransactionSnapshot(
+        transactions=[edited_tx, deleted_tx, old_tx],
+        metrics=FetchMetrics(
+            total_transactions=3, fetching_duration_ms=900, invalid=2, multipart=1
+        ),
+        fetched_at=fetched_at,
+        reconciled_at=fetched_at,
+    )
+    updated_tx = _transaction(2, fetched_at.date(), description="after")
+    new_tx = _transaction(4, datetime.now(UTC).date())
+    firefly_service = MagicMock()
+    firefly_service.fetch_transactions_with_metrics = AsyncMock(
+        return_value=(
+            [new_tx, updated_tx],
+            FetchMetrics(
+                total_transactions=2, fetching_duration_ms=40, invalid=0, multipart=0
+            ),
+        )
+    )
+    service = TransactionSnapshotService(
+        store=store,
+        firefly_service=firefly_service,
+        max_age_seconds=300,
+        delta_refresh_enabled=True,
+        delta_overlap_days=7,
+    )
+
+    asyncio.run(store.set_snapshot(previous))
+    result = asyncio.run(service.get_snapshot())
+
+    firefly_service.fetch_transactions_with_metrics.assert_awaited_once_with(
+        start_date=(fetched_at - timedelta(days=7)).date()
+    )
+    assert [tx.id for tx in result.transactions] == [4, 2, 1]
+    assert result.transactions[1].description == "after"
+    assert result.metrics.total_transactions == 3
+    assert result.metrics.fetching_duration_ms == 40
+    assert result.metrics.invalid == 2
+    assert result.metrics.multipart == 1
+    assert result.reconciled_at == fetched_at
+    assert result.fetched_at > fetched_at
+
+
+def test_get_snapshot_runs_full_reconcile_when_last_one_is_too_old():
+    store = InMemorySnapshotStore()
+    fetched_at = datetime.now(UTC) - timedelta(seconds=301)
+    previous = TransactionSnapshot(
+        transactions=[build_transaction()],
+        metrics=build_metrics(),
+        fetched_at=fetched_at,
+        reconciled_at=fetched_at - timedelta(hours=2),
+    )
+    firefly_service = MagicMock()
+    firefly_service.fetch_transactions_with_metrics = AsyncMock(
+        return_value=([], build_metrics())
+    )
+    service = TransactionSnapshotService(
+        store=store,
+        firefly_service=firefly_service,
+        max_age_seconds=300,
+        delta_refresh_enabled=True,
+        full_reconcile_seconds=3600,
+    )
+
+    asyncio.run(store.set_snapshot(previous))
+    result = asyncio.run(service.get_snapshot())
+
+    firefly_service.fetch_transactions_with_metrics.assert_awaited_once_with()
+    assert result.transactions == []
+    assert result.reconciled_at == result.fetched_at
+
+
+def test_refresh_snapshot_always_runs_full_fetch_with_delta_enabled():
+    store = InMemorySnapshotStore()
+    fetched_at = datetime.now(UTC)
+    previous = TransactionSnapshot(
+        transactions=[build_transaction()],
+        metrics=build_metrics(),
+        fetched_at=fetched_at,
+        reconciled_at=fetched_at,
+    )
+    firefly_service = MagicMock()
+    firefly_service.fetch_transactions_with_metrics = AsyncMock(
+        return_value=([], build_metrics())
+    )
+    service = TransactionSnapshotService(
+        store=store,
+        firefly_service=firefly_service,
+        delta_refresh_enabled=True,
+    )
+
+    asyncio.run(store.set_snapshot(previous))
+    asyncio.run(service.refresh_snapshot())
+
+    firefly_service.fetch_transactions_with_metrics.assert_awaited_once_with()
+
+
+def test_refresh_snapshot_allows_delta_when_not_full():
+    store = InMemorySnapshotStore()
+    fetched_at = datetime.now(UTC)
+    previous = TransactionSnapshot(
+        transactions=[build_transaction()],
+        metrics=build_metrics(),
+        fetched_at=fetched_at,
+        reconciled_at=fetched_at,
+    )
+    firefly_service = MagicMock()
+    firefly_service.fetch_transactions_with_metrics = AsyncMock(
+        return_value=([], build_metrics())
+    )
+    service = TransactionSnapshotService(
+        store=store,
+        firefly_service=firefly_service,
+        delta_refresh_enabled=True,
+        delta_overlap_days=7,
+    )
+
+    asyncio.run(store.set_snapshot(previous))
+    asyncio.run(service.refresh_snapshot(full=False))
+
+    firefly_service.fetch_transactions_with_metrics.assert_awaited_once_with(
+        start_date=(fetched_at - timedelta(days=7)).date()
+    )
+
+
+def test_splice_transactions_replaces_window_and_keeps_surroundings():
+    newer = _transaction(1, date(2024, 3, 10))
+    inside = _transaction(2, date(2024, 2, 10))
+    moved = _transaction(3, date(2024, 1, 10))
+    older = _transaction(4, date(2024, 1, 5))
+    fresh = [_transaction(3, date(2024, 2, 1)), _transaction(5, date(2024, 2, 2))]
+
+    result = splice_transactions(
+        [newer, inside, moved, older],
+        fresh,
+        start_date=date(2024, 2, 1),
+        end_date=date(2024, 2, 29),
+    )
+
+    assert [tx.id for tx in result] == [1, 3, 5, 4]
+
+
+def test_get_snapshot_serves_stale_snapshot_and_refreshes_in_background():
+    async def run_test() -> None:
+        store = InMemorySnapshotStore()
+        stale_snapshot = TransactionSnapshot(
+            transactions=[build_transaction()],
+            metrics=build_metrics(),
+            fetched_at=datetime.now(UTC) - timedelta(seconds=301),
+        )
+        refreshed_tx = build_transaction()
+        release_fetch = asyncio.Event()
+        firefly_service = MagicMock()
+
+        async def fetch_transactions_with_metrics() -> tuple[
+            list[Transaction], FetchMetrics
+        ]:
+            await release_fetch.wait()
+            return [refreshed_tx], build_metrics()
+
+        firefly_service.fetch_transactions_with_metrics = AsyncMock(
+            side_effect=fetch_transactions_with_metrics
+        )
+        service = TransactionSnapshotService(
+            store=store,
+            firefly_service=firefly_service,
+            max_age_seconds=300,
+            stale_while_revalidate_seconds=600,
+        )
+        await store.set_snapshot(stale_snapshot)
+
+        first, second = await asyncio.gather(
+            service.get_snapshot(), service.get_snapshot()
+        )
+
+        assert first is stale_snapshot
+        assert second is stale_snapshot
+        assert service._refresh_task is not None
+        assert (
+            await service.get_cached_snapshot_timestamp() == stale_snapshot.fetched_at
+        )
+
+        release_fetch.set()
+        refreshed = await service._refresh_task
+
+        assert await store.get_snapshot() is refreshed
+        assert refreshed.transactions == [refreshed_tx]
+        firefly_service.fetch_transactions_with_metrics.assert_awaited_once()
+
+    asyncio.run(run_test())
+
+
+def test_get_snapshot_blocks_when_snapshot_exceeds_max_staleness():
+    store = InMemorySnapshotStore()
+    too_old = TransactionSnapshot(
+        transactions=[build_transaction()],
+        metrics=build_metrics(),
+        fetched_at=datetime.now(UTC) - timedelta(seconds=1000),
+    )
+    refreshed_tx = build_transaction()
+    firefly_service = MagicMock()
+    firefly_service.fetch_transactions_with_metrics = AsyncMock(
+        return_value=([refreshed_tx], build_metrics())
+    )
+    service = TransactionSnapshotService(
+        store=store,
+        firefly_service=firefly_service,
+        max_age_seconds=300,
+        stale_while_revalidate_seconds=600,
+    )
+
+    asyncio.run(store.set_snapshot(too_old))
+    result = asyncio.run(service.get_snapshot())
+
+    assert result is not too_old
+    assert result.transactions == [refreshed_tx]
+    firefly_service.fetch_transactions_with_metrics.assert_awaited_once()
+
+
+def test_on_transaction_updated_patches_cached_snapshot():
+    store = InMemorySnapshotStore()
+    fetched_at = datetime.now(UTC) - timedelta(seconds=10)
+    snapshot = TransactionSnapshot(
+        transactions=[
+            _transaction(1, date(2024, 1, 1)),
+            _transaction(2, date(2024, 1, 2)),
+        ],
+        metrics=build_metrics(),
+        fetched_at=fetched_at,
+    )
+    assert snapshot.query.get(2).description == "Test"
+    service = TransactionSnapshotService(
+        store=store,
+        firefly_service=MagicMock(),
+        max_age_seconds=300,
+    )
+    updated = _transaction(2, date(2024, 1, 2), description="Updated")
+
+    asyncio.run(store.set_snapshot(snapshot))
+    asyncio.run(service.on_transaction_updated(updated))
+    timestamp = asyncio.run(service.get_cached_snapshot_timestamp())
+
+    assert snapshot.transactions[1] is updated
+    assert snapshot.query.get(2) is updated
+    assert snapshot.revision == 1
+    assert snapshot.patched_at is not None
+    assert timestamp == snapshot.patched_at
+    assert timestamp > fetched_at
+
+
+def test_on_transaction_updated_persists_patches_to_file_store_in_one_write(
+    tmp_path,
+):
+    path = tmp_path / "snapshot.bin"
+    snapshot = TransactionSnapshot(
+        transactions=[_transaction(tx_id, date(2024, 1, 1)) for tx_id in range(8)],
+        metrics=build_metrics(),
+        fetched_at=datetime.now(UTC),
+    )
+    store = FileSnapshotStore(path, patch_write_delay_seconds=0.01)
+    service = TransactionSnapshotService(store=store, firefly_service=MagicMock())
+    written: list[int] = []
+    write_locked = store._write_locked
+
+    def counting_write(snapshot: TransactionSnapshot) -> None:
+        written.append(snapshot.revision)
+        write_locked(snapshot)
+
+    store._write_locked = counting_write
+
+    async def scenario():
+        await store.set_snapshot(snapshot)
+        await asyncio.gather(
+            *(
+                service.on_transaction_updated(
+                    _transaction(tx_id, date(2024, 1, 1), description="Updated")
+                )
+                for tx_id in range(8)
+            )
+        )
+        assert store._patch_write is not None
+        await store._patch_write
+
+    asyncio.run(scenario())
+    restarted = asyncio.run(FileSnapshotStore(path).get_snapshot())
+
+    assert written == [0, 8]
+    assert restarted is not None
+    assert restarted.revision == 8
+    assert {tx.description for tx in restarted.transactions} == {"Updated"}
+    assert [p.name for p in tmp_path.iterdir()] == ["snapshot.bin"]
+
+
+def test_file_store_flush_writes_pending_patch(tmp_path):
+    path = tmp_path / "snapshot.bin"
+    snapshot = TransactionSnapshot(
+        transactions=[_transaction(1, date(2024, 1, 1))],
+        metrics=build_metrics(),
+        fetched_at=datetime.now(UTC),
+    )
+    store = FileSnapshotStore(path, patch_write_delay_seconds=3600)
+    service = TransactionSnapshotService(store=store, firefly_service=MagicMock())
+
+    async def scenario():
+        await store.set_snapshot(snapshot)
+        await service.on_transaction_updated(
+            _transaction(1, date(2024, 1, 1), description="Updated")
+        )
+        before_flush = await FileSnapshotStore(path).get_snapshot()
+        await store.flush()
+        return before_flush
+
+    before_flush = asyncio.run(scenario())
+    restarted = asyncio.run(FileSnapshotStore(path).get_snapshot())
+
+    assert before_flush is not None and before_flush.revision == 0
+    assert restarted is not None
+    assert restarted.revision == 1
+    assert [tx.description for tx in restarted.transactions] == ["Updated"]
+
+
+def test_on_transaction_updated_ignores_unknown_transaction():
+    store = InMemorySnapshotStore()
+    snapshot = TransactionSnapshot(
+        transactions=[_transaction(1, date(2024, 1, 1))],
+        metrics=build_metrics(),
+        fetched_at=datetime.now(UTC),
+    )
+    service = TransactionSnapshotService(store=store, firefly_service=MagicMock())
+
+    asyncio.run(store.set_snapshot(snapshot))
+    asyncio.run(service.on_transaction_updated(_transaction(9, date(2024, 1, 1))))
+
+    assert snapshot.revision == 0
+    assert snapshot.patched_at is None
+    assert [tx.id for tx in snapshot.transactions] == [1]
+
+
+def test_refresh_snapshot_replays_updates_made_during_fetch():
+    async def run_test() -> None:
+        store = InMemorySnapshotStore()
+        previous = TransactionSnapshot(
+            transactions=[_transaction(1, date(2024, 1, 1))],
+            metrics=build_metrics(),
+            fetched_at=datetime.now(UTC),
+            revision=4,
+        )
+        await store.set_snapshot(previous)
+        fetch_started = asyncio.Event()
+        release_fetch = asyncio.Event()
+        firefly_service = MagicMock()
+
+        async def fetch_transactions_with_metrics() -> tuple[
+            list[Transaction], FetchMetrics
+        ]:
+            fetch_started.set()
+            await release_fetch.wait()
+            return [_transaction(1, date(2024, 1, 1), "before")], build_metrics()
+
+        firefly_service.fetch_transactions_with_metrics = AsyncMock(
+            side_effect=fetch_transactions_with_metrics
+        )
+        service = TransactionSnapshotService(
+            store=store, firefly_service=firefly_service
+        )
+        updated = _transaction(1, date(2024, 1, 1), "after")
+
+        refresh = asyncio.create_task(service.refresh_snapshot())
+        await fetch_started.wait()
+        await service.on_transaction_updated(updated)
+        release_fetch.set()
+        refreshed = await refresh
+
+        assert refreshed.transactions == [updated]
+        assert previous.revision == 5
+        assert refreshed.revision == 7
+        assert service._patch_logs == []
+
+    asyncio.run(run_test())
+
+
+def test_refresh_range_replaces_only_requested_window():
+    store = InMemorySnapshotStore()
+    fetched_at = datetime.now(UTC) - timedelta(seconds=30)
+    newer = _transaction(1, date(2024, 4, 2))
+    edited = _transaction(2, date(2024, 3, 10), description="before")
+    deleted = _transaction(3, date(2024, 3, 5))
+    older = _transaction(4, date(2024, 1, 20))
+    previous = TransactionSnapshot(
+        transactions=[newer, edited, deleted, older],
+        metrics=build_metrics(),
+        fetched_at=fetched_at,
+        reconciled_at=fetched_at,
+        revision=2,
+    )
+    fresh_edited = _transaction(2, date(2024, 3, 10), description="after")
+    added = _transaction(5, date(2024, 2, 14))
+    firefly_service = MagicMock()
+    firefly_service.fetch_transactions = AsyncMock(return_value=[fresh_edited, added])
+    firefly_service.fetch_transactions_with_metrics = AsyncMock()
+    service = TransactionSnapshotService(store=store, firefly_service=firefly_service)
+
+    asyncio.run(store.set_snapshot(previous))
+    result = asyncio.run(service.refresh_range(date(2024, 2, 1), date(2024, 3, 31)))
+
+    assert asyncio.run(store.get_snapshot()) is result
+    assert result.transactions == [newer, fresh_edited, added, older]
+    assert result.metrics.total_transactions == 4
+    assert result.fetched_at == fetched_at
+    assert result.reconciled_at == fetched_at
+    assert result.revision == 3
+    assert result.last_modified_at > fetched_at
+    firefly_service.fetch_transactions.assert_awaited_once_with(
+        start_date=date(2024, 2, 1), end_date=date(2024, 3, 31)
+    )
+    firefly_service.fetch_transactions_with_metrics.assert_not_awaited()
+
+
+def test_refresh_range_runs_full_refresh_without_cached_snapshot():
+    store = InMemorySnapshotStore()
+    tx = build_transaction()
+    firefly_service = MagicMock()
+    firefly_service.fetch_transactions = AsyncMock()
+    firefly_service.fetch_transactions_with_metrics = AsyncMock(
+        return_value=([tx], build_metrics())
+    )
+    service = TransactionSnapshotService(store=store, firefly_service=firefly_service)
+
+    result = asyncio.run(service.refresh_range(date(2024, 1, 1), date(2024, 1, 31)))
+
+    assert result.transactions == [tx]
+    firefly_service.fetch_transactions.assert_not_awaited()
+
+
+def test_listeners_see_refreshed_snapshots_but_not_patches():
+    store = InMemorySnapshotStore()
+    tx = _transaction(1, date(2024, 1, 10))
+    firefly_service = MagicMock()
+    firefly_service.fetch_transactions = AsyncMock(return_value=[tx])
+    firefly_service.fetch_transactions_with_metrics = AsyncMock(
+        return_value=([tx], build_metrics())
+    )
+    service = TransactionSnapshotService(store=store, firefly_service=firefly_service)
+    seen: list[TransactionSnapshot] = []
+
+    def failing_listener(snapshot: TransactionSnapshot) -> None:
+        raise RuntimeError("listener bug")
+
+    service.add_listener(failing_listener)
+    service.add_listener(seen.append)
+
+    full = asyncio.run(service.refresh_snapshot())
+    asyncio.run(
+        service.on_transaction_updated(
+            _transaction(1, date(2024, 1, 10), description="Updated")
+        )
+    )
+    ranged = asyncio.run(service.refresh_range(date(2024, 1, 1), date(2024, 1, 31)))
+
+    assert seen == [full, ranged]
+    assert seen[0] is full
+    assert seen[1] is ranged
+    assert asyncio.run(store.get_snapshot()) is ranged
@@ -1,5 +1,5 @@
 import asyncio
-from datetime import date
+from datetime import UTC, date, datetime
 from decimal import Decimal
 from unittest.mock import AsyncMock, MagicMock
 
@@ -7,10 +7,13 @@ import pytest
 
 from api.models.tx import TxTag
 from services.domain.job_base import JobStatus
+from services.domain.metrics import FetchMetrics
 from services.domain.transaction import Category, Currency, Transaction, TxType
+from services.domain.tx_bulk import TxOperation
 from services.exceptions import ExternalServiceFailed
 from services.firefly_base_service import FireflyServiceError
 from services.firefly_tx_service import FireflyTxService
+from services.snapshot.models import TransactionSnapshot
 from services.tx_application_service import TxApplicationService
 from services.tx_stats.models import MetricsState
 
@@ -157,3 +160,218 @@ def test_refresh_tx_metrics_delegates_to_manager():
 
     service.tx_metrics_manager.refresh.assert_awaited_once()
     assert state is expected_state
+
+
+def _screening_tx(
+    tx_id: int,
+    tx_date: date,
+    description: str = "Coffee",
+    *,
+    tags: frozenset[str] = frozenset(),
+    category: Category | None = None,
+) -> Transaction:
+    return Transaction(
+        id=tx_id,
+        date=tx_date,
+        amount=Decimal("12.50"),
+        type=TxType.WITHDRAWAL,
+        description=description,
+        tags=tags,
+        notes=None,
+        category=category,
+        currency=DEFAULT_CURRENCY,
+    )
+
+
+def _snapshot_screening_service(
+    transactions: list[Transaction],
+) -> tuple[TxApplicationService, MagicMock, MagicMock]:
+    firefly_client = MagicMock()
+    firefly_client.fetch_categories = AsyncMock(return_value=[])
+    tx_service = FireflyTxService(firefly_client, "BLIK", "allegro")
+    tx_service.get_categories = AsyncMock(return_value=[Category(id=10, name="Food")])
+    tx_service.get_txs_for_screening = AsyncMock()
+    snapshot_service = MagicMock()
+    snapshot_service.get_snapshot = AsyncMock(
+        return_value=TransactionSnapshot(
+            transactions=transactions,
+            metrics=FetchMetrics(
+                total_transactions=len(transactions),
+                fetching_duration_ms=1,
+                invalid=0,
+                multipart=0,
+            ),
+            fetched_at=datetime.now(UTC),
+        )
+    )
+    service = TxApplicationService(
+        tx_service=tx_service,
+        metrics_provider=MagicMock(),
+        snapshot_service=snapshot_service,
+    )
+    return service, tx_service, snapshot_service
+
+
+def test_get_screening_month_serves_snapshot_with_screening_predicates():
+    transactions = [
+        _screening_tx(1, date(2024, 2, 3)),
+        _screening_tx(2, date(2024, 2, 20)),
+        _screening_tx(3, date(2024, 2, 20), "blik"),
+        _screening_tx(4, date(2024, 2, 10), tags=frozenset({"action_req"})),
+        _screening_tx(5, date(2024, 2, 11), "Allegro.pl"),
+        _screening_tx(
+            6, date(2024, 2, 12), "Allegro.pl", tags=frozenset({"allegro_done"})
+        ),
+        _screening_tx(7, date(2024, 2, 13), category=Category(id=1, name="Food")),
+        _screening_tx(8, date(2024, 3, 1)),
+        _screening_tx(9, date(2024, 2, 20)),
+    ]
+    service, tx_service, snapshot_service = _snapshot_screening_service(transactions)
+
+    first = asyncio.run(service.get_screening_month(year=2024, month=2))
+    second = asyncio.run(service.get_screening_month(year=2024, month=2))
+
+    assert first is not None and second is not None
+    assert [tx.id for tx in first.transactions] == [2, 9, 6, 1]
+    assert first.remaining == 4
+    assert first.categories[0].id == 10
+    tx_service.get_txs_for_screening.assert_not_awaited()
+    tx_service.get_categories.assert_awaited_once_with()
+    assert snapshot_service.get_snapshot.await_count == 2
+
+
+def test_get_screening_month_omits_categories_when_client_version_is_current():
+    tx = _screening_tx(1, date(2024, 2, 3))
+    service, tx_service, _ = _snapshot_screening_service([tx])
+
+    first = asyncio.run(service.get_screening_month(year=2024, month=2))
+    assert first is not None and first.categories_version is not None
+    cached = asyncio.run(
+        service.get_screening_month(
+            year=2024, month=2, categories_version=first.categories_version
+        )
+    )
+    outdated = asyncio.run(
+        service.get_screening_month(year=2024, month=2, categories_version="old")
+    )
+
+    assert cached is not None and outdated is not None
+    assert cached.categories is None
+    assert cached.categories_version == first.categories_version
+    assert outdated.categories == first.categories
+    tx_service.get_categories.assert_awaited_once_with()
+
+
+def test_get_screening_month_live_bypasses_snapshot_and_category_cache():
+    tx = _screening_tx(1, date(2024, 2, 3))
+    service, tx_service, snapshot_service = _snapshot_screening_service([tx])
+    tx_service.get_txs_for_screening = AsyncMock(return_value=[tx])
+
+    asyncio.run(service.get_screening_month(year=2024, month=2))
+    response = asyncio.run(service.get_screening_month(year=2024, month=2, live=True))
+
+    assert response is not None
+    assert tx_service.get_categories.await_count == 2
+    tx_service.get_txs_for_screening.assert_awaited_once_with(
+        start_date=date(2024, 2, 1), end_date=date(2024, 2, 29)
+    )
+    snapshot_service.get_snapshot.assert_awaited_once()
+
+
+def _bulk_service(
+    snapshot_txs: list[Transaction] | None, *, update_concurrency: int = 4
+) -> tuple[TxApplicationService, MagicMock]:
+    tx_service = MagicMock(spec=FireflyTxService)
+    tx_service.apply_changes = AsyncMock(return_value=True)
+    snapshot_service = MagicMock()
+    snapshot_service.get_fresh_snapshot = AsyncMock(
+        return_value=None
+        if snapshot_txs is None
+        else TransactionSnapshot(
+            transactions=snapshot_txs,
+            metrics=FetchMetrics(
+                total_transactions=len(snapshot_txs),
+                fetching_duration_ms=1,
+                invalid=0,
+                multipart=0,
+            ),
+            fetched_at=datetime.now(UTC),
+        )
+    )
+    service = TxApplicationService(
+        tx_service=tx_service,
+        metrics_provider=MagicMock(),
+        snapshot_service=snapshot_service,
+        update_concurrency=update_concurrency,
+    )
+    return service, tx_service
+
+
+def test_bulk_job_uses_fresh_snapshot_instead_of_fetching_transactions():
+    cached = _screening_tx(1, date(2024, 2, 3))
+    missing = _screening_tx(2, date(2024, 2, 4))
+    service, tx_service = _bulk_service([cached])
+    tx_service.get_transaction = AsyncMock(return_value=missing)
+
+    async def run_test():
+        job = await service.start_bulk_job(
+            operations=[
+                TxOperation(transaction_id=1, category_id=10),
+                TxOperation(transaction_id=2, tags=frozenset({"blik_done"})),
+            ]
+        )
+        await asyncio.sleep(0.01)
+        return job
+
+    job = asyncio.run(run_test())
+
+    assert job.status == JobStatus.DONE
+    assert (job.total, job.applied, job.failed) == (2, 2, 0)
+    tx_service.get_transaction.assert_awaited_once_with(2)
+    tx_service.apply_changes.assert_any_await(cached, category_id=10, tags=frozenset())
+    tx_service.apply_changes.assert_any_await(
+        missing, category_id=None, tags=frozenset({"blik_done"})
+    )
+    assert service.get_bulk_job(job_id=job.id) is job
+
+
+def test_bulk_job_records_per_item_failures_and_bounds_concurrency():
+    in_flight = 0
+    peak = 0
+
+    async def apply_changes(tx, *, category_id=None, tags=frozenset()):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        if tx.id == 3:
+            raise FireflyServiceError("Failed to update transaction 3")
+        return True
+
+    service, tx_service = _bulk_service(None, update_concurrency=2)
+    tx_service.get_transaction = AsyncMock(
+        side_effect=lambda tx_id: _screening_tx(tx_id, date(2024, 2, 3))
+    )
+    tx_service.apply_changes = AsyncMock(side_effect=apply_changes)
+
+    async def run_test():
+        job = await service.start_bulk_job(
+            operations=[
+                TxOperation(transaction_id=tx_id, category_id=10)
+                for tx_id in range(1, 7)
+            ]
+        )
+        await asyncio.sleep(0.01)
+        return job
+
+    job = asyncio.run(run_test())
+
+    assert job.status == JobStatus.DONE
+    assert (job.applied, job.failed) == (5, 1)
+    assert tx_service.get_transaction.await_count == 6
+    assert peak == 2
+    failed = [result for result in job.results if result.status == "failed"]
+    assert [(result.transaction_id, result.reason) for result in failed] == [
+        (3, "Failed to update transaction 3")
+    ]